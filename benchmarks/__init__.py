@@ -0,0 +1,3 @@
+"""
+The benchmarks of the `bibtex_linter`, see `run_benchmarks`.
+"""
@@ -0,0 +1,174 @@
+"""
+This module generates synthetic, but realistic BibTeX files for the benchmarks.
+
+The corpus is fully determined by the `CorpusConfig` (including its `seed`), so that the results of two benchmark runs
+on different machines or versions are comparable. Usage:
+
+```commandline
+python -m benchmarks.generate_corpus corpus.bib --entries 100000 --seed 42
+```
+"""
+from typing import Dict, List, Sequence, Tuple
+import argparse
+import dataclasses
+import random
+
+# The entry types of the corpus and how often they occur, roughly as in a typical engineering bibliography
+DEFAULT_ENTRY_TYPE_WEIGHTS: Dict[str, float] = {
+    "article": 35,
+    "inproceedings": 20,
+    "conference": 5,
+    "book": 8,
+    "misc": 8,
+    "online": 8,
+    "inbook": 4,
+    "incollection": 4,
+    "techreport": 4,
+    "standard": 2,
+    "phdthesis": 2,
+}
+
+# The fields that are (almost) always present for each entry type. All other fields are drawn from `_OPTIONAL_FIELDS`.
+_COMMON_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "article": ("author", "title", "journal", "year"),
+    "inproceedings": ("author", "title", "booktitle", "year"),
+    "conference": ("author", "title", "booktitle", "publisher", "year"),
+    "book": ("author", "title", "publisher", "year"),
+    "misc": ("author", "title", "howpublished", "year"),
+    "online": ("author", "title", "howpublished", "year", "note"),
+    "inbook": ("author", "title", "chapter", "publisher", "year"),
+    "incollection": ("author", "title", "booktitle", "publisher", "year"),
+    "techreport": ("author", "title", "institution", "year"),
+    "standard": ("title", "organization", "type", "number", "year"),
+    "phdthesis": ("author", "title", "school", "year"),
+}
+_OPTIONAL_FIELDS: Tuple[str, ...] = (
+    "volume", "number", "pages", "month", "doi", "url", "urldate", "language", "address", "editor", "note",
+    "abstract", "keywords", "isbn", "issn", "series", "edition", "organization",
+)
+
+_WORDS: Tuple[str, ...] = (
+    "adaptive", "analysis", "approach", "asset", "automation", "based", "control", "data", "design", "digital",
+    "distributed", "efficient", "engineering", "evaluation", "framework", "industrial", "information", "integration",
+    "learning", "model", "modular", "network", "optimization", "performance", "process", "robust", "scalable",
+    "semantic", "shell", "system", "systems", "twin", "verification",
+)
+_FIRST_NAMES: Tuple[str, ...] = ("Anna", "Ben", "Chen", "Daniela", "Emil", "Fatima", "Gustav", "Hiro", "Ines", "Jonas")
+_LAST_NAMES: Tuple[str, ...] = ("Müller", "Schmidt", "Nguyen", "García", "Rossi", "Kowalski", "Tanaka", "Smith")
+
+
+@dataclasses.dataclass
+class CorpusConfig:
+    """
+    The parameters of a synthetic corpus.
+
+    :ivar number_of_entries: Number of entries in the corpus
+    :ivar seed: Seed of the random generator, the same config always produces the same corpus
+    :ivar entry_type_weights: The entry types and their relative frequency
+    :ivar min_optional_fields: Minimum number of optional fields per entry, in addition to the common ones
+    :ivar max_optional_fields: Maximum number of optional fields per entry, in addition to the common ones
+    :ivar multiline_probability: Probability of a long value (e.g. an abstract) spanning several lines
+    :ivar nested_brace_probability: Probability of a title containing nested braces, e.g. `{The {LaTeX} Companion}`
+    :ivar missing_field_probability: Probability of each common field to be missing, so that the rules find violations
+    """
+    number_of_entries: int = 10_000
+    seed: int = 42
+    entry_type_weights: Dict[str, float] = dataclasses.field(
+        default_factory=lambda: dict(DEFAULT_ENTRY_TYPE_WEIGHTS))
+    min_optional_fields: int = 0
+    max_optional_fields: int = 6
+    multiline_probability: float = 0.2
+    nested_brace_probability: float = 0.3
+    missing_field_probability: float = 0.05
+
+
+def _words(rng: random.Random, minimum: int, maximum: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(minimum, maximum)))
+
+
+def _value(rng: random.Random, key: str, config: CorpusConfig) -> str:
+    """
+    Generate a value for the field `key`, including the wrapping braces or quotes.
+    """
+    if key == "year":
+        year: int = rng.randint(1970, 2025)
+        # Bare numbers are valid BibTeX and common for years
+        return str(year) if rng.random() < 0.3 else f"{{{year}}}"
+    if key == "author":
+        authors: List[str] = [f"{rng.choice(_LAST_NAMES)}, {rng.choice(_FIRST_NAMES)}"
+                              for _ in range(rng.randint(1, 5))]
+        return "{" + " and ".join(authors) + "}"
+    if key == "title":
+        title: str = _words(rng, 3, 12).capitalize()
+        if rng.random() < config.nested_brace_probability:
+            title = f"{{{rng.choice(_WORDS).upper()}}}: {title} with {{{rng.choice(_WORDS).capitalize()}}}"
+        return "{" + title + "}"
+    if key in ("abstract", "note", "keywords") and rng.random() < config.multiline_probability:
+        lines: List[str] = [_words(rng, 6, 14) for _ in range(rng.randint(2, 8))]
+        return "{" + "\n    ".join(lines) + "}"
+    if key in ("pages", "volume", "number", "edition", "chapter"):
+        return f"{{{rng.randint(1, 999)}}}"
+    if key in ("url", "doi"):
+        return f"{{https://doi.org/10.{rng.randint(1000, 9999)}/{rng.randint(100000, 999999)}}}"
+    value: str = _words(rng, 1, 6).title()
+    # Some values are wrapped in quotes instead of braces
+    return f'"{value}"' if rng.random() < 0.1 else "{" + value + "}"
+
+
+def generate_entry(rng: random.Random, index: int, config: CorpusConfig,
+                   entry_types: Sequence[str], weights: Sequence[float]) -> str:
+    """
+    Generate the text of a single entry.
+    """
+    entry_type: str = rng.choices(entry_types, weights)[0]
+    keys: List[str] = [key for key in _COMMON_FIELDS.get(entry_type, ("author", "title", "year"))
+                       if rng.random() >= config.missing_field_probability]
+    optional_fields: List[str] = [key for key in _OPTIONAL_FIELDS if key not in keys]
+    keys.extend(rng.sample(optional_fields, rng.randint(config.min_optional_fields,
+                                                        min(config.max_optional_fields, len(optional_fields)))))
+    written_entry_type: str = entry_type.upper() if rng.random() < 0.1 else entry_type
+    fields: str = ",\n".join(f"  {key} = {_value(rng, key, config)}" for key in keys)
+    return f"@{written_entry_type}{{{entry_type}_{index},\n{fields}\n}}\n"
+
+
+def generate_corpus(config: CorpusConfig) -> str:
+    """
+    Generate the content of a BibTeX file as described by the `config`.
+    """
+    rng = random.Random(config.seed)
+    entry_types: List[str] = list(config.entry_type_weights)
+    weights: List[float] = list(config.entry_type_weights.values())
+    return "\n".join(generate_entry(rng, index, config, entry_types, weights)
+                     for index in range(config.number_of_entries))
+
+
+def write_corpus(filename: str, config: CorpusConfig) -> None:
+    with open(filename, "w") as file:
+        file.write(generate_corpus(config))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic .bib file for the benchmarks.")
+    parser.add_argument("output", type=str, help="Path of the .bib file to write.")
+    parser.add_argument("--entries", type=int, default=CorpusConfig.number_of_entries,
+                        help="Number of entries.")
+    parser.add_argument("--seed", type=int, default=CorpusConfig.seed,
+                        help="Seed of the random generator.")
+    parser.add_argument("--max-optional-fields", type=int, default=CorpusConfig.max_optional_fields,
+                        help="Maximum number of optional fields per entry.")
+    parser.add_argument("--multiline-probability", type=float, default=CorpusConfig.multiline_probability,
+                        help="Probability of a long value spanning several lines.")
+    parser.add_argument("--nested-brace-probability", type=float, default=CorpusConfig.nested_brace_probability,
+                        help="Probability of a title with nested braces.")
+    args = parser.parse_args()
+    write_corpus(args.output, CorpusConfig(
+        number_of_entries=args.entries,
+        seed=args.seed,
+        max_optional_fields=args.max_optional_fields,
+        multiline_probability=args.multiline_probability,
+        nested_brace_probability=args.nested_brace_probability,
+    ))
+
+
+if __name__ == "__main__":
+    main()
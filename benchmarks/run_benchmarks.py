@@ -0,0 +1,214 @@
+"""
+This module runs the benchmarks of the `bibtex_linter` on a synthetic corpus (see `generate_corpus`).
+
+For each benchmark, the best time of several runs is used to compute the throughput in entries per second. The peak
+memory is measured in a separate run via `tracemalloc` (or, for the end-to-end CLI benchmark, as the maximum resident
+set size of the subprocess), since tracing the memory slows down the code considerably.
+
+The results can be stored as JSON and used as a baseline for later runs, e.g. before upgrading:
+
+```commandline
+python -m benchmarks.run_benchmarks --entries 50000 --save-baseline baseline.json
+# ... upgrade or change the code ...
+python -m benchmarks.run_benchmarks --entries 50000 --baseline baseline.json
+```
+
+When comparing against a baseline, the exit code is `1` if any benchmark became slower than the `--tolerance`.
+"""
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import dataclasses
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.generate_corpus import CorpusConfig, write_corpus
+from bibtex_linter.parser import BibTeXEntry, parse_bibtex_file, split_entries
+from bibtex_linter.rulesets import load_ruleset
+from bibtex_linter.verification import verify
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None  # type: ignore[assignment]
+
+DEFAULT_REPEAT: int = 3
+DEFAULT_TOLERANCE: float = 0.1
+
+
+@dataclasses.dataclass
+class BenchmarkResult:
+    """
+    The result of one benchmark.
+
+    :ivar seconds: The best time of all runs
+    :ivar entries_per_second: The throughput of the best run
+    :ivar peak_memory: The peak memory in bytes, or `None` if it could not be measured
+    """
+    seconds: float
+    entries_per_second: float
+    peak_memory: Optional[int]
+
+
+def measure(function: Callable[[], Any], number_of_entries: int, repeat: int) -> BenchmarkResult:
+    """
+    Measure the best time of `repeat` calls of `function` and the peak memory of one additional call.
+    """
+    seconds: float = float("inf")
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        function()
+        seconds = min(seconds, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return BenchmarkResult(seconds=seconds, entries_per_second=number_of_entries / seconds, peak_memory=peak_memory)
+
+
+def measure_cli(bib_path: str, ruleset: str, number_of_entries: int, repeat: int) -> BenchmarkResult:
+    """
+    Measure the best time of `repeat` runs of the CLI in a subprocess, including the start of the interpreter.
+    """
+    command: List[str] = [sys.executable, "-m", "bibtex_linter.main", bib_path, "--ruleset", ruleset, "--no-cache"]
+    seconds: float = float("inf")
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        # The exit code is 1, since the corpus contains violations
+        subprocess.run(command, stdout=subprocess.DEVNULL, check=False)
+        seconds = min(seconds, time.perf_counter() - start)
+    peak_memory: Optional[int] = None
+    if resource is not None:
+        # `ru_maxrss` is the maximum over all finished subprocesses, in KiB on Linux (and in bytes on macOS)
+        max_rss: int = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        peak_memory = max_rss if sys.platform == "darwin" else max_rss * 1024
+    return BenchmarkResult(seconds=seconds, entries_per_second=number_of_entries / seconds, peak_memory=peak_memory)
+
+
+def run_benchmarks(bib_path: str, ruleset: str, repeat: int) -> Dict[str, BenchmarkResult]:
+    """
+    Run all benchmarks on the given .bib file.
+    """
+    load_ruleset(ruleset)
+    with open(bib_path, "r") as file:
+        raw_content: str = file.read()
+    raw_entries: List[str] = split_entries(raw_content)
+    entries: List[BibTeXEntry] = parse_bibtex_file(bib_path)
+    number_of_entries: int = len(entries)
+
+    def verify_all() -> None:
+        for entry in entries:
+            verify(entry)
+
+    return {
+        "split_entries": measure(lambda: split_entries(raw_content), number_of_entries, repeat),
+        "from_string": measure(lambda: [BibTeXEntry.from_string(raw_entry) for raw_entry in raw_entries],
+                               number_of_entries, repeat),
+        "parse_bibtex_file": measure(lambda: parse_bibtex_file(bib_path), number_of_entries, repeat),
+        "parse_bibtex_file_lazy": measure(lambda: parse_bibtex_file(bib_path, lazy=True), number_of_entries, repeat),
+        "verify": measure(verify_all, number_of_entries, repeat),
+        "cli": measure_cli(bib_path, ruleset, number_of_entries, repeat),
+    }
+
+
+def compare(results: Dict[str, BenchmarkResult], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Compare the throughput of the results with a baseline (as written by `to_json`).
+
+    :return: The descriptions of all benchmarks that are slower than the baseline by more than `tolerance`
+    """
+    regressions: List[str] = []
+    for name, result in results.items():
+        baseline_result: Optional[Dict[str, Any]] = baseline.get("benchmarks", {}).get(name)
+        if baseline_result is None:
+            continue
+        ratio: float = result.entries_per_second / baseline_result["entries_per_second"]
+        if ratio < 1 - tolerance:
+            regressions.append(f"{name}: {result.entries_per_second:,.0f} entries/s is {1 - ratio:.0%} slower than "
+                               f"the baseline ({baseline_result['entries_per_second']:,.0f} entries/s)")
+    return regressions
+
+
+def to_json(config: CorpusConfig, ruleset: str, results: Dict[str, BenchmarkResult]) -> Dict[str, Any]:
+    return {
+        "corpus": {"entries": config.number_of_entries, "seed": config.seed},
+        "ruleset": ruleset,
+        "python": sys.version.split()[0],
+        "benchmarks": {name: dataclasses.asdict(result) for name, result in results.items()},
+    }
+
+
+def format_table(results: Dict[str, BenchmarkResult], baseline: Optional[Dict[str, Any]]) -> str:
+    lines: List[str] = [f"{'Benchmark':<24} {'Entries/s':>12} {'Time [s]':>10} {'Peak memory [MiB]':>18}"
+                        + (f" {'vs. baseline':>13}" if baseline else "")]
+    for name, result in results.items():
+        peak_memory: str = f"{result.peak_memory / 2 ** 20:.1f}" if result.peak_memory is not None else "-"
+        line: str = f"{name:<24} {result.entries_per_second:>12,.0f} {result.seconds:>10.3f} {peak_memory:>18}"
+        if baseline:
+            baseline_result: Optional[Dict[str, Any]] = baseline.get("benchmarks", {}).get(name)
+            if baseline_result is not None:
+                line += f" {result.entries_per_second / baseline_result['entries_per_second'] - 1:>+13.1%}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the benchmarks of the bibtex_linter on a synthetic corpus.")
+    parser.add_argument("--entries", type=int, default=CorpusConfig.number_of_entries,
+                        help="Number of entries of the synthetic corpus.")
+    parser.add_argument("--seed", type=int, default=CorpusConfig.seed,
+                        help="Seed of the synthetic corpus.")
+    parser.add_argument("--corpus", type=str, default=None,
+                        help="Use this .bib file instead of generating a synthetic corpus.")
+    parser.add_argument("-r", "--ruleset", type=str, default="ieeetr",
+                        help="The ruleset used by the verify and cli benchmarks.")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="Number of runs per benchmark, of which the best one is used.")
+    parser.add_argument("--json", type=str, default=None,
+                        help="Write the results as JSON to this file.")
+    parser.add_argument("--save-baseline", type=str, default=None,
+                        help="Write the results as JSON to this file, to be used with --baseline later on.")
+    parser.add_argument("--baseline", type=str, default=None,
+                        help="Compare the results with this baseline and fail, if a benchmark became slower.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed slowdown compared to the baseline. Defaults to {DEFAULT_TOLERANCE}.")
+    args = parser.parse_args()
+
+    config = CorpusConfig(number_of_entries=args.entries, seed=args.seed)
+    baseline: Optional[Dict[str, Any]] = None
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+
+    with tempfile.TemporaryDirectory() as directory:
+        bib_path: str = args.corpus
+        if bib_path is None:
+            bib_path = os.path.join(directory, "corpus.bib")
+            write_corpus(bib_path, config)
+        results: Dict[str, BenchmarkResult] = run_benchmarks(bib_path, args.ruleset, args.repeat)
+
+    print(format_table(results, baseline))
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w") as file:
+                json.dump(to_json(config, args.ruleset, results), file, indent=2)
+
+    if baseline is not None:
+        regressions: List[str] = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions compared to the baseline:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print("\nNo regressions compared to the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+This module implements the analysis of a whole bibliography via a NumPy field-presence matrix.
+
+The matrix has one row per entry and one column per field key that appears in any of the entries, so that the
+presence-based rules (the declarative `FieldRule`s, see `declarative`) can be checked for all entries at once via
+vectorized operations, and aggregate reports ("which fields are missing from how many `conference` entries") only need
+a few column sums.
+
+NumPy is an optional dependency of the `bibtex_linter`, install it via `pip install bibtex_linter[analysis]`.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence
+import array
+import dataclasses
+
+try:
+    import numpy as np
+    import numpy.typing as npt
+except ImportError as error:
+    raise ImportError("The analysis of the field-presence matrix needs NumPy. "
+                      "Install it via `pip install bibtex_linter[analysis]`.") from error
+
+from bibtex_linter.declarative import FieldRule, field_keys, field_mask
+from bibtex_linter.parser import BibTeXEntry, iter_bibtex_file
+from bibtex_linter.verification import ViolationLike
+
+
+@dataclasses.dataclass
+class FieldPresenceMatrix:
+    """
+    The presence of the fields of many entries as a boolean matrix.
+
+    :ivar names: The names of the entries, one per row
+    :ivar entry_types: The distinct entry types, in the order they first appear
+    :ivar entry_type_indices: For each row, the index of its entry type in `entry_types`
+    :ivar field_keys: The distinct field keys, one per column, in the order they first appear
+    :ivar presence: The matrix of shape (entries × field keys), that is `True` where an entry has a field
+    """
+    names: List[str]
+    entry_types: List[str]
+    entry_type_indices: npt.NDArray[np.intp]
+    field_keys: List[str]
+    presence: npt.NDArray[np.bool_]
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[BibTeXEntry]) -> "FieldPresenceMatrix":
+        """
+        Build the matrix from the given entries. Only the field keys are used, so the entries can be parsed lazily.
+        """
+        names: List[str] = []
+        entry_type_index_by_entry_type: Dict[str, int] = {}
+        column_by_field_key: Dict[str, int] = {}
+        # The row and column of every `True` value, stored compactly for millions of entries
+        entry_type_indices: array.array[int] = array.array("q")
+        rows: array.array[int] = array.array("q")
+        columns: array.array[int] = array.array("q")
+
+        for row, entry in enumerate(entries):
+            names.append(entry.name)
+            entry_type_indices.append(
+                entry_type_index_by_entry_type.setdefault(entry.entry_type, len(entry_type_index_by_entry_type)))
+            for key in entry.fields:
+                column: Optional[int] = column_by_field_key.get(key)
+                if column is None:
+                    column = column_by_field_key[key] = len(column_by_field_key)
+                rows.append(row)
+                columns.append(column)
+
+        presence: npt.NDArray[np.bool_] = np.zeros((len(names), len(column_by_field_key)), dtype=np.bool_)
+        presence[np.frombuffer(rows, dtype=np.int64), np.frombuffer(columns, dtype=np.int64)] = True
+        return cls(
+            names=names,
+            entry_types=list(entry_type_index_by_entry_type),
+            entry_type_indices=np.frombuffer(entry_type_indices, dtype=np.int64).astype(np.intp),
+            field_keys=list(column_by_field_key),
+            presence=presence,
+        )
+
+    @classmethod
+    def from_files(cls, filenames: Iterable[str]) -> "FieldPresenceMatrix":
+        """
+        Build the matrix from all entries of the given BibTeX files, which are read one after another.
+        """
+        return cls.from_entries(entry for filename in filenames for entry in iter_bibtex_file(filename, lazy=True))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def rows_of_entry_type(self, entry_type: str) -> npt.NDArray[np.intp]:
+        """
+        Return the indices of the rows of all entries of the given entry type.
+        """
+        if entry_type not in self.entry_types:
+            return np.zeros(0, dtype=np.intp)
+        return np.flatnonzero(self.entry_type_indices == self.entry_types.index(entry_type))
+
+    def columns(self, keys: Sequence[str]) -> npt.NDArray[np.bool_]:
+        """
+        Return the columns of the given field keys as a matrix of shape (entries × keys). A field key that no entry
+        has, results in a column that is `False` everywhere.
+        """
+        result: npt.NDArray[np.bool_] = np.zeros((len(self.names), len(keys)), dtype=np.bool_)
+        for index, key in enumerate(keys):
+            if key in self.field_keys:
+                result[:, index] = self.presence[:, self.field_keys.index(key)]
+        return result
+
+    def field_counts(self, entry_type: Optional[str] = None) -> Dict[str, int]:
+        """
+        Count how many entries (of the given entry type, or of all entry types if `None`) have each field.
+        """
+        presence: npt.NDArray[np.bool_] = \
+            self.presence if entry_type is None else self.presence[self.rows_of_entry_type(entry_type)]
+        return {key: int(count) for key, count in zip(self.field_keys, presence.sum(axis=0))}
+
+
+def check_field_rules(matrix: FieldPresenceMatrix, rules: Iterable[FieldRule]) -> List[List[ViolationLike]]:
+    """
+    Check the given `FieldRule`s for all entries of the matrix at once.
+
+    :return: The invariant violations of each entry (in the order of the rows), the same as calling the rules for each
+        entry
+    """
+    violations: List[List[ViolationLike]] = [[] for _ in matrix.names]
+    for rule in rules:
+        rows: npt.NDArray[np.intp] = matrix.rows_of_entry_type(rule.entry_type)
+        keys: List[str] = field_keys(rule.required_mask | rule.omitted_mask | rule.disallowed_mask)
+        if not len(rows) or not keys:
+            continue
+        # Check each distinct combination of present keys only once
+        unique_presence, inverse = np.unique(matrix.columns(keys)[rows], axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        order: npt.NDArray[np.intp] = np.argsort(inverse, kind="stable")
+        rows_per_combination = np.split(rows[order], np.cumsum(np.bincount(inverse))[:-1])
+        for combination, combination_rows in zip(unique_presence, rows_per_combination):
+            templates = rule.violation_templates(field_mask(key for key, present in zip(keys, combination) if present))
+            if not templates:
+                continue
+            for row in combination_rows:
+                violations[row].extend(rule.violations(matrix.names[row], templates))
+    return violations
+
+
+@dataclasses.dataclass
+class FieldRuleReport:
+    """
+    How many entries of one entry type violate a `FieldRule`, per field.
+
+    :ivar entry_type: The entry type of the rule
+    :ivar number_of_entries: The number of entries of this entry type
+    :ivar missing: The number of entries that miss each required field
+    :ivar omitted: The number of entries that have each field, that would be omitted in the compiled document
+    :ivar disallowed: The number of entries that have each disallowed field
+    """
+    entry_type: str
+    number_of_entries: int
+    missing: Dict[str, int]
+    omitted: Dict[str, int]
+    disallowed: Dict[str, int]
+
+    @property
+    def has_violations(self) -> bool:
+        return bool(self.missing or self.omitted or self.disallowed)
+
+
+def field_rule_reports(matrix: FieldPresenceMatrix, rules: Iterable[FieldRule]) -> List[FieldRuleReport]:
+    """
+    Aggregate how many entries violate the given `FieldRule`s per field, via the column sums of the matrix.
+    Only the fields with at least one violation are contained in the reports.
+    """
+    reports: List[FieldRuleReport] = []
+    for rule in rules:
+        rows: npt.NDArray[np.intp] = matrix.rows_of_entry_type(rule.entry_type)
+        counts: Dict[str, int] = {}
+        if len(rows):
+            counts = {key: int(count) for key, count in zip(matrix.field_keys, matrix.presence[rows].sum(axis=0))}
+        missing: Dict[str, int] = {key: len(rows) - counts.get(key, 0) for key in field_keys(rule.required_mask)}
+        omitted: Dict[str, int] = {key: counts.get(key, 0) for key in field_keys(rule.omitted_mask)}
+        disallowed: Dict[str, int] = {key: counts.get(key, 0) for key in field_keys(rule.disallowed_mask)}
+        reports.append(FieldRuleReport(
+            entry_type=rule.entry_type,
+            number_of_entries=len(rows),
+            missing={key: count for key, count in missing.items() if count},
+            omitted={key: count for key, count in omitted.items() if count},
+            disallowed={key: count for key, count in disallowed.items() if count},
+        ))
+    return reports
@@ -0,0 +1,141 @@
+"""
+This module implements the library API of the `bibtex_linter`, for services and tools that embed the linter instead of
+running the CLI for each check: `lint_text` and `lint_path` return a `LintResult`, instead of printing the results and
+exiting.
+
+```python
+from bibtex_linter.api import lint_text
+
+result = lint_text(uploaded_file_content, ruleset="IEEEtran")
+if not result.passed:
+    for entry_result in result.failed_entries:
+        ...
+```
+
+A ruleset given by its name or path is loaded once per process into its own `Ruleset` (see
+`rulesets.create_ruleset`) and reused by all later calls, so that only the first call pays for loading it. A `Ruleset`
+object can be passed as well, e.g. one with a `RuleCache` (see `Ruleset.memoize`). Both functions can be called from
+several threads at once.
+"""
+from typing import AbstractSet, Any, Dict, Iterable, List, Optional, Union
+import dataclasses
+
+from bibtex_linter.daemon import result_to_json
+from bibtex_linter.parser import BibTeXEntry, EntryToken, tokenize, tokenize_stream
+from bibtex_linter.rulesets import create_ruleset
+from bibtex_linter.verification import EntryResult, Ruleset, SEVERITY_WARNING, Violation
+
+
+@dataclasses.dataclass(slots=True)
+class LintResult:
+    """
+    The result of checking a whole `.bib` file or text.
+
+    :ivar file: The path of the checked file, or the name given to `lint_text`
+    :ivar ruleset: The name of the ruleset the entries were checked with
+    :ivar results: The `EntryResult` of each entry, in the order of the entries
+    """
+    file: Optional[str]
+    ruleset: str
+    results: List[EntryResult]
+
+    @property
+    def number_of_entries(self) -> int:
+        return len(self.results)
+
+    @property
+    def number_of_violations(self) -> int:
+        return sum(len(result.violations) for result in self.results)
+
+    @property
+    def number_of_warnings(self) -> int:
+        """
+        The number of violations with the severity `warning`. All other violations (including the plain strings
+        returned by rules) are errors.
+        """
+        return sum(isinstance(violation, Violation) and violation.severity == SEVERITY_WARNING
+                   for result in self.results for violation in result.violations)
+
+    @property
+    def failed_entries(self) -> List[EntryResult]:
+        """
+        The results of the entries that failed verification.
+        """
+        return [result for result in self.results if result.violations]
+
+    @property
+    def passed(self) -> bool:
+        """
+        Whether all entries passed verification, i.e. whether the CLI would exit with `EXIT_SUCCESS`.
+        """
+        return not any(result.violations for result in self.results)
+
+    def to_json(self) -> Dict[str, Any]:
+        """
+        Convert the result into a JSON serializable dict, e.g. for the answer of a web service.
+        """
+        return {
+            "file": self.file,
+            "ruleset": self.ruleset,
+            "number_of_entries": self.number_of_entries,
+            "number_of_violations": self.number_of_violations,
+            "results": [result_to_json(result) for result in self.results],
+        }
+
+
+def _get_ruleset(ruleset: Union[Ruleset, str, None]) -> Ruleset:
+    return ruleset if isinstance(ruleset, Ruleset) else create_ruleset(ruleset)
+
+
+def _verify_tokens(tokens: Iterable[EntryToken], ruleset: Ruleset) -> List[EntryResult]:
+    results: List[EntryResult] = []
+    for token in tokens:
+        entry: BibTeXEntry = BibTeXEntry.from_token(token, strip_lines=True, lazy=True)
+        results.append(EntryResult(name=entry.name, entry_type=entry.entry_type, violations=ruleset.verify(entry)))
+    return results
+
+
+def lint_text(content: Union[str, bytes],
+              ruleset: Union[Ruleset, str, None] = None,
+              name: Optional[str] = None,
+              names: Optional[AbstractSet[str]] = None,
+              encoding: str = "utf-8") -> LintResult:
+    """
+    Check the entries of the content of a `.bib` file.
+
+    :param content: The content, either as text or as the raw bytes of the file
+    :param ruleset: A `Ruleset`, or the name of one of the `BUILTIN_RULESETS`, path to a `rules.py` or to a
+        declarative `rules.toml`. If `None`, the default ruleset (ieeetr) is used.
+    :param name: The name of the content, e.g. the name of an uploaded file, which is stored as `LintResult.file`
+    :param names: If given, only the entries with one of these names are checked, see `parser.tokenize`
+    :param encoding: The encoding of `content`, if it is given as bytes
+    :raises UnicodeDecodeError: If `content` is not encoded with `encoding`
+    :raises ImportError: If the ruleset could not be found
+    :raises OSError: If the file of the ruleset could not be read
+    """
+    checked_ruleset: Ruleset = _get_ruleset(ruleset)
+    text: str = content.decode(encoding) if isinstance(content, bytes) else content
+    return LintResult(file=name, ruleset=checked_ruleset.name,
+                      results=_verify_tokens(tokenize(text, names), checked_ruleset))
+
+
+def lint_path(path: str,
+              ruleset: Union[Ruleset, str, None] = None,
+              names: Optional[AbstractSet[str]] = None,
+              encoding: Optional[str] = None) -> LintResult:
+    """
+    Check the entries of a `.bib` file, which is read in chunks.
+
+    :param path: The path of the file
+    :param ruleset: The ruleset, see `lint_text`
+    :param names: If given, only the entries with one of these names are checked, see `parser.tokenize`
+    :param encoding: The encoding of the file. If `None`, the default encoding of the platform is used, like the CLI
+        does.
+    :raises OSError: If the file (or the file of the ruleset) could not be read
+    :raises UnicodeDecodeError: If the file is not encoded with `encoding`
+    :raises ImportError: If the ruleset could not be found
+    """
+    checked_ruleset: Ruleset = _get_ruleset(ruleset)
+    with open(path, "r", encoding=encoding) as file:
+        return LintResult(file=path, ruleset=checked_ruleset.name,
+                          results=_verify_tokens(tokenize_stream(file, names=names), checked_ruleset))
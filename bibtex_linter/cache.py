@@ -0,0 +1,202 @@
+"""
+This module implements a persistent cache for the verification results of entries.
+
+The results are stored under a key that is the hash of the raw text of the entry together with a fingerprint of the
+active ruleset, so an entry is only verified again if either the entry itself or the rules (or the linter) changed.
+The cache is bounded: When saving, only the `max_entries` most recently used results are kept.
+"""
+from typing import AbstractSet, Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+
+from bibtex_linter import parser, verification
+from bibtex_linter.parser import BibTeXEntry, EntryToken, tokenize_stream
+from bibtex_linter.verification import EntryResult, Ruleset, verify, Violation, ViolationLike
+
+DEFAULT_CACHE_DIRECTORY: str = ".bibtex_linter_cache"
+DEFAULT_MAX_ENTRIES: int = 100_000
+
+# Increase this, whenever the format of the cache file changes
+_CACHE_FORMAT_VERSION: int = 2
+_CACHE_FILE_NAME: str = "results.json"
+
+
+def ruleset_fingerprint(ruleset: Optional[Ruleset] = None) -> str:
+    """
+    Compute a fingerprint of the rules of the given ruleset (or of the default ruleset).
+
+    The fingerprint is the hash of the source files of all modules that registered rules and of the files the ruleset
+    was loaded from (see `Ruleset.source_files`, e.g. a declarative `rules.toml`), as well as of the parser and the
+    verification helpers, since changes to them could change the results as well.
+    """
+    if ruleset is None:
+        ruleset = verification._default_ruleset
+    source_files: Set[str] = {str(parser.__file__), str(verification.__file__), *ruleset.source_files}
+    for rule in ruleset.rules:
+        module_file: Optional[str] = getattr(inspect.getmodule(rule), "__file__", None)
+        if module_file:
+            source_files.add(module_file)
+
+    fingerprint = hashlib.sha256(str(_CACHE_FORMAT_VERSION).encode())
+    for source_file in sorted(source_files):
+        try:
+            with open(source_file, "rb") as file:
+                fingerprint.update(file.read())
+        except FileNotFoundError:
+            # E.g. a `rules.toml` that was removed after loading it
+            fingerprint.update(source_file.encode())
+    return fingerprint.hexdigest()
+
+
+class ResultCache:
+    """
+    Cache of `EntryResult`s, that is stored as a JSON file in `directory`.
+
+    `get` and `put` only consist of single operations on a dictionary, so they may be called from several threads at
+    once (as the thread pool of `parallel` does). At worst, the order of use of the results is slightly off.
+
+    :param directory: The directory of the cache, created on `save` if it does not exist
+    :param fingerprint: Fingerprint of the active ruleset, see `ruleset_fingerprint`
+    :param max_entries: Maximum number of results kept when saving the cache
+    """
+    def __init__(self,
+                 directory: str = DEFAULT_CACHE_DIRECTORY,
+                 fingerprint: str = "",
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.directory: str = directory
+        self.fingerprint: str = fingerprint
+        self.max_entries: int = max_entries
+        # The results in the order of their last use, mapping the key to `[name, entry_type, violations]`, with the
+        # violations as plain strings or as the result of `Violation.to_json`
+        self._results: Dict[str, Tuple[str, str, List[Union[str, Dict[str, Any]]]]] = {}
+        # Whether new results were stored since the cache was loaded
+        self._modified: bool = False
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, _CACHE_FILE_NAME)
+
+    def load(self) -> None:
+        """
+        Load the cache from disk. A missing, unreadable or outdated cache file is silently treated as an empty cache.
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                content = json.load(file)
+        except (OSError, ValueError):
+            return
+        if not isinstance(content, dict) or content.get("version") != _CACHE_FORMAT_VERSION:
+            return
+        self._results = {key: (name, entry_type, violations)
+                         for key, (name, entry_type, violations) in content.get("results", {}).items()}
+
+    def save(self) -> None:
+        """
+        Save the `max_entries` most recently used results to disk.
+
+        If no new results were stored since loading the cache, it is not written again, so the recency of cache hits is
+        only persisted together with new results.
+        """
+        if not self._modified:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        gitignore_path: str = os.path.join(self.directory, ".gitignore")
+        if not os.path.exists(gitignore_path):
+            with open(gitignore_path, "w") as file:
+                file.write("# Created by bibtex_linter\n*\n")
+
+        keys: List[str] = list(self._results)[-self.max_entries:]
+        content = {
+            "version": _CACHE_FORMAT_VERSION,
+            "results": {key: self._results[key] for key in keys},
+        }
+        # Write to a temporary file first and then replace the cache file, so that a concurrent run never reads a
+        # half written cache file.
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+                json.dump(content, file, separators=(",", ":"))
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    def key(self, entry_text: str) -> str:
+        """
+        Compute the key of an entry from its raw text, see `EntryToken.text`.
+        """
+        return hashlib.blake2b(f"{self.fingerprint}\0{entry_text}".encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[EntryResult]:
+        """
+        Return the cached result for the given key or `None`, if there is none.
+        """
+        cached = self._results.pop(key, None)
+        if cached is None:
+            return None
+        # Re-insert the result, to mark it as the most recently used one
+        self._results[key] = cached
+        name, entry_type, violations = cached
+        return EntryResult(name=name, entry_type=entry_type, violations=[
+            violation if isinstance(violation, str) else Violation.from_json(violation) for violation in violations
+        ])
+
+    def put(self, key: str, result: EntryResult) -> None:
+        """
+        Store the result for the given key, marking it as the most recently used one.
+        """
+        if self._results.pop(key, None) is None:
+            self._modified = True
+        self._results[key] = (result.name, result.entry_type, [_violation_to_json(violation)
+                                                               for violation in result.violations])
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+
+def _violation_to_json(violation: ViolationLike) -> Union[str, Dict[str, Any]]:
+    return violation if isinstance(violation, str) else violation.to_json()
+
+
+def verify_tokens_with_keys(tokens: Iterable[EntryToken],
+                            cache: Optional[ResultCache]) -> Iterator[Tuple[Optional[str], EntryResult]]:
+    """
+    Parse and verify the given `EntryToken`s, reusing the results in the `cache`, if one is given.
+
+    The new results are not stored in the `cache`, instead the cache key is yielded together with each result (or
+    `None` without a cache), so that the caller can store them. This way, the lookup can happen in a worker process,
+    while the results are stored in the cache of the main process.
+    """
+    for token in tokens:
+        key: Optional[str] = None
+        if cache is not None:
+            key = cache.key(token.text)
+            cached_result: Optional[EntryResult] = cache.get(key)
+            if cached_result is not None:
+                yield key, cached_result
+                continue
+        entry: BibTeXEntry = BibTeXEntry.from_token(token, strip_lines=True, lazy=True)
+        yield key, EntryResult(name=entry.name, entry_type=entry.entry_type, violations=verify(entry))
+
+
+def verify_tokens(tokens: Iterable[EntryToken], cache: Optional[ResultCache] = None) -> Iterator[EntryResult]:
+    """
+    Parse and verify the given `EntryToken`s, reusing and storing the results in the `cache`, if one is given.
+    """
+    for key, result in verify_tokens_with_keys(tokens, cache):
+        if cache is not None and key is not None:
+            cache.put(key, result)
+        yield result
+
+
+def verify_file(filename: str, cache: Optional[ResultCache] = None,
+                names: Optional[AbstractSet[str]] = None) -> Iterator[EntryResult]:
+    """
+    Parse and verify a BibTeX file entry by entry, reusing and storing the results in the `cache`, if one is given.
+    If `names` is given, only the entries with one of these names are parsed and verified, see `parser.tokenize`.
+    """
+    with open(filename, "r") as file:
+        yield from verify_tokens(tokenize_stream(file, names=names), cache)
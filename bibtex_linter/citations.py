@@ -0,0 +1,80 @@
+"""
+This module implements finding the keys of the entries cited by a LaTeX document, so that only these need to be
+checked.
+
+The keys are read either from the `.aux` file written by LaTeX (`\\citation{key1,key2}` for BibTeX and
+`\\abx@aux@cite{0}{key}` for biblatex, following `\\@input{chapter.aux}` of included files) or directly from the
+`.tex` files (`\\cite{key}`, `\\citep[p. 3]{key}`, `\\textcite{key}`, `\\nocite{key}` and the like).
+Either way, the whole file is searched with a single regular expression, without tokenizing the LaTeX code.
+"""
+from typing import FrozenSet, Iterable, List, Optional, Set
+import os
+import re
+
+# `\nocite{*}` cites all entries
+ALL_ENTRIES: str = "*"
+
+_AUX_CITATION = re.compile(r"\\(?:citation|abx@aux@cite(?:\{[^{}]*\})?)\{([^{}]*)\}|\\@input\{([^{}]*)\}")
+# Any command containing `cite` (e.g. `\cite`, `\citet*`, `\parencite`, `\autocite`, `\nocite`), followed by up to two
+# optional arguments and the keys
+_TEX_CITATION = re.compile(r"\\[a-zA-Z]*cite[a-zA-Z]*\*?\s*(?:\[[^\]]*\]\s*){0,2}\{([^{}]*)\}")
+# A comment, from an unescaped `%` to the end of the line
+_TEX_COMMENT = re.compile(r"(?<!\\)%[^\n]*")
+
+
+def _split_keys(keys: str) -> Iterable[str]:
+    return filter(None, (key.strip() for key in keys.split(",")))
+
+
+def find_citations_in_aux(filename: str) -> Set[str]:
+    """
+    Find the cited keys in an `.aux` file and in the `.aux` files it includes via `\\@input`.
+    """
+    keys: Set[str] = set()
+    filenames: Set[str] = set()
+    pending: List[str] = [filename]
+    while pending:
+        current: str = pending.pop()
+        if current in filenames:
+            continue
+        filenames.add(current)
+        with open(current, "r", encoding="utf-8", errors="replace") as file:
+            content: str = file.read()
+        for citation in _AUX_CITATION.finditer(content):
+            if citation.group(1) is not None:
+                keys.update(_split_keys(citation.group(1)))
+            else:
+                # The included files are relative to the directory LaTeX was run in, which is the one of the main file
+                pending.append(os.path.join(os.path.dirname(filename), citation.group(2)))
+    return keys
+
+
+def find_citations_in_tex(filename: str) -> Set[str]:
+    """
+    Find the cited keys in a `.tex` file, ignoring comments. Included files (`\\input`, `\\include`) are not
+    followed, pass them as well or use the `.aux` file instead.
+    """
+    with open(filename, "r", encoding="utf-8", errors="replace") as file:
+        content: str = _TEX_COMMENT.sub("", file.read())
+    keys: Set[str] = set()
+    for citation in _TEX_CITATION.finditer(content):
+        keys.update(_split_keys(citation.group(1)))
+    return keys
+
+
+def find_citations(filenames: Iterable[str]) -> Optional[FrozenSet[str]]:
+    """
+    Find the keys cited in the given `.aux` and `.tex` files. Any other file is searched like a `.tex` file.
+
+    :return: The cited keys, or `None` if all entries are cited (via `\\nocite{*}`)
+    :raises OSError: If one of the files could not be read
+    """
+    keys: Set[str] = set()
+    for filename in filenames:
+        if filename.endswith(".aux"):
+            keys.update(find_citations_in_aux(filename))
+        else:
+            keys.update(find_citations_in_tex(filename))
+    if ALL_ENTRIES in keys:
+        return None
+    return frozenset(keys)
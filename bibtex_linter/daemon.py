@@ -0,0 +1,413 @@
+"""
+This module implements a long-running lint server, that keeps the rulesets loaded and the results of recently checked
+files in memory, so that editors and pre-commit hooks do not pay for starting the interpreter, importing the rulesets
+and verifying unchanged entries on every check.
+
+The server is started via `bibtex_linter serve` and listens on a Unix socket (or reads from stdin with `--stdio`).
+The protocol is line-based JSON: Each request is a JSON object on a single line, which is answered by a JSON object on
+a single line.
+
+Requests:
+
+- `{"path": "refs.bib", "ruleset": "IEEEtran"}`: Check a file. The `ruleset` is optional (the default ruleset is
+  used) and, like the `path`, is resolved relative to the working directory of the server.
+- `{"content": "@misc{...}", "name": "refs.bib", "ruleset": null}`: Check the given content, e.g. the unsaved buffer
+  of an editor. The optional `name` identifies the document, so that its unchanged entries are not verified again.
+- `{"command": "stats"}`: The hits and misses of the caches of the results of the rules (see
+  `verification.RuleCache`) of the loaded rulesets, by the name of the ruleset.
+- `{"command": "ping"}` and `{"command": "shutdown"}`
+
+A file is only read again, if its modification time or size changed, and only its new or changed entries are verified
+again (see `watch.verify_changed_entries`). Since the same entries tend to show up in many files, the results of the
+rules are also memoized across files. The answer of a check is
+`{"ok": true, "file": ..., "ruleset": ..., "results": [...], "verified": ...}`, where `results` contains the name,
+entry type and violations of each entry (see `result_to_json`), and that of a failed request
+`{"ok": false, "error": ...}`.
+
+`request` sends a request to a running server, which the CLI uses with `--server`.
+
+The socket is only accessible by the user running the server: By default, it is created in `$XDG_RUNTIME_DIR`, or else
+in a directory of the user in the temporary directory, which must not be accessible by other users. On platforms that
+support it (`SO_PEERCRED`), the server only answers and the client only trusts the other side, if it runs as the same
+user. The server answers one client after another, and closes the connection of a client that does not send a request
+within `DEFAULT_CONNECTION_TIMEOUT`, so that it cannot block the others.
+"""
+from typing import Any, Dict, IO, List, Optional, Tuple, Union
+import argparse
+import collections
+import getpass
+import hashlib
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+import tempfile
+
+from bibtex_linter.parser import tokenize, tokenize_stream
+from bibtex_linter.rulesets import create_ruleset
+from bibtex_linter.verification import DEFAULT_RULE_CACHE_SIZE, EntryResult, Ruleset, Violation
+from bibtex_linter.watch import verify_changed_entries
+
+# Number of files or documents, whose results are kept in memory
+DEFAULT_MAX_DOCUMENTS: int = 64
+# Seconds the client waits for the answer of the server
+DEFAULT_TIMEOUT: float = 60.0
+# Seconds the server waits for the next request of a client, before it closes the connection
+DEFAULT_CONNECTION_TIMEOUT: float = 10.0
+
+_SOCKET_NAME: str = "bibtex_linter.sock"
+
+
+def default_socket_path() -> str:
+    """
+    The path of the socket of the server, which is unique per user: In `$XDG_RUNTIME_DIR`, if it is set, or else in a
+    directory of the user in the temporary directory.
+    """
+    runtime_directory: Optional[str] = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_directory:
+        return os.path.join(runtime_directory, _SOCKET_NAME)
+    return os.path.join(tempfile.gettempdir(), f"bibtex_linter-{getpass.getuser()}", _SOCKET_NAME)
+
+
+def _ensure_private_directory(directory: str) -> None:
+    """
+    Create the directory of the socket, only accessible by the current user, or check that an existing one is.
+
+    :raises OSError: If the directory belongs to another user or is accessible by other users, who could then replace
+        the socket by their own
+    """
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    status: os.stat_result = os.lstat(directory)
+    if not stat.S_ISDIR(status.st_mode) or status.st_mode & 0o077 or \
+            (hasattr(os, "getuid") and status.st_uid != os.getuid()):
+        raise OSError(f"The directory '{directory}' of the socket must belong to the current user and must not be "
+                      f"accessible by other users.")
+
+
+def _is_same_user(connection: socket.socket) -> bool:
+    """
+    Check that the other side of the connection runs as the current user. Where the platform cannot tell
+    (no `SO_PEERCRED`), only the permissions of the socket and its directory protect it.
+    """
+    if not hasattr(socket, "SO_PEERCRED"):
+        return True
+    credentials: bytes = connection.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    _, uid, _ = struct.unpack("3i", credentials)
+    return bool(uid == os.getuid())
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """
+    Remove the socket left over by a server that did not shut down cleanly.
+
+    :raises OSError: If something else than a socket exists at the path, which must not be deleted
+    """
+    try:
+        status: os.stat_result = os.lstat(socket_path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(status.st_mode):
+        raise OSError(f"'{socket_path}' exists and is not a socket.")
+    os.unlink(socket_path)
+
+
+def result_to_json(result: EntryResult) -> Dict[str, Any]:
+    return {
+        "name": result.name,
+        "entry_type": result.entry_type,
+        "violations": [violation if isinstance(violation, str) else violation.to_json()
+                       for violation in result.violations],
+    }
+
+
+def result_from_json(data: Dict[str, Any]) -> EntryResult:
+    """
+    Recreate an `EntryResult` from the result of `result_to_json`, with the already rendered messages.
+    """
+    return EntryResult(name=data["name"], entry_type=data["entry_type"], violations=[
+        violation if isinstance(violation, str) else Violation.from_json(violation) for violation in data["violations"]
+    ])
+
+
+class _Document:
+    """
+    The results of the last check of a file or of a document sent as content.
+
+    :ivar signature: The modification time and size of the file, or the hash of the content
+    :ivar results: The `EntryResult`s of all entries
+    :ivar results_by_text: The results by the hash of the raw text of their entries
+    """
+    def __init__(self) -> None:
+        self.signature: Union[Tuple[int, int], bytes, None] = None
+        self.results: List[EntryResult] = []
+        self.results_by_text: Dict[bytes, EntryResult] = {}
+
+
+class LintServer:
+    """
+    Answer the requests to the server, see the module documentation.
+
+    :param max_documents: Number of files or documents, whose results are kept. The least recently checked one is
+        dropped first.
+    :param rule_cache_size: Number of results of rules kept per ruleset, see `verification.RuleCache`
+    """
+    def __init__(self, max_documents: int = DEFAULT_MAX_DOCUMENTS,
+                 rule_cache_size: int = DEFAULT_RULE_CACHE_SIZE):
+        self.max_documents: int = max_documents
+        self.rule_cache_size: int = rule_cache_size
+        self.running: bool = True
+        # The rulesets used so far, by their name
+        self._rulesets: Dict[Optional[str], Ruleset] = {}
+        # The documents by the ruleset and the path or name of the document, the most recently checked one last
+        self._documents: collections.OrderedDict[Tuple[Optional[str], str], _Document] = collections.OrderedDict()
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Answer a single request. Errors are reported in the answer instead of being raised.
+        """
+        command: str = request.get("command", "lint")
+        if command == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if command == "shutdown":
+            self.running = False
+            return {"ok": True}
+        if command == "stats":
+            return {"ok": True, "rulesets": {
+                str(name): {"hits": cache.hits, "misses": cache.misses, "size": len(cache)}
+                for name, cache in ((name, ruleset.rule_cache) for name, ruleset in self._rulesets.items())
+                if cache is not None
+            }}
+        if command != "lint":
+            return {"ok": False, "error": f"Unknown command '{command}'."}
+        try:
+            ruleset_name: Optional[str] = request.get("ruleset")
+            if "content" in request:
+                name: str = request.get("name") or "<content>"
+                results, verified = self.lint_content(request["content"], name, ruleset_name)
+            elif "path" in request:
+                name = request["path"]
+                results, verified = self.lint_file(name, ruleset_name)
+            else:
+                return {"ok": False, "error": "The request needs either a 'path' or a 'content'."}
+        except Exception as error:
+            # Neither an unreadable file nor a broken ruleset must take the server down
+            return {"ok": False, "error": f"{error.__class__.__name__}: {error}"}
+        return {
+            "ok": True,
+            "file": name,
+            "ruleset": ruleset_name,
+            "results": [result_to_json(result) for result in results],
+            "verified": verified,
+        }
+
+    def lint_file(self, path: str, ruleset_name: Optional[str] = None) -> Tuple[List[EntryResult], int]:
+        """
+        Check a file, unless it did not change since the last check.
+
+        :return: The `EntryResult`s of all entries and the number of entries that were verified again
+        :raises OSError: If the file could not be read
+        """
+        ruleset: Ruleset = self._ruleset(ruleset_name)
+        stat = os.stat(path)
+        document: _Document = self._document(ruleset_name, os.path.abspath(path))
+        signature: Tuple[int, int] = (stat.st_mtime_ns, stat.st_size)
+        if document.signature == signature:
+            return document.results, 0
+        with open(path, "r") as file:
+            document.results, document.results_by_text, verified = verify_changed_entries(
+                tokenize_stream(file), document.results_by_text, ruleset.verify)
+        document.signature = signature
+        return document.results, verified
+
+    def lint_content(self, content: str, name: str = "<content>",
+                     ruleset_name: Optional[str] = None) -> Tuple[List[EntryResult], int]:
+        """
+        Check the content of a document, e.g. of an unsaved file in an editor.
+
+        :param name: Identifies the document, so that only its changed entries are verified again
+        :return: The `EntryResult`s of all entries and the number of entries that were verified again
+        """
+        ruleset: Ruleset = self._ruleset(ruleset_name)
+        document: _Document = self._document(ruleset_name, name)
+        signature: bytes = hashlib.blake2b(content.encode(), digest_size=16).digest()
+        if document.signature == signature:
+            return document.results, 0
+        document.results, document.results_by_text, verified = verify_changed_entries(
+            tokenize(content), document.results_by_text, ruleset.verify)
+        document.signature = signature
+        return document.results, verified
+
+    def _ruleset(self, ruleset_name: Optional[str]) -> Ruleset:
+        ruleset: Optional[Ruleset] = self._rulesets.get(ruleset_name)
+        if ruleset is None:
+            ruleset = create_ruleset(ruleset_name)
+            ruleset.memoize(self.rule_cache_size)
+            self._rulesets[ruleset_name] = ruleset
+        return ruleset
+
+    def _document(self, ruleset_name: Optional[str], name: str) -> _Document:
+        key: Tuple[Optional[str], str] = (ruleset_name, name)
+        document: Optional[_Document] = self._documents.pop(key, None)
+        if document is None:
+            document = _Document()
+        self._documents[key] = document
+        while len(self._documents) > self.max_documents:
+            self._documents.popitem(last=False)
+        return document
+
+    def handle_line(self, line: str) -> str:
+        """
+        Answer a request given as a line of JSON with a line of JSON.
+        """
+        try:
+            request: Any = json.loads(line)
+        except ValueError as error:
+            return json.dumps({"ok": False, "error": f"Invalid request: {error}"}) + "\n"
+        if not isinstance(request, dict):
+            return json.dumps({"ok": False, "error": "Invalid request: Expected a JSON object."}) + "\n"
+        return json.dumps(self.handle(request)) + "\n"
+
+
+def serve_stream(server: LintServer, input_stream: IO[str], output_stream: IO[str]) -> None:
+    """
+    Answer the requests read line by line from `input_stream`, until it ends or the server is shut down.
+    """
+    for line in input_stream:
+        if not line.strip():
+            continue
+        output_stream.write(server.handle_line(line))
+        output_stream.flush()
+        if not server.running:
+            return
+
+
+def serve_socket(server: LintServer, socket_path: str, timeout: float = DEFAULT_CONNECTION_TIMEOUT) -> None:
+    """
+    Answer the requests of the clients connecting to the Unix socket, one client after another, until the server is
+    shut down. Clients that run as another user are not answered.
+
+    :param socket_path: The path of the socket. If it is the `default_socket_path`, its directory is created if needed,
+        and must only be accessible by the current user.
+    :param timeout: Seconds to wait for the next request of a client, before closing the connection
+    :raises OSError: If another server is already listening on the socket, something else than a socket exists at
+        the path, or the directory of the default socket is accessible by other users
+    """
+    if socket_path == default_socket_path():
+        _ensure_private_directory(os.path.dirname(socket_path))
+    if request({"command": "ping"}, socket_path) is not None:
+        raise OSError(f"A server is already listening on '{socket_path}'.")
+    _remove_stale_socket(socket_path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # The device and inode of the socket, so that it is only removed at the end, if it was not replaced in the meantime
+    socket_id: Optional[Tuple[int, int]] = None
+    try:
+        listener.bind(socket_path)
+        status: os.stat_result = os.lstat(socket_path)
+        socket_id = (status.st_dev, status.st_ino)
+        # Other users must not be able to send requests, which would read files with the permissions of this user
+        os.chmod(socket_path, 0o600)
+        listener.listen()
+        while server.running:
+            connection, _ = listener.accept()
+            with connection:
+                if not _is_same_user(connection):
+                    continue
+                connection.settimeout(timeout)
+                with connection.makefile("r", encoding="utf-8") as reader, \
+                        connection.makefile("w", encoding="utf-8") as writer:
+                    try:
+                        serve_stream(server, reader, writer)
+                    except OSError:
+                        # The client went away before reading the answer, or did not send anything within the timeout
+                        pass
+    finally:
+        listener.close()
+        if socket_id is not None:
+            try:
+                status = os.lstat(socket_path)
+            except FileNotFoundError:
+                pass
+            else:
+                if stat.S_ISSOCK(status.st_mode) and (status.st_dev, status.st_ino) == socket_id:
+                    os.unlink(socket_path)
+
+
+def request(message: Dict[str, Any], socket_path: Optional[str] = None,
+            timeout: float = DEFAULT_TIMEOUT) -> Optional[Dict[str, Any]]:
+    """
+    Send a request to the server listening on the socket and return its answer.
+
+    :return: The answer, or `None` if no server is listening on the socket, the server runs as another user, or it did
+        not answer within the `timeout` or with a valid answer
+    """
+    try:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    except (AttributeError, OSError):
+        # Unix sockets are not available on this platform
+        return None
+    with connection:
+        connection.settimeout(timeout)
+        try:
+            connection.connect(socket_path if socket_path is not None else default_socket_path())
+        except OSError:
+            return None
+        if not _is_same_user(connection):
+            return None
+        try:
+            with connection.makefile("w", encoding="utf-8") as writer:
+                writer.write(json.dumps(message) + "\n")
+            with connection.makefile("r", encoding="utf-8") as reader:
+                answer: Any = json.loads(reader.readline())
+        except (OSError, ValueError):
+            # The server is busy with another client, closed the connection or sent something else than an answer
+            return None
+        if not isinstance(answer, dict):
+            return None
+        return answer
+
+
+def main(arguments: Optional[List[str]] = None) -> None:
+    """
+    The entry point of `bibtex_linter serve`.
+    """
+    parser = argparse.ArgumentParser(prog="bibtex_linter serve",
+                                     description="Keep the rulesets loaded and check .bib files on request.")
+    parser.add_argument("--socket",
+                        type=str,
+                        default=None,
+                        help=f"Path of the Unix socket to listen on. Defaults to '{default_socket_path()}'.")
+    parser.add_argument("--stdio",
+                        action="store_true",
+                        help="Read the requests from stdin and write the answers to stdout instead, one JSON object "
+                             "per line.")
+    parser.add_argument("--max-documents",
+                        type=int,
+                        default=DEFAULT_MAX_DOCUMENTS,
+                        help=f"Number of files whose results are kept in memory. Defaults to {DEFAULT_MAX_DOCUMENTS}.")
+    parser.add_argument("--rule-cache-size",
+                        type=int,
+                        default=DEFAULT_RULE_CACHE_SIZE,
+                        help=f"Number of results of rules kept in memory per ruleset, so that entries checked before "
+                             f"are not verified again. Defaults to {DEFAULT_RULE_CACHE_SIZE}.")
+    args = parser.parse_args(arguments)
+    if args.stdio and args.socket is not None:
+        parser.error("--stdio cannot be combined with --socket.")
+
+    server = LintServer(max_documents=args.max_documents, rule_cache_size=args.rule_cache_size)
+    if args.stdio:
+        serve_stream(server, sys.stdin, sys.stdout)
+        return
+    socket_path: str = args.socket if args.socket is not None else default_socket_path()
+    print(f"Listening on '{socket_path}', press Ctrl+C to stop.", file=sys.stderr)
+    try:
+        serve_socket(server, socket_path)
+    except KeyboardInterrupt:
+        pass
+    except OSError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
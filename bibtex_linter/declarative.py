@@ -0,0 +1,266 @@
+"""
+This module implements declarative rulesets, that only check the presence of fields.
+
+Most rules boil down to "these fields are required, those would be omitted and those are disallowed" for each entry
+type. Instead of writing a `@linter_rule` for each of them, these can be declared as a Dict (or in a TOML file) like:
+
+```
+FIELD_RULES = {
+    "article": {
+        "required": ["author", "title", "journal", "year"],
+        "omitted": ["language", "url"],
+    },
+}
+register_field_rules(FIELD_RULES)
+```
+
+When registered, each field key is assigned a bit, and the field sets of each entry type are compiled once into integer
+bitmasks. Checking an entry then only needs the bitmask of its fields and a few integer operations, and the violation
+messages are only built if there actually is a violation. The messages are the same as the ones of the
+`check_required_fields`, `check_omitted_fields` and `check_disallowed_fields` helpers.
+"""
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+import itertools
+import operator
+import threading
+import tomllib
+
+from bibtex_linter.parser import BibTeXEntry, canonical_entry_type
+from bibtex_linter import verification
+from bibtex_linter.verification import EntryBatch, Ruleset, Violation, ViolationLike, batch_implementation, linter_rule
+
+# The kinds of field sets that can be declared for an entry type
+FIELD_SET_KINDS = ("required", "omitted", "disallowed")
+
+# A declarative ruleset: Maps the entry type to a Dict that maps the kind of field set (see `FIELD_SET_KINDS`) to the
+# field keys
+FieldRules = Mapping[str, Mapping[str, Iterable[str]]]
+
+# The bit assigned to each field key that appears in a registered `FieldRule`, and the other way around.
+# Field keys that are not part of any `FieldRule` have no bit, since they are irrelevant to all of them.
+_field_bits: Dict[str, int] = {}
+_field_keys_by_bit_index: List[str] = []
+# Held while assigning new bits, so that rules compiled by several threads at once never assign the same bit to
+# different field keys. Looking up the bits needs no lock, since a bit is only published once its key is in
+# `_field_keys_by_bit_index`.
+_field_bits_lock: threading.Lock = threading.Lock()
+
+
+def field_mask(field_keys: Iterable[str]) -> int:
+    """
+    Return the bitmask of the given field keys, assigning new bits to field keys that do not have one yet.
+    """
+    mask: int = 0
+    for key in field_keys:
+        bit: Optional[int] = _field_bits.get(key)
+        if bit is None:
+            with _field_bits_lock:
+                # Another thread may have assigned the bit while this one waited for the lock
+                bit = _field_bits.get(key)
+                if bit is None:
+                    bit = 1 << len(_field_keys_by_bit_index)
+                    _field_keys_by_bit_index.append(key)
+                    _field_bits[key] = bit
+        mask |= bit
+    return mask
+
+
+def entry_field_mask(entry: BibTeXEntry) -> int:
+    """
+    Return the bitmask of the fields present in the given entry. Fields without a bit are ignored.
+    """
+    return _present_field_mask(entry.fields)
+
+
+def entry_field_masks(entries: Iterable[BibTeXEntry]) -> List[int]:
+    """
+    Return the bitmasks of the fields present in each of the given entries (see `entry_field_mask`).
+
+    Most entries of the same type have the same field keys, so the bitmask is computed only once per distinct tuple of
+    field keys.
+    """
+    keys_per_entry: List[Tuple[str, ...]] = list(map(tuple, map(operator.attrgetter("fields"), entries)))
+    masks_by_keys: Dict[Tuple[str, ...], int] = {keys: _present_field_mask(keys) for keys in set(keys_per_entry)}
+    return list(map(masks_by_keys.__getitem__, keys_per_entry))
+
+
+def _present_field_mask(field_keys: Iterable[str]) -> int:
+    mask: int = 0
+    field_bits = _field_bits
+    for key in field_keys:
+        mask |= field_bits.get(key, 0)
+    return mask
+
+
+def field_keys(mask: int) -> List[str]:
+    """
+    Return the sorted field keys contained in the given bitmask.
+    """
+    keys: List[str] = []
+    bit_index: int = 0
+    while mask:
+        if mask & 1:
+            keys.append(_field_keys_by_bit_index[bit_index])
+        mask >>= 1
+        bit_index += 1
+    return sorted(keys)
+
+
+class FieldRule:
+    """
+    A linter rule for one entry type, compiled from the declared field sets.
+
+    :param entry_type: The entry type the rule applies to. Like the field keys, it is canonicalized the way the parser
+        does (see `parser.canonical_entry_type`), e.g. `inproceedings` applies to the entries of type `conference`.
+    :param required: Field keys that must be present
+    :param omitted: Field keys that would be omitted in the compiled document and should therefore not be present
+    :param disallowed: Field keys that must not be present
+    """
+    def __init__(self,
+                 entry_type: str,
+                 required: Iterable[str] = (),
+                 omitted: Iterable[str] = (),
+                 disallowed: Iterable[str] = ()):
+        self.entry_type: str = canonical_entry_type(entry_type)
+        self.required_mask: int = field_mask(key.lower() for key in required)
+        self.omitted_mask: int = field_mask(key.lower() for key in omitted)
+        self.disallowed_mask: int = field_mask(key.lower() for key in disallowed)
+        self.__name__: str = f"field_rule_{self.entry_type}"
+        # The templates and fields of the violations by the bitmask of the fields of an entry, see `violation_templates`
+        self._templates_by_mask: Dict[int, Tuple[Tuple[str, List[str]], ...]] = {}
+        batch_implementation(self)(self.check_batch)
+
+    def violation_templates(self, mask: int) -> Tuple[Tuple[str, List[str]], ...]:
+        """
+        Return the message templates and the fields of the violations of an entry with the given bitmask of fields.
+        Only the entry name and type, which are filled into the templates, differ between entries with the same fields.
+
+        The violations are computed once per distinct bitmask.
+        """
+        templates: Optional[Tuple[Tuple[str, List[str]], ...]] = self._templates_by_mask.get(mask)
+        if templates is not None:
+            return templates
+        invariant_violations: List[Tuple[str, List[str]]] = []
+        missing: int = self.required_mask & ~mask
+        if missing:
+            invariant_violations.append((verification.REQUIRED_FIELDS_TEMPLATE, field_keys(missing)))
+        omitted_fields_present: int = mask & self.omitted_mask
+        if omitted_fields_present:
+            invariant_violations.append((verification.OMITTED_FIELDS_TEMPLATE, field_keys(omitted_fields_present)))
+        disallowed_fields_present: int = mask & self.disallowed_mask
+        if disallowed_fields_present:
+            invariant_violations.append((verification.DISALLOWED_FIELDS_TEMPLATE,
+                                         field_keys(disallowed_fields_present)))
+        templates = self._templates_by_mask[mask] = tuple(invariant_violations)
+        return templates
+
+    def violations(self, name: str, templates: Tuple[Tuple[str, List[str]], ...]) -> List[ViolationLike]:
+        """
+        Create the violations of the entry with the given name from the result of `violation_templates`.
+        """
+        return [Violation(template, name, self.entry_type, fields, rule=self.__name__)
+                for template, fields in templates]
+
+    def check_mask(self, entry: BibTeXEntry, mask: int) -> List[ViolationLike]:
+        """
+        Check an entry, given the bitmask of its fields (see `entry_field_mask`).
+        """
+        return self.violations(entry.name, self.violation_templates(mask))
+
+    def check_batch(self, batch: EntryBatch) -> List[List[ViolationLike]]:
+        """
+        Check all entries of a batch at once, using the shared column of their field bitmasks.
+        """
+        masks: List[int] = batch.column(entry_field_masks)
+        templates_by_mask: Dict[int, Tuple[Tuple[str, List[str]], ...]] = \
+            {mask: self.violation_templates(mask) for mask in set(masks)}
+        # The entries without violations share the same (never modified) empty list
+        no_violations: List[ViolationLike] = []
+        column: List[List[ViolationLike]] = [no_violations] * len(masks)
+        names: List[str] = batch.names
+        for index in itertools.compress(range(len(masks)), map(templates_by_mask.__getitem__, masks)):
+            column[index] = self.violations(names[index], templates_by_mask[masks[index]])
+        return column
+
+    def __call__(self, entry: BibTeXEntry) -> List[ViolationLike]:
+        return self.check_mask(entry, entry_field_mask(entry))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.entry_type!r})"
+
+
+def compile_field_rules(field_rules: FieldRules) -> List[FieldRule]:
+    """
+    Compile a declarative ruleset into one `FieldRule` per entry type, without registering them.
+
+    :raises ValueError: If an unknown kind of field set is declared, or a field set is not a list of field keys
+    """
+    compiled_rules: List[FieldRule] = []
+    for entry_type, field_sets in field_rules.items():
+        if not isinstance(field_sets, Mapping):
+            raise ValueError(f"The field sets of entry type '{entry_type}' must be a table with the kinds of field "
+                             f"sets as keys, not {field_sets!r}.")
+        unknown_kinds = set(field_sets) - set(FIELD_SET_KINDS)
+        if unknown_kinds:
+            raise ValueError(f"Unknown kind of field set for entry type '{entry_type}': "
+                             f"[{', '.join(sorted(unknown_kinds))}]. Use one of [{', '.join(FIELD_SET_KINDS)}].")
+        compiled_rules.append(FieldRule(
+            entry_type=entry_type,
+            required=_field_set(field_sets, "required", entry_type),
+            omitted=_field_set(field_sets, "omitted", entry_type),
+            disallowed=_field_set(field_sets, "disallowed", entry_type),
+        ))
+    return compiled_rules
+
+
+def _field_set(field_sets: Mapping[str, Any], kind: str, entry_type: str) -> List[str]:
+    """
+    Return the field keys of the given kind of field set, checking that they are a list of strings. A single string
+    would otherwise be taken as the list of its characters.
+    """
+    field_set: Any = field_sets.get(kind, ())
+    if isinstance(field_set, (str, bytes)) or not isinstance(field_set, Iterable):
+        raise ValueError(f"The {kind} fields of entry type '{entry_type}' must be a list of field keys, not "
+                         f"{field_set!r}.")
+    keys: List[Any] = list(field_set)
+    invalid_keys: List[Any] = [key for key in keys if not isinstance(key, str)]
+    if invalid_keys:
+        raise ValueError(f"The {kind} fields of entry type '{entry_type}' must be a list of field keys, but contain "
+                         f"{', '.join(map(repr, invalid_keys))}.")
+    return keys
+
+
+def register_field_rules(field_rules: FieldRules) -> List[FieldRule]:
+    """
+    Compile a declarative ruleset and register its rules, just like the `@linter_rule` decorator does.
+    """
+    compiled_rules: List[FieldRule] = compile_field_rules(field_rules)
+    for rule in compiled_rules:
+        linter_rule(entry_type=rule.entry_type)(rule)
+    return compiled_rules
+
+
+def registered_field_rules(ruleset: Optional[Ruleset] = None) -> List[FieldRule]:
+    """
+    Return the `FieldRule`s among the registered rules of the given ruleset (or of the default ruleset), in the order
+    they were registered.
+    """
+    rules = (ruleset if ruleset is not None else verification._default_ruleset).rules
+    return [rule for rule in rules if isinstance(rule, FieldRule)]
+
+
+def load_field_rules(file_path: str) -> List[FieldRule]:
+    """
+    Load a declarative ruleset from a TOML file with one table per entry type and register its rules:
+
+    ```
+    [article]
+    required = ["author", "title", "journal", "year"]
+    omitted = ["language", "url"]
+    ```
+    """
+    with open(file_path, "rb") as file:
+        field_rules = tomllib.load(file)
+    rules: List[FieldRule] = register_field_rules(field_rules)
+    verification.collecting_ruleset().add_source_files([file_path])
+    return rules
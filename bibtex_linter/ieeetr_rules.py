@@ -1,269 +1,97 @@
-from typing import List, Set
+from typing import List
 
+from bibtex_linter.declarative import FieldRules, register_field_rules
 from bibtex_linter.parser import BibTeXEntry
-from bibtex_linter.verification import (
-    linter_rule,
-    check_required_fields,
-    check_omitted_fields,
-)
-
-
-@linter_rule(entry_type="article")
-def check_article(entry: BibTeXEntry) -> List[str]:
-    """
-    Check that the required fields for `EntryType.ARTICLE` are there and that there are no fields present, that would
-    be omitted in the final compiled LaTeX documents.
-
-    :param entry: The BibTeXEntry
-    :return: A list of string descriptions of rule violations for this entry.
-    """
-    invariant_violations: List[str] = []
-    required_fields: Set[str] = {
-        "author",
-        "title",
-        "journal",
-        "year",
-    }
-    omitted_fields: Set[str] = {
-        "language",
-        "url",
-    }
-    invariant_violations.extend(check_required_fields(entry, required_fields))
-    invariant_violations.extend(check_omitted_fields(entry, omitted_fields))
-    return invariant_violations
-
-
-@linter_rule(entry_type="conference")
-def check_conference(entry: BibTeXEntry) -> List[str]:
-    """
-    Check that the required fields for `EntryType.CONFERENCE` are there and that there are no fields present, that would
-    be omitted in the final compiled LaTeX documents.
-
-    :param entry: The BibTeXEntry
-    :return: A list of string descriptions of rule violations for this entry.
-    """
-    invariant_violations: List[str] = []
-    required_fields: Set[str] = {
-        "author",
-        "title",
-        "booktitle",
-        "publisher",
-        "year",
-    }
-    omitted_fields: Set[str] = {
-        "intype",
-        "language",
-        "number",
-        "paper",
-        "type",
-        "url",
-    }
-    invariant_violations.extend(check_required_fields(entry, required_fields))
-    invariant_violations.extend(check_omitted_fields(entry, omitted_fields))
-    return invariant_violations
+from bibtex_linter.verification import linter_rule, ViolationLike
+
+
+# The required fields for each entry type, and the fields that would be omitted in the final compiled LaTeX documents.
+# The checks that need more than the presence of fields are defined as `@linter_rule`s below.
+FIELD_RULES: FieldRules = {
+    "article": {
+        "required": ["author", "title", "journal", "year"],
+        "omitted": ["language", "url"],
+    },
+    "conference": {
+        "required": ["author", "title", "booktitle", "publisher", "year"],
+        "omitted": ["intype", "language", "number", "paper", "type", "url"],
+    },
+    "online": {
+        "required": ["author", "title", "howpublished", "year", "note"],
+        "omitted": ["language", "organization", "address", "url"],
+    },
+    "book": {
+        "required": ["author", "title", "publisher", "year"],
+        "omitted": ["editor", "language", "volume", "number", "url"],
+    },
+    "inbook": {
+        "required": ["author", "title", "publisher", "year"],
+        "omitted": ["editor", "language", "number", "url"],
+    },
+    "incollection": {
+        "required": ["author", "title", "booktitle", "publisher", "year"],
+        "omitted": ["language", "number", "url"],
+    },
+    "standard": {
+        "required": ["author", "title", "howpublished", "year", "note"],
+        "omitted": ["language", "organization", "institution", "type", "number", "revision", "address", "url"],
+    },
+    "techreport": {
+        "required": ["author", "title", "institution", "year"],
+        "omitted": ["language", "howpublished", "url"],
+    },
+    "misc": {
+        "required": ["author", "title", "howpublished", "year"],
+        "omitted": ["language", "organization", "address", "pages", "url"],
+    },
+}
 
 
 @linter_rule(entry_type="online")
-def check_online(entry: BibTeXEntry) -> List[str]:
+def check_online(entry: BibTeXEntry) -> List[ViolationLike]:
     """
-    Check that the required fields for `EntryType.ONLINE` are there and that there are no fields present, that would
-    be omitted in the final compiled LaTeX documents.
+    Check that `EntryType.ONLINE` has a `note` field, which should contain the URL.
 
     :param entry: The BibTeXEntry
     :return: A list of string descriptions of rule violations for this entry.
     """
-    invariant_violations: List[str] = []
-    required_fields: Set[str] = {
-        "author",
-        "title",
-        "howpublished",
-        "year",
-        "note",
-    }
-    omitted_fields: Set[str] = {
-        "language",
-        "organization",
-        "address",
-        "url",
-    }
+    invariant_violations: List[ViolationLike] = []
     if "note" not in entry.fields.keys():
         invariant_violations.append(f"Entry '{entry.name}' is of type 'online' and needs a field 'note' with the URL.")
         # Todo: In the future, we could actually check that it contains an URL
-    invariant_violations.extend(check_required_fields(entry, required_fields))
-    invariant_violations.extend(check_omitted_fields(entry, omitted_fields))
-    return invariant_violations
-
-
-@linter_rule(entry_type="book")
-def check_book(entry: BibTeXEntry) -> List[str]:
-    """
-    Check that the required fields for `EntryType.BOOK` are there and that there are no fields present, that would
-    be omitted in the final compiled LaTeX documents.
-
-    :param entry: The BibTeXEntry
-    :return: A list of string descriptions of rule violations for this entry.
-    """
-    invariant_violations: List[str] = []
-    required_fields: Set[str] = {
-        "author",
-        "title",
-        "publisher",
-        "year",
-    }
-    omitted_fields: Set[str] = {
-        "editor",
-        "language",
-        "volume",
-        "number",
-        "url",
-    }
-    invariant_violations.extend(check_required_fields(entry, required_fields))
-    invariant_violations.extend(check_omitted_fields(entry, omitted_fields))
     return invariant_violations
 
 
 @linter_rule(entry_type="inbook")
-def check_in_book(entry: BibTeXEntry) -> List[str]:
+def check_in_book(entry: BibTeXEntry) -> List[ViolationLike]:
     """
-    Check that the required fields for `EntryType.IN_BOOK` are there and that there are no fields present, that would
-    be omitted in the final compiled LaTeX documents.
+    Check that `EntryType.IN_BOOK` specifies which part of the book is referenced.
 
     :param entry: The BibTeXEntry
     :return: A list of string descriptions of rule violations for this entry.
     """
-    invariant_violations: List[str] = []
-    required_fields: Set[str] = {
-        "author",
-        "title",
-        "publisher",
-        "year",
-    }
-    omitted_fields: Set[str] = {
-        "editor",
-        "language",
-        "number",
-        "url",
-    }
+    invariant_violations: List[ViolationLike] = []
     if "chapter" not in entry.fields.keys() or "pages" not in entry.fields.keys():
         invariant_violations.append(f"Entry {entry.name} needs to contain one of the "
                                     f"following fields: [chapter, pages].")
-    invariant_violations.extend(check_required_fields(entry, required_fields))
-    invariant_violations.extend(check_omitted_fields(entry, omitted_fields))
-    return invariant_violations
-
-
-@linter_rule(entry_type="incollection")
-def check_in_collection(entry: BibTeXEntry) -> List[str]:
-    """
-    Check that the required fields for `EntryType.IN_COLLECTION` are there and that there are no fields present, that
-    would be omitted in the final compiled LaTeX documents.
-
-    :param entry: The BibTeXEntry
-    :return: A list of string descriptions of rule violations for this entry.
-    """
-    invariant_violations: List[str] = []
-    required_fields: Set[str] = {
-        "author",
-        "title",
-        "booktitle",
-        "publisher",
-        "year",
-    }
-    omitted_fields: Set[str] = {
-        "language",
-        "number",
-        "url",
-    }
-    invariant_violations.extend(check_required_fields(entry, required_fields))
-    invariant_violations.extend(check_omitted_fields(entry, omitted_fields))
-    return invariant_violations
-
-
-@linter_rule(entry_type="standard")
-def check_standard(entry: BibTeXEntry) -> List[str]:
-    """
-    Check that the required fields for `EntryType.STANDARD` are there and that there are no fields present, that would
-    be omitted in the final compiled LaTeX documents.
-
-    :param entry: The BibTeXEntry
-    :return: A list of string descriptions of rule violations for this entry.
-    """
-    invariant_violations: List[str] = []
-    required_fields: Set[str] = {
-        "author",
-        "title",
-        "howpublished",
-        "year",
-        "note",
-    }
-    omitted_fields: Set[str] = {
-        "language",
-        "organization",
-        "institution",
-        "type",
-        "number",
-        "revision",
-        "address",
-        "url",
-    }
-    invariant_violations.extend(check_required_fields(entry, required_fields))
-    invariant_violations.extend(check_omitted_fields(entry, omitted_fields))
     return invariant_violations
 
 
 @linter_rule(entry_type="techreport")
-def check_tech_report(entry: BibTeXEntry) -> List[str]:
+def check_tech_report(entry: BibTeXEntry) -> List[ViolationLike]:
     """
-    Check that the required fields for `EntryType.TECH_REPORT` are there and that there are no fields present, that
-    would be omitted in the final compiled LaTeX documents.
+    Check that `EntryType.TECH_REPORT` does not use the `howpublished` field, which would not be rendered.
 
     :param entry: The BibTeXEntry
     :return: A list of string descriptions of rule violations for this entry.
     """
-    invariant_violations: List[str] = []
-    required_fields: Set[str] = {
-        "author",
-        "title",
-        "institution",
-        "year",
-    }
-    omitted_fields: Set[str] = {
-        "language",
-        "howpublished",
-        "url",
-    }
+    invariant_violations: List[ViolationLike] = []
     if "howpublished" in entry.fields.keys():
         invariant_violations.append(f"Entry {entry.name} is of type 'techreport', which does not render field "
                                     f"'howpublished'. Either use field 'institution' instead, or switch to a different "
                                     f"entry type completely.")
-    invariant_violations.extend(check_required_fields(entry, required_fields))
-    invariant_violations.extend(check_omitted_fields(entry, omitted_fields))
     return invariant_violations
 
 
-@linter_rule(entry_type="misc")
-def check_misc(entry: BibTeXEntry) -> List[str]:
-    """
-    Check that the required fields for `EntryType.MISC` are there and that there are no fields present, that would
-    be omitted in the final compiled LaTeX documents.
-
-    :param entry: The BibTeXEntry
-    :return: A list of string descriptions of rule violations for this entry.
-    """
-    invariant_violations: List[str] = []
-    required_fields: Set[str] = {
-        "author",
-        "title",
-        "howpublished",
-        "year",
-    }
-    omitted_fields: Set[str] = {
-        "language",
-        "organization",
-        "address",
-        "pages",
-        "url",
-    }
-    invariant_violations.extend(check_required_fields(entry, required_fields))
-    invariant_violations.extend(check_omitted_fields(entry, omitted_fields))
-    return invariant_violations
+# (Registered after the `@linter_rule`s above, to keep the order of the violation messages of each entry type)
+register_field_rules(FIELD_RULES)
@@ -1,18 +1,32 @@
-from typing import List, Set
+from typing import List
 import re
 
+from bibtex_linter.declarative import FieldRules, register_field_rules
 from bibtex_linter.parser import BibTeXEntry
 from bibtex_linter.verification import (
     linter_rule,
-    check_required_fields,
-    check_required_field,
-    check_omitted_fields,
-    check_disallowed_field,
+    disallowed_field_violations,
+    required_field_violations,
+    ViolationLike,
 )
 
 
+# The required fields for each entry type. The checks that need more than the presence of a set of fields are defined
+# as `@linter_rule`s below.
+FIELD_RULES: FieldRules = {
+    "article": {"required": ["author", "title", "journal", "year"]},
+    "conference": {"required": ["author", "title", "booktitle", "publisher", "year", "type"]},
+    "online": {"required": ["author", "title", "year", "howpublished"]},
+    "book": {"required": ["author", "title", "year", "publisher"]},
+    "inbook": {"required": ["author", "title", "year", "publisher"]},
+    "incollection": {"required": ["author", "title", "year", "booktitle", "publisher"]},
+    "standard": {"required": ["title", "organization", "type", "number", "year"]},
+    "misc": {"required": ["author", "title", "howpublished", "year"]},
+}
+
+
 @linter_rule(entry_type=None)
-def check_url_field(entry: BibTeXEntry) -> List[str]:
+def check_url_field(entry: BibTeXEntry) -> List[ViolationLike]:
     """
     Check that the `url` field is not set.
     Additionally, if the `note` field is set, check that it conforms to the following schema:
@@ -25,7 +39,7 @@ def check_url_field(entry: BibTeXEntry) -> List[str]:
     :param entry: The BibTeXEntry
     :return: A list of string descriptions of rule violations for this entry.
     """
-    invariant_violations: List[str] = []
+    invariant_violations: List[ViolationLike] = []
     if "url" in entry.fields.keys():
         invariant_violations.append(
             f"Entry '{entry.name}' contains the non-allowed field: [url]. "
@@ -44,59 +58,32 @@ def check_url_field(entry: BibTeXEntry) -> List[str]:
     return invariant_violations
 
 
-@linter_rule(entry_type="article")
-def check_article(entry: BibTeXEntry) -> List[str]:
-    """
-    Check that the article entry type contains the required fields.
-
-    :param entry: The BibTeXEntry
-    :return: A list of string descriptions of rule violations for this entry.
-    """
-    invariant_violations: List[str] = []
-    invariant_violations.extend(check_required_fields(
-        entry,
-        fields={
-            "author",
-            "title",
-            "journal",
-            "year"
-        }
-    ))
-    return invariant_violations
+# (Registered between the `@linter_rule`s for all and for specific entry types, to keep the order of the violation
+# messages of each entry type)
+register_field_rules(FIELD_RULES)
 
 
 @linter_rule(entry_type="conference")
-def check_conference(entry: BibTeXEntry) -> List[str]:
+def check_conference(entry: BibTeXEntry) -> List[ViolationLike]:
     """
-    Check that conference entry type contains all required fields.
+    Explain the required fields of the conference entry type (see `FIELD_RULES`) that are most often missing.
     Additionally, check that 'publisher' and 'organization' are not duplicates of each other.
 
     :param entry: The BibTeXEntry
     :return: A list of string descriptions of rule violations for this entry.
     """
-    invariant_violations: List[str] = []
-    invariant_violations.extend(check_required_fields(
-        entry,
-        fields={
-            "author",
-            "title",
-            "booktitle",
-            "publisher",
-            "year",
-            "type",
-        }
-    ))
-    invariant_violations.extend(check_required_field(
+    invariant_violations: List[ViolationLike] = []
+    invariant_violations.extend(required_field_violations(
         entry,
         field="booktitle",
         explanation="This should be the name of the conference.",
     ))
-    invariant_violations.extend(check_required_field(
+    invariant_violations.extend(required_field_violations(
         entry,
         field="publisher",
         explanation="This should be the company that published the proceedings.",
     ))
-    invariant_violations.extend(check_required_field(
+    invariant_violations.extend(required_field_violations(
         entry,
         field="type",
         explanation="This should describe the type of report/publication (e.g., “Conference Paper”).",
@@ -109,25 +96,16 @@ def check_conference(entry: BibTeXEntry) -> List[str]:
 
 
 @linter_rule(entry_type="online")
-def check_online(entry: BibTeXEntry) -> List[str]:
+def check_online(entry: BibTeXEntry) -> List[ViolationLike]:
     """
-    Check that online entry type contains all required fields.
+    Explain the required field `howpublished` of the online entry type (see `FIELD_RULES`).
     Additionally, check that 'author' and 'organization' are not duplicates of each other.
 
     :param entry: The BibTeXEntry
     :return: A list of string descriptions of rule violations for this entry.
     """
-    invariant_violations: List[str] = []
-    invariant_violations.extend(check_required_fields(
-        entry,
-        fields={
-            "author",
-            "title",
-            "year",
-            "howpublished",
-        }
-    ))
-    invariant_violations.extend(check_required_field(
+    invariant_violations: List[ViolationLike] = []
+    invariant_violations.extend(required_field_violations(
         entry,
         field="howpublished",
         explanation="This should be something like: 'White paper', 'Blog post', 'GitHub repository', etc.",
@@ -140,24 +118,15 @@ def check_online(entry: BibTeXEntry) -> List[str]:
 
 
 @linter_rule(entry_type="book")
-def check_book(entry: BibTeXEntry) -> List[str]:
+def check_book(entry: BibTeXEntry) -> List[ViolationLike]:
     """
-    Check that book entry type contains all required fields.
-    Additionally, check that 'publisher' and 'editor' are not duplicates of each other.
+    Check that 'publisher' and 'editor' of the book entry type are not duplicates of each other.
+    The required fields are checked via `FIELD_RULES`.
 
     :param entry: The BibTeXEntry
     :return: A list of string descriptions of rule violations for this entry.
     """
-    invariant_violations: List[str] = []
-    invariant_violations.extend(check_required_fields(
-        entry,
-        fields={
-            "author",
-            "title",
-            "year",
-            "publisher",
-        }
-    ))
+    invariant_violations: List[ViolationLike] = []
     if entry.fields.get("publisher") == entry.fields.get("editor"):
         invariant_violations.append(
             f"Entry '{entry.name}' fields [publisher] and [editor] are the same. Remove field [editor]."
@@ -166,30 +135,21 @@ def check_book(entry: BibTeXEntry) -> List[str]:
 
 
 @linter_rule(entry_type="inbook")
-def check_in_book(entry: BibTeXEntry) -> List[str]:
+def check_in_book(entry: BibTeXEntry) -> List[ViolationLike]:
     """
-    Check that inbook entry type contains all required fields.
+    Explain the required field `title` of the inbook entry type (see `FIELD_RULES`).
     Additionally check that the field `editor` is not present.
 
     :param entry: The BibTeXEntry
     :return: A list of string descriptions of rule violations for this entry.
     """
-    invariant_violations: List[str] = []
-    invariant_violations.extend(check_required_fields(
-        entry,
-        fields={
-            "author",
-            "title",
-            "year",
-            "publisher",
-        }
-    ))
-    invariant_violations.extend(check_required_field(
+    invariant_violations: List[ViolationLike] = []
+    invariant_violations.extend(required_field_violations(
         entry,
         field="title",
         explanation="This should be the title of the book.",
     ))
-    invariant_violations.extend(check_disallowed_field(
+    invariant_violations.extend(disallowed_field_violations(
         entry,
         field="editor",
         explanation="This field is not rendered in IEEEtran-style.",
@@ -198,27 +158,17 @@ def check_in_book(entry: BibTeXEntry) -> List[str]:
 
 
 @linter_rule(entry_type="incollection")
-def check_in_collection(entry: BibTeXEntry) -> List[str]:
+def check_in_collection(entry: BibTeXEntry) -> List[ViolationLike]:
     """
-    Check that incollection entry type contains all required fields.
-    Additionally, check that the field `type` is not set.
+    Check that the field `type` of the incollection entry type is not set.
     Furthermore, check that 'editor' and 'publisher' are not duplicates of each other.
+    The required fields are checked via `FIELD_RULES`.
 
     :param entry: The BibTeXEntry
     :return: A list of string descriptions of rule violations for this entry.
     """
-    invariant_violations: List[str] = []
-    invariant_violations.extend(check_required_fields(
-        entry,
-        fields={
-            "author",
-            "title",
-            "year",
-            "booktitle",
-            "publisher",
-        }
-    ))
-    invariant_violations.extend(check_disallowed_field(
+    invariant_violations: List[ViolationLike] = []
+    invariant_violations.extend(disallowed_field_violations(
         entry,
         field="type",
         explanation="If this field is set to (Article, Paper, Essay etc.), you should use a different entry type."
@@ -231,31 +181,21 @@ def check_in_collection(entry: BibTeXEntry) -> List[str]:
 
 
 @linter_rule(entry_type="standard")
-def check_standard(entry: BibTeXEntry) -> List[str]:
+def check_standard(entry: BibTeXEntry) -> List[ViolationLike]:
     """
-    Check that standard entry type contains all required fields.
+    Explain the required fields of the standard entry type (see `FIELD_RULES`) that are most often missing.
     Furthermore, check that 'author' and 'organization' are not duplicates of each other.
 
     :param entry: The BibTeXEntry
     :return: A list of string descriptions of rule violations for this entry.
     """
-    invariant_violations: List[str] = []
-    invariant_violations.extend(check_required_fields(
-        entry,
-        fields={
-            "title",
-            "organization",
-            "type",
-            "number",
-            "year",
-        }
-    ))
-    invariant_violations.extend(check_required_field(
+    invariant_violations: List[ViolationLike] = []
+    invariant_violations.extend(required_field_violations(
         entry,
         field="organization",
         explanation="This should be the issuing body or standards organization.",
     ))
-    invariant_violations.extend(check_required_field(
+    invariant_violations.extend(required_field_violations(
         entry,
         field="type",
         explanation="This should be something like "
@@ -269,7 +209,7 @@ def check_standard(entry: BibTeXEntry) -> List[str]:
 
 
 @linter_rule(entry_type="techreport")
-def check_tech_report(entry: BibTeXEntry) -> List[str]:
+def check_tech_report(entry: BibTeXEntry) -> List[ViolationLike]:
     """
     Disallow the use of the techreport entry type.
 
@@ -277,24 +217,3 @@ def check_tech_report(entry: BibTeXEntry) -> List[str]:
     :return: A list of string descriptions of rule violations for this entry.
     """
     return [f"Entry '{entry.name}' is of type 'TECHREPORT'. Please use a different entry type, such as 'STANDARD'."]
-
-
-@linter_rule(entry_type="misc")
-def check_misc(entry: BibTeXEntry) -> List[str]:
-    """
-    Check that misc entry type contains all required fields.
-
-    :param entry: The BibTeXEntry
-    :return: A list of string descriptions of rule violations for this entry.
-    """
-    invariant_violations: List[str] = []
-    invariant_violations.extend(check_required_fields(
-        entry,
-        fields={
-            "author",
-            "title",
-            "howpublished",
-            "year",
-        }
-    ))
-    return invariant_violations
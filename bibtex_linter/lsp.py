@@ -0,0 +1,438 @@
+"""
+This module implements a language server ([LSP](https://microsoft.github.io/language-server-protocol/)) for .bib
+files, which publishes the invariant violations as diagnostics while a file is being edited.
+
+The server is started via `bibtex_linter lsp` and speaks JSON-RPC over stdin and stdout. Apart from the lifecycle
+messages, it supports the (incremental) synchronization of text documents: `textDocument/didOpen`, `didChange` and
+`didClose`. The ruleset is given via `--ruleset` or as `{"ruleset": ...}` in the `initializationOptions`.
+
+Each open document keeps its entries together with their diagnostics, see `BibDocument`. On a change, only the entries
+touched by the edited range are tokenized and verified again: Tokenizing starts at the end of the last entry before
+the edit and stops at the first entry after the edit, that starts at the same (shifted) offset with the same text as
+before, since everything from there on is tokenized exactly as before. The entries after the edit keep their
+diagnostics, only their offsets and line numbers are shifted.
+"""
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Sequence, Tuple
+import argparse
+import bisect
+import dataclasses
+import json
+import sys
+
+from bibtex_linter.parser import BibTeXEntry, EntryToken, tokenize
+from bibtex_linter.rulesets import create_ruleset
+from bibtex_linter.verification import SEVERITY_WARNING, Ruleset, Violation, ViolationLike
+
+# The `source` of the diagnostics
+DIAGNOSTIC_SOURCE: str = "bibtex_linter"
+
+# The constants of the protocol
+_DIAGNOSTIC_ERROR: int = 1
+_DIAGNOSTIC_WARNING: int = 2
+_MESSAGE_ERROR: int = 1
+_TEXT_DOCUMENT_SYNC_INCREMENTAL: int = 2
+_PARSE_ERROR: int = -32700
+_METHOD_NOT_FOUND: int = -32601
+_INTERNAL_ERROR: int = -32603
+
+
+def _utf16_length(text: str) -> int:
+    """
+    The length of the text in UTF-16 code units, in which the protocol counts the columns.
+    """
+    return len(text) if text.isascii() else len(text.encode("utf-16-le")) // 2
+
+
+def _utf16_index(line: str, column: int) -> int:
+    """
+    The index of the character in `line` at the given column in UTF-16 code units.
+    """
+    if line.isascii():
+        return min(column, len(line))
+    index: int = 0
+    while column > 0 and index < len(line):
+        column -= 2 if ord(line[index]) > 0xFFFF else 1
+        index += 1
+    return index
+
+
+def _relative_position(text: str, offset: int) -> Tuple[int, int]:
+    """
+    The line (counted from the first line of `text`) and column of an offset in `text`.
+    """
+    line_start: int = text.rfind("\n", 0, offset) + 1
+    return text.count("\n", 0, offset), _utf16_length(text[line_start:offset])
+
+
+@dataclasses.dataclass(slots=True)
+class EntryDiagnostic:
+    """
+    A diagnostic of an entry, with its range relative to the entry, so that it stays valid when the entry moves.
+
+    :ivar start: The line (relative to the line of the entry) and column of the start. On the first line of the
+        entry, the column is relative to the start of the entry.
+    :ivar end: The line and column of the end, like `start`
+    :ivar severity: The severity, as defined by the protocol
+    :ivar message: The message of the violation
+    :ivar rule: The rule that found the violation, if known
+    """
+    start: Tuple[int, int]
+    end: Tuple[int, int]
+    severity: int
+    message: str
+    rule: Optional[str]
+
+
+def entry_diagnostics(token: EntryToken, violations: Sequence[ViolationLike]) -> List[EntryDiagnostic]:
+    """
+    Locate the violations of an entry. A violation about fields of the entry points to the first of these fields
+    present in the entry (from its key to the end of its value), any other violation points to the name of the entry.
+    """
+    text: str = token.text
+    name_start: int = text.find(token.name, text.find("{"))
+    name_span: Tuple[int, int] = (name_start, name_start + len(token.name))
+    field_spans: Dict[str, Tuple[int, int]] = {}
+    lowered_text: str = text.lower()
+    previous_end: int = name_span[1]
+    for key, value_start, value_end in token.fields:
+        if key not in field_spans:
+            key_start: int = lowered_text.rfind(key, previous_end, value_start)
+            field_spans[key] = (key_start if key_start != -1 else value_start, value_end)
+        previous_end = value_end
+
+    diagnostics: List[EntryDiagnostic] = []
+    for violation in violations:
+        span: Tuple[int, int] = name_span
+        severity: int = _DIAGNOSTIC_ERROR
+        rule: Optional[str] = None
+        if isinstance(violation, Violation):
+            span = next((field_spans[field] for field in sorted(violation.fields) if field in field_spans), name_span)
+            if violation.severity == SEVERITY_WARNING:
+                severity = _DIAGNOSTIC_WARNING
+            rule = violation.rule
+        diagnostics.append(EntryDiagnostic(start=_relative_position(text, span[0]),
+                                           end=_relative_position(text, span[1]),
+                                           severity=severity, message=str(violation), rule=rule))
+    return diagnostics
+
+
+@dataclasses.dataclass(slots=True)
+class DocumentEntry:
+    """
+    An entry of a `BibDocument`.
+
+    :ivar offset: The offset of the entry (its `@`) in the document
+    :ivar line: The line of the entry (its `@`) in the document, starting at `0`
+    :ivar text: The raw text of the entry, see `EntryToken.text`
+    :ivar diagnostics: The diagnostics of the entry
+    :ivar closed: Whether the entry is closed, see `EntryToken.closed`
+    """
+    offset: int
+    line: int
+    text: str
+    diagnostics: List[EntryDiagnostic]
+    closed: bool = True
+
+    @property
+    def end(self) -> int:
+        return self.offset + len(self.text)
+
+
+def _entry_end(entry: DocumentEntry) -> int:
+    return entry.end
+
+
+def _entry_line(entry: DocumentEntry) -> int:
+    return entry.line
+
+
+class BibDocument:
+    """
+    An open .bib document, whose entries are tokenized and verified again only where the document changed.
+
+    :param text: The content of the document
+    :param ruleset: The ruleset to verify the entries with
+    :ivar number_of_verified_entries: The number of entries that were verified by the last change
+    """
+    def __init__(self, text: str, ruleset: Ruleset):
+        self.ruleset: Ruleset = ruleset
+        self.text: str = ""
+        self.entries: List[DocumentEntry] = []
+        self.number_of_verified_entries: int = 0
+        self.replace(0, 0, text)
+
+    def replace(self, start: int, end: int, new_text: str) -> None:
+        """
+        Replace the text between the offsets `start` and `end` by `new_text`.
+        """
+        old_text: str = self.text
+        offset_delta: int = len(new_text) - (end - start)
+        line_delta: int = new_text.count("\n") - old_text.count("\n", start, end)
+        text: str = old_text[:start] + new_text + old_text[end:]
+        self.text = text
+
+        # The entries that end before the edit stay as they are, except for an entry that is not closed, since the
+        # edit could close it
+        first: int = bisect.bisect_right(self.entries, start, key=_entry_end)
+        first = next((index for index in range(first) if not self.entries[index].closed), first)
+        position: int = self.entries[first - 1].end if first else 0
+        line: int = self.entries[first - 1].line if first else 0
+        line_position: int = self.entries[first - 1].offset if first else 0
+        # The first entry after the edit that is tokenized exactly as before, and all following ones, are kept
+        kept: int = len(self.entries)
+        old_index: int = first
+        new_entries: List[DocumentEntry] = []
+        for token in tokenize(text, start=position):
+            if token.offset >= start + len(new_text):
+                old_offset: int = token.offset - offset_delta
+                while old_index < len(self.entries) and self.entries[old_index].offset < old_offset:
+                    old_index += 1
+                if old_index < len(self.entries) and self.entries[old_index].offset == old_offset and \
+                        self.entries[old_index].text == token.text:
+                    kept = old_index
+                    break
+            line += text.count("\n", line_position, token.offset)
+            line_position = token.offset
+            new_entries.append(self._verify(token, line))
+
+        if offset_delta or line_delta:
+            for entry in self.entries[kept:]:
+                entry.offset += offset_delta
+                entry.line += line_delta
+        self.entries[first:kept] = new_entries
+        self.number_of_verified_entries = len(new_entries)
+
+    def change(self, changes: Iterable[Dict[str, Any]]) -> None:
+        """
+        Apply the `contentChanges` of a `textDocument/didChange` notification, one after another. A change without a
+        range replaces the whole text.
+        """
+        for change in changes:
+            change_range: Optional[Dict[str, Any]] = change.get("range")
+            if change_range is None:
+                self.entries = []
+                self.replace(0, len(self.text), change["text"])
+            else:
+                self.replace(self.offset_at(change_range["start"]), self.offset_at(change_range["end"]),
+                             change["text"])
+
+    def offset_at(self, position: Dict[str, int]) -> int:
+        """
+        The offset of a position of the protocol (a line and a column in UTF-16 code units) in the text.
+        """
+        line: int = position["line"]
+        # Start at the line of the last entry before the position, so that only a few lines need to be skipped
+        index: int = bisect.bisect_right(self.entries, line, key=_entry_line) - 1
+        current_line: int = self.entries[index].line if index >= 0 else 0
+        line_start: int = self.text.rfind("\n", 0, self.entries[index].offset) + 1 if index >= 0 else 0
+        while current_line < line:
+            newline: int = self.text.find("\n", line_start)
+            if newline == -1:
+                return len(self.text)
+            line_start = newline + 1
+            current_line += 1
+        line_end: int = self.text.find("\n", line_start)
+        if line_end == -1:
+            line_end = len(self.text)
+        return line_start + _utf16_index(self.text[line_start:line_end], position["character"])
+
+    def diagnostics(self) -> List[Dict[str, Any]]:
+        """
+        The diagnostics of all entries, as published via `textDocument/publishDiagnostics`.
+        """
+        diagnostics: List[Dict[str, Any]] = []
+        for entry in self.entries:
+            if not entry.diagnostics:
+                continue
+            column: int = _utf16_length(self.text[self.text.rfind("\n", 0, entry.offset) + 1:entry.offset])
+            for diagnostic in entry.diagnostics:
+                lsp_diagnostic: Dict[str, Any] = {
+                    "range": {
+                        "start": _absolute_position(entry.line, column, diagnostic.start),
+                        "end": _absolute_position(entry.line, column, diagnostic.end),
+                    },
+                    "severity": diagnostic.severity,
+                    "source": DIAGNOSTIC_SOURCE,
+                    "message": diagnostic.message,
+                }
+                if diagnostic.rule is not None:
+                    lsp_diagnostic["code"] = diagnostic.rule
+                diagnostics.append(lsp_diagnostic)
+        return diagnostics
+
+    def _verify(self, token: EntryToken, line: int) -> DocumentEntry:
+        entry: BibTeXEntry = BibTeXEntry.from_token(token, strip_lines=True, lazy=True)
+        violations: List[ViolationLike] = self.ruleset.verify(entry)
+        return DocumentEntry(offset=token.offset, line=line, text=token.text,
+                             diagnostics=entry_diagnostics(token, violations) if violations else [],
+                             closed=token.closed)
+
+
+def _absolute_position(entry_line: int, entry_column: int, position: Tuple[int, int]) -> Dict[str, int]:
+    line, column = position
+    return {"line": entry_line + line, "character": column + entry_column if line == 0 else column}
+
+
+def read_message(stream: BinaryIO) -> Optional[Dict[str, Any]]:
+    """
+    Read a message of the protocol, which consists of a header with its `Content-Length` and the JSON content.
+
+    An invalid message is read completely (as far as its length is known) before the error is raised, so that the next
+    message can still be read afterwards.
+
+    :return: The message, or `None` at the end of the stream
+    :raises ValueError: If the header has no valid `Content-Length`, or the content is not a JSON object
+    """
+    content_length: Optional[int] = None
+    # Whether any header was read, so that empty lines before the header are skipped
+    has_header: bool = False
+    # The error of an invalid header, raised once the whole header is read
+    header_error: Optional[str] = None
+    while True:
+        header: bytes = stream.readline()
+        if not header:
+            return None
+        header = header.strip()
+        if not header:
+            if has_header:
+                break
+            continue
+        has_header = True
+        name, _, value = header.decode("ascii", errors="replace").partition(":")
+        if name.strip().lower() == "content-length":
+            value = value.strip()
+            if value.isdigit():
+                content_length = int(value)
+            else:
+                header_error = f"Invalid Content-Length: {value!r}"
+    if header_error is not None:
+        raise ValueError(header_error)
+    if content_length is None:
+        raise ValueError("The header of the message has no Content-Length.")
+    message: Any = json.loads(stream.read(content_length).decode("utf-8"))
+    if not isinstance(message, dict):
+        raise ValueError("The message is not a JSON object.")
+    return message
+
+
+def write_message(stream: BinaryIO, message: Dict[str, Any]) -> None:
+    content: bytes = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    stream.write(b"Content-Length: %d\r\n\r\n%s" % (len(content), content))
+    stream.flush()
+
+
+class LanguageServer:
+    """
+    Handle the messages of the protocol, see the module documentation.
+
+    :param output: The stream to write the responses and notifications to
+    :param ruleset: The ruleset to verify the entries with, see `rulesets.create_ruleset`
+    """
+    def __init__(self, output: BinaryIO, ruleset: Optional[str] = None):
+        self.output: BinaryIO = output
+        self.ruleset: Optional[str] = ruleset
+        self.documents: Dict[str, BibDocument] = {}
+        self.running: bool = True
+        self.shut_down: bool = False
+
+    def handle(self, message: Dict[str, Any]) -> None:
+        """
+        Handle a request or notification of the client. Errors are reported to the client instead of being raised.
+        """
+        method: Optional[str] = message.get("method")
+        if method is None:
+            # A response to a request of the server, which never sends any
+            return
+        is_request: bool = "id" in message
+        params: Dict[str, Any] = message.get("params") or {}
+        try:
+            if method == "initialize":
+                options: Any = params.get("initializationOptions")
+                if isinstance(options, dict) and options.get("ruleset"):
+                    self.ruleset = options["ruleset"]
+                result: Any = {
+                    "capabilities": {
+                        "textDocumentSync": {"openClose": True, "change": _TEXT_DOCUMENT_SYNC_INCREMENTAL},
+                    },
+                    "serverInfo": {"name": "bibtex_linter"},
+                }
+            elif method == "shutdown":
+                self.shut_down = True
+                result = None
+            elif method == "exit":
+                self.running = False
+                return
+            elif method == "textDocument/didOpen":
+                document: Dict[str, Any] = params["textDocument"]
+                self.documents[document["uri"]] = BibDocument(document["text"], create_ruleset(self.ruleset))
+                self.publish_diagnostics(document["uri"])
+                return
+            elif method == "textDocument/didChange":
+                uri: str = params["textDocument"]["uri"]
+                self.documents[uri].change(params["contentChanges"])
+                self.publish_diagnostics(uri)
+                return
+            elif method == "textDocument/didClose":
+                uri = params["textDocument"]["uri"]
+                self.documents.pop(uri, None)
+                self.publish_diagnostics(uri)
+                return
+            elif is_request:
+                write_message(self.output, {"jsonrpc": "2.0", "id": message["id"], "error": {
+                    "code": _METHOD_NOT_FOUND, "message": f"Method not found: {method}"}})
+                return
+            else:
+                return
+        except Exception as error:
+            # Neither a broken ruleset nor an unexpected message must take the server down
+            if is_request:
+                write_message(self.output, {"jsonrpc": "2.0", "id": message["id"], "error": {
+                    "code": _INTERNAL_ERROR, "message": f"{error.__class__.__name__}: {error}"}})
+            else:
+                write_message(self.output, {"jsonrpc": "2.0", "method": "window/logMessage", "params": {
+                    "type": _MESSAGE_ERROR, "message": f"{method} failed: {error.__class__.__name__}: {error}"}})
+            return
+        write_message(self.output, {"jsonrpc": "2.0", "id": message["id"], "result": result})
+
+    def publish_diagnostics(self, uri: str) -> None:
+        document: Optional[BibDocument] = self.documents.get(uri)
+        write_message(self.output, {"jsonrpc": "2.0", "method": "textDocument/publishDiagnostics", "params": {
+            "uri": uri, "diagnostics": document.diagnostics() if document is not None else []}})
+
+    def serve(self, input_stream: BinaryIO) -> None:
+        """
+        Handle the messages read from `input_stream`, until it ends or the client sends `exit`.
+        """
+        while self.running:
+            try:
+                message: Optional[Dict[str, Any]] = read_message(input_stream)
+            except ValueError as error:
+                # The id of the request is unknown, the client just learns that one of its messages was lost
+                write_message(self.output, {"jsonrpc": "2.0", "id": None, "error": {
+                    "code": _PARSE_ERROR, "message": f"Parse error: {error}"}})
+                continue
+            if message is None:
+                return
+            self.handle(message)
+
+
+def main(arguments: Optional[List[str]] = None) -> None:
+    """
+    The entry point of `bibtex_linter lsp`.
+    """
+    parser = argparse.ArgumentParser(prog="bibtex_linter lsp",
+                                     description="Run a language server, that checks .bib files while they are edited.")
+    parser.add_argument("-r", "--ruleset",
+                        type=str,
+                        default=None,
+                        help="Name (ieeetr, IEEEtran) of or path to the ruleset. If left empty, the default ruleset "
+                             "(ieeetr) is used.")
+    args = parser.parse_args(arguments)
+    server = LanguageServer(sys.stdout.buffer, args.ruleset)
+    server.serve(sys.stdin.buffer)
+    # As required by the protocol, the exit code tells whether the client shut the server down before
+    sys.exit(0 if server.shut_down else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,77 +1,604 @@
-from typing import List
+from typing import TYPE_CHECKING, AbstractSet, Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, \
+    Set, TextIO, Tuple
 import argparse
-import importlib.util
+import datetime
+import glob
+import json
+import os
 import sys
 
-from bibtex_linter.verification import verify
-from bibtex_linter.parser import BibTeXEntry, parse_bibtex_file
+from bibtex_linter.citations import find_citations
+from bibtex_linter.declarative import FieldRule, registered_field_rules
+from bibtex_linter.verification import EntryResult, Ruleset, ViolationLike
+# `import_from_path` is imported for backwards compatibility, since it used to live in this module
+from bibtex_linter.rulesets import BUILTIN_RULESETS, create_ruleset, import_from_path, load_ruleset, \
+    verify_file_with_rulesets
 
+# The modules of the optional features (the servers, the parallel verification, profiling, ...) are only imported when
+# they are used, so that a plain check does not pay for importing them.
+if TYPE_CHECKING:
+    from bibtex_linter.analysis import FieldRuleReport
+    from bibtex_linter.cache import ResultCache
+    from bibtex_linter.output import ResultWriter
+    from bibtex_linter.profiling import Profiler
 
-def import_from_path(file_path: str) -> None:
+# The exit codes of the linter. When checking multiple files, the highest exit code of all files is used.
+EXIT_SUCCESS: int = 0
+EXIT_VIOLATIONS: int = 1
+EXIT_UNREADABLE_FILE: int = 2
+
+
+def find_bib_files(paths: Iterable[str]) -> List[str]:
+    """
+    Expand the given paths into a list of .bib files.
+
+    Directories are searched recursively for `*.bib` files and glob patterns (e.g. `papers/*/refs.bib`) are expanded.
+    All other paths are kept as they are, even if they do not exist, so that this can be reported later on.
+    Each file is only contained once, in the order it was first found.
+    """
+    files: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            matches: List[str] = sorted(glob.glob(os.path.join(glob.escape(path), "**", "*.bib"), recursive=True))
+        elif any(character in path for character in "*?["):
+            matches = sorted(glob.glob(path, recursive=True))
+        else:
+            matches = [path]
+        for match in matches:
+            if match not in files:
+                files.append(match)
+    return files
+
+
+def split_ruleset_argument(paths: List[str]) -> Tuple[List[str], Optional[str]]:
+    """
+    For backwards compatibility, the ruleset can still be given as the last positional argument
+    (`bibtex_linter refs.bib IEEEtran`).
+    Split it from the paths, if it is the name of a shipped ruleset, a `.py` or a `.toml` file.
+    """
+    if len(paths) > 1 and (paths[-1] in BUILTIN_RULESETS or paths[-1].endswith((".py", ".toml"))):
+        return paths[:-1], paths[-1]
+    return paths, None
+
+
+def print_results(results: Iterable[EntryResult],
+                  count_only: bool = False,
+                  max_violations: Optional[int] = None,
+                  fail_fast: bool = False,
+                  writer: Optional["ResultWriter"] = None,
+                  filename: str = "") -> Tuple[int, int]:
+    """
+    Print the invariant violations of all entries that failed verification.
+
+    The `results` are consumed lazily, so stopping early also stops parsing and verifying the remaining entries.
+
+    :param results: The results to print
+    :param count_only: If `True`, only count the entries and violations, without formatting or printing them
+    :param max_violations: If given, stop after this many invariant violations. Further violations of the last entry
+        are not printed or counted.
+    :param fail_fast: If `True`, stop after the first entry that failed verification
+    :param writer: The writer of the results. If `None`, the results are written as text to `sys.stdout`.
+    :param filename: The file the results belong to, passed on to the `writer`
+    :return: The number of entries and the total number of invariant violations
+    """
+    total_number_of_violations: int = 0
+    number_of_entries: int = 0
+    result_writer: "ResultWriter"
+    if writer is not None:
+        result_writer = writer
+    else:
+        from bibtex_linter.output import TextWriter
+        result_writer = TextWriter(sys.stdout)
+
+    try:
+        for result in results:
+            number_of_entries += 1
+            violations: List[ViolationLike] = result.violations
+            if max_violations is not None and violations:
+                violations = violations[:max_violations - total_number_of_violations]
+            total_number_of_violations += len(violations)
+            if not count_only:
+                result_writer.write_result(filename, result, violations)
+            if violations and (fail_fast or (max_violations is not None and
+                                             total_number_of_violations >= max_violations)):
+                break
+    finally:
+        if writer is None:
+            result_writer.flush()
+
+    return number_of_entries, total_number_of_violations
+
+
+def with_ruleset_name(results_per_file: Iterator[Tuple[str, Iterator[EntryResult]]],
+                      ruleset_name: Optional[str] = None) -> Iterator[Tuple[str, Optional[str], Iterator[EntryResult]]]:
     """
-    Import a given module using its path.
+    Add the name of the ruleset to the results of each file. Closing this iterator also closes `results_per_file`.
     """
-    # (2025-04-24, s-heppner)
-    # This is taken directly from the importlib documentation:
-    # https://docs.python.org/3/library/importlib.html#importing-a-source-file-directly
-    # It seems a bit cursed, but I guess as long as it works and really only used on known and safe `rules.py`...
-    module_name: str = "ruleset"
-    spec = importlib.util.spec_from_file_location(module_name, file_path)
-    if not spec or not spec.loader:
-        raise ImportError(f"Could not import ruleset from '{file_path}'.")
-    module = importlib.util.module_from_spec(spec)
-    sys.modules[module_name] = module
-    spec.loader.exec_module(module)
+    try:
+        for filename, results in results_per_file:
+            yield filename, ruleset_name, results
+    finally:
+        close_iterator(results_per_file)
+
+
+def verify_files_with_rulesets(files: Iterable[str], rulesets: Sequence[Ruleset],
+                               names: Optional[AbstractSet[str]] = None
+                               ) -> Iterator[Tuple[str, Optional[str], Iterator[EntryResult]]]:
+    """
+    Parse each file only once and verify its entries with each of the rulesets, see `verify_file_with_rulesets`.
+    """
+    for filename in files:
+        for ruleset, results in zip(rulesets, verify_file_with_rulesets(filename, rulesets, names)):
+            yield filename, ruleset.name, results
+
+
+def with_duplicates(results_per_file: Iterator[Tuple[str, Optional[str], Iterator[EntryResult]]],
+                    similarity: Optional[float] = None,
+                    names: Optional[AbstractSet[str]] = None
+                    ) -> Iterator[Tuple[str, Optional[str], Iterator[EntryResult]]]:
+    """
+    Add the results of the duplicate detection (see `duplicates.find_duplicates_in_file`) after the results of each
+    file, under the name `duplicates.DUPLICATES_RULE`. Closing this iterator also closes `results_per_file`.
+
+    :param similarity: See `duplicates.find_duplicates_in_file`. If `None`, the `duplicates.DEFAULT_SIMILARITY` is used.
+    """
+    from bibtex_linter.duplicates import DEFAULT_SIMILARITY, DUPLICATES_RULE, find_duplicates_in_file
+    if similarity is None:
+        similarity = DEFAULT_SIMILARITY
+    previous_filename: Optional[str] = None
+    try:
+        for filename, ruleset_name, results in results_per_file:
+            if previous_filename is not None and filename != previous_filename:
+                yield previous_filename, DUPLICATES_RULE, find_duplicates_in_file(previous_filename, similarity, names)
+            previous_filename = filename
+            yield filename, ruleset_name, results
+        if previous_filename is not None:
+            yield previous_filename, DUPLICATES_RULE, find_duplicates_in_file(previous_filename, similarity, names)
+    finally:
+        close_iterator(results_per_file)
+
+
+def recording_names(results: Iterator[EntryResult], names: Set[str]) -> Iterator[EntryResult]:
+    """
+    Add the casefolded name of each entry to `names`, while iterating over the `results`. Closing this iterator also
+    closes `results`.
+    """
+    try:
+        for result in results:
+            names.add(result.name.casefold())
+            yield result
+    finally:
+        close_iterator(results)
+
+
+def verify_file_on_server(filename: str, ruleset: Optional[str],
+                          socket_path: Optional[str] = None) -> Iterator[EntryResult]:
+    """
+    Let the running lint server (see `daemon`) verify the file.
+
+    :raises OSError: If the server could not read the file or verify its entries, or is not running anymore
+    """
+    from bibtex_linter.daemon import request as server_request, result_from_json
+    if ruleset is not None and ruleset not in BUILTIN_RULESETS:
+        # The server resolves the paths relative to its own working directory
+        ruleset = os.path.abspath(ruleset)
+    answer: Optional[Dict[str, Any]] = server_request({"path": os.path.abspath(filename), "ruleset": ruleset},
+                                                      socket_path)
+    if answer is None:
+        raise OSError("The lint server is not running anymore.")
+    if not answer["ok"]:
+        raise OSError(answer["error"])
+    for result in answer["results"]:
+        yield result_from_json(result)
+
+
+def close_iterator(iterator: Iterator[Any]) -> None:
+    """
+    Close the iterator, if it is a generator, so that it releases its open files or worker processes right away.
+    """
+    close = getattr(iterator, "close", None)
+    if close is not None:
+        close()
+
+
+def print_watch_results(filename: str, results: List[EntryResult], number_of_verified_entries: int) -> None:
+    """
+    Print the results of a file in watch mode, after it has been verified again.
+    """
+    timestamp: str = datetime.datetime.now().strftime("%H:%M:%S")
+    print(f"\n\n[{timestamp}] Checked '{filename}', verified {number_of_verified_entries} new or changed "
+          f"of {len(results)} entries.")
+    number_of_entries, total_number_of_violations = print_results(results)
+    print(f"\nFound {total_number_of_violations} invariant violation(s) in {number_of_entries} entries.")
+    if not total_number_of_violations:
+        print("All entries passed verification.")
+    sys.stdout.flush()
+
+
+def print_field_rule_reports(reports: Iterable["FieldRuleReport"], number_of_entries: int) -> int:
+    """
+    Print how many entries of each entry type violate the declarative field rules, see `analysis.field_rule_reports`.
+
+    :return: The number of entry types with violations
+    """
+    number_of_entry_types_with_violations: int = 0
+    for report in reports:
+        if not report.has_violations:
+            continue
+        number_of_entry_types_with_violations += 1
+        print(f"\nEntry type '{report.entry_type}' ({report.number_of_entries} entries):")
+        for description, counts in (("Missing required fields", report.missing),
+                                    ("Fields present that would be omitted", report.omitted),
+                                    ("Disallowed fields present", report.disallowed)):
+            if counts:
+                print(f"  ❌ {description}: "
+                      f"{', '.join(f'{key} ({count})' for key, count in sorted(counts.items()))}")
+    print(f"\n\nFound violations of the field rules in {number_of_entry_types_with_violations} entry type(s) of "
+          f"{number_of_entries} entries.")
+    return number_of_entry_types_with_violations
 
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Verify a .bib file using a set of defined rules.")
-    parser.add_argument("filepath", type=str, help="Path to the .bib file to verify")
-    parser.add_argument("ruleset",
+    if sys.argv[1:2] == ["serve"]:
+        from bibtex_linter.daemon import main as serve
+        serve(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["lsp"]:
+        from bibtex_linter.lsp import main as serve_language_server
+        serve_language_server(sys.argv[2:])
+        return
+
+    # The defaults of the options
+    from bibtex_linter.cache import DEFAULT_CACHE_DIRECTORY
+    from bibtex_linter.duplicates import DEFAULT_SIMILARITY
+    from bibtex_linter.output import WRITERS
+    from bibtex_linter.watch import DEFAULT_INTERVAL
+
+    parser = argparse.ArgumentParser(description="Verify .bib files using a set of defined rules.")
+    parser.add_argument("paths",
+                        type=str,
+                        nargs="+",
+                        help="Paths to the .bib files to verify. Directories are searched recursively for .bib files "
+                             "and glob patterns are expanded. For backwards compatibility, the last argument can also "
+                             "be the ruleset (see --ruleset), if it is the name of a shipped ruleset, a .py or a .toml "
+                             "file.")
+    parser.add_argument("-r", "--ruleset",
                         type=str,
-                        nargs="?",
+                        action="append",
                         default=None,
                         help="Name (ieeetr, IEEEtran) of or path to the rules.py that define the rules. "
+                             "A rules.toml declares the required, omitted and disallowed fields per entry type. "
                              "If left empty, the default ruleset (ieeetr) is used. "
+                             "Can be given multiple times, to check each file against several rulesets while parsing "
+                             "it only once (unless it is larger than 16 MiB). The results are reported per ruleset. "
                              "WARNING: Executes the Python code inside rules.py, so be sure that it's safe! "
                              "See https://github.com/s-heppner/python-bibtex-linter for more information.")
+    parser.add_argument("-j", "--jobs",
+                        type=int,
+                        default=1,
+                        help="Number of processes used to parse and verify the files. "
+                             "Use 0 for one process per CPU. Defaults to 1.")
+    parser.add_argument("--threads",
+                        action="store_true",
+                        help="Use threads instead of processes for --jobs. This only speeds up the checks on "
+                             "free-threaded builds of Python (3.13t and later), where it avoids loading the ruleset "
+                             "in each process.")
+    parser.add_argument("--no-cache",
+                        action="store_true",
+                        help="Do not reuse or store the verification results of unchanged entries.")
+    parser.add_argument("--cache-dir",
+                        type=str,
+                        default=DEFAULT_CACHE_DIRECTORY,
+                        help=f"Directory of the result cache. Defaults to '{DEFAULT_CACHE_DIRECTORY}'.")
+    parser.add_argument("--watch",
+                        action="store_true",
+                        help="Keep running and verify the files again whenever they change. "
+                             "Only new or changed entries are verified again.")
+    parser.add_argument("--watch-interval",
+                        type=float,
+                        default=DEFAULT_INTERVAL,
+                        help=f"Seconds between two checks for changes in watch mode. Defaults to {DEFAULT_INTERVAL}.")
+    parser.add_argument("--report",
+                        action="store_true",
+                        help="Instead of the violations of each entry, report how many entries of each entry type "
+                             "violate the declarative field rules of the ruleset, per field. Other rules are not "
+                             "checked. Needs NumPy (pip install bibtex_linter[analysis]).")
+    parser.add_argument("--profile",
+                        action="store_true",
+                        help="Measure the time of each rule (per entry type), as well as the parse and verification "
+                             "time, and print them as a table. The files are verified in a single process without "
+                             "the result cache.")
+    parser.add_argument("--profile-json",
+                        type=str,
+                        default=None,
+                        metavar="FILE",
+                        help="Like --profile, but write the measurements as JSON to FILE.")
+    parser.add_argument("--fail-fast",
+                        action="store_true",
+                        help="Stop at the first entry that fails verification. The remaining entries and files are "
+                             "neither parsed nor verified.")
+    parser.add_argument("--max-violations",
+                        type=int,
+                        default=None,
+                        metavar="N",
+                        help="Stop after N invariant violations. The remaining entries and files are neither parsed "
+                             "nor verified.")
+    parser.add_argument("--format",
+                        choices=list(WRITERS),
+                        default="text",
+                        help="Output format of the results: text (default), jsonl (one JSON object per violation), "
+                             "sarif (SARIF 2.1.0, e.g. for code scanning) or junit (JUnit XML). With a format other "
+                             "than text, the messages and the summary are written to stderr, so that stdout only "
+                             "contains the results.")
+    parser.add_argument("--count-only",
+                        action="store_true",
+                        help="Do not print the individual invariant violations, only the number of violations and "
+                             "the exit code.")
+    parser.add_argument("--duplicates",
+                        action="store_true",
+                        help="Also check each file for entries with the same key, title or DOI and for entries with "
+                             "similar titles. The results are reported under the name 'duplicates'.")
+    parser.add_argument("--similarity",
+                        type=float,
+                        default=DEFAULT_SIMILARITY,
+                        help=f"The fraction of words two titles need to share to be reported by --duplicates. "
+                             f"Defaults to {DEFAULT_SIMILARITY}.")
+    parser.add_argument("--cited-from",
+                        type=str,
+                        action="append",
+                        default=None,
+                        metavar="FILE",
+                        help="Only check the entries cited in FILE, which is either the .aux file of the document or a "
+                             ".tex file. The other entries are skipped without parsing them. Can be given multiple "
+                             "times.")
+    parser.add_argument("--server",
+                        action="store_true",
+                        help="Let the lint server started via 'bibtex_linter serve' check the files, which keeps the "
+                             "ruleset and the results of unchanged entries in memory. If no server is running, the "
+                             "files are checked as usual.")
+    parser.add_argument("--socket",
+                        type=str,
+                        default=None,
+                        help="Path of the Unix socket of the lint server, see --server.")
 
     args = parser.parse_args()
 
-    # Try to import the ruleset
-    if args.ruleset is None:
-        import bibtex_linter.ieeetr_rules
-        print("Using the default ruleset.")
-    else:
-        print(f"Importing rules from {args.ruleset}.")
-        if args.ruleset in ["default", "ieeetr"]:
-            import bibtex_linter.ieeetr_rules
-        elif args.ruleset == "IEEEtran":
-            import bibtex_linter.ieeetran_rules
+    paths, positional_ruleset = split_ruleset_argument(args.paths)
+    if positional_ruleset is not None:
+        if args.ruleset is not None:
+            parser.error(f"The ruleset is given twice: '{positional_ruleset}' and '{', '.join(args.ruleset)}'.")
+        args.ruleset = [positional_ruleset]
+    files: List[str] = find_bib_files(paths)
+    if not files:
+        parser.error(f"Found no .bib files in: {', '.join(paths)}")
+    ruleset_names: List[Optional[str]] = args.ruleset or [None]
+    if len(ruleset_names) > 1 and (args.watch or args.report or args.profile or args.profile_json or args.jobs != 1):
+        parser.error("Multiple rulesets cannot be combined with --watch, --report, --profile or --jobs.")
+
+    # With a machine-readable output format, stdout only contains the results and everything else goes to stderr
+    messages: TextIO = sys.stdout if args.format == "text" else sys.stderr
+
+    # Try to import the ruleset(s)
+    rulesets: List[Ruleset] = []
+    for ruleset_name in ruleset_names:
+        if ruleset_name is None:
+            print("Using the default ruleset.", file=messages)
         else:
-            import_from_path(args.ruleset)
+            print(f"Importing rules from {ruleset_name}.", file=messages)
+        if len(ruleset_names) > 1:
+            rulesets.append(create_ruleset(ruleset_name))
+    ruleset: Optional[str] = ruleset_names[0]
 
-    entries: List[BibTeXEntry] = parse_bibtex_file(args.filepath)
-    had_violations = False
-    total_number_of_violations: int = 0
+    # Whether to let the lint server verify the files
+    use_server: bool = False
+    if args.server:
+        if len(ruleset_names) > 1 or args.watch or args.report or args.profile or args.profile_json or \
+                args.jobs != 1 or args.duplicates or args.cited_from:
+            parser.error("--server cannot be combined with multiple rulesets, --watch, --report, --profile, --jobs, "
+                         "--duplicates or --cited-from.")
+        from bibtex_linter.daemon import request as server_request
+        use_server = server_request({"command": "ping"}, args.socket) is not None
+        if not use_server:
+            print("No lint server is running, checking the files locally.", file=messages)
 
-    for entry in entries:
-        violations: List[str] = verify(entry)
-        total_number_of_violations += len(violations)
-        if violations:
-            had_violations = True
-            print(f"\nEntry '{entry.name}' of type '{entry.entry_type}' failed verification:")
-            print("  ❌ Invariant Violations:")
-            for issue in violations:
-                print(f"    - {issue}")
+    if not rulesets and not use_server:
+        load_ruleset(ruleset)
 
-    print(f"\n\nFound {total_number_of_violations} invariant violation(s) in {len(entries)} entries.")
+    if args.max_violations is not None and args.max_violations < 1:
+        parser.error("--max-violations must be at least 1.")
+    if (args.fail_fast or args.max_violations is not None or args.count_only) and (args.watch or args.report):
+        parser.error("--fail-fast, --max-violations and --count-only cannot be combined with --watch or --report.")
+    if args.format != "text" and (args.watch or args.report):
+        parser.error("--format cannot be combined with --watch or --report.")
+    if args.duplicates and (args.watch or args.report):
+        parser.error("--duplicates cannot be combined with --watch or --report.")
+    if not 0 < args.similarity <= 1:
+        parser.error("--similarity must be greater than 0 and at most 1.")
 
-    if not had_violations:
+    # The names of the cited entries, or `None` to check all entries
+    cited_names: Optional[FrozenSet[str]] = None
+    if args.cited_from:
+        if args.watch or args.report:
+            parser.error("--cited-from cannot be combined with --watch or --report.")
+        try:
+            cited_names = find_citations(args.cited_from)
+        except OSError as error:
+            parser.error(f"Could not read the citations: {error}")
+        if cited_names is None:
+            print("All entries are cited via \\nocite{*}.", file=messages)
+        else:
+            print(f"Checking the {len(cited_names)} cited entries.", file=messages)
+
+    profiler: Optional["Profiler"] = None
+    if args.profile or args.profile_json:
+        if args.watch or args.report:
+            parser.error("--profile cannot be combined with --watch or --report.")
+        from bibtex_linter.profiling import Profiler
+        profiler = Profiler()
+
+    if args.report:
+        if args.watch:
+            parser.error("--report cannot be combined with --watch.")
+        try:
+            from bibtex_linter.analysis import FieldPresenceMatrix, field_rule_reports
+        except ImportError as error:
+            parser.error(str(error))
+        field_rules: List[FieldRule] = registered_field_rules()
+        if not field_rules:
+            print("The ruleset has no declarative field rules to report on.")
+            sys.exit(EXIT_SUCCESS)
+        try:
+            matrix = FieldPresenceMatrix.from_files(files)
+        except OSError as error:
+            print(f"\n  ⚠️ Could not read the files: {error}")
+            sys.exit(EXIT_UNREADABLE_FILE)
+        if print_field_rule_reports(field_rule_reports(matrix, field_rules), len(matrix)):
+            sys.exit(EXIT_VIOLATIONS)
         print("All entries passed verification.")
-        sys.exit(0)  # Exit as success
+        sys.exit(EXIT_SUCCESS)
+
+    if args.watch:
+        from bibtex_linter.watch import watch
+        print("Watching for changes, press Ctrl+C to stop.")
+        try:
+            watch(files, print_watch_results, args.watch_interval)
+        except KeyboardInterrupt:
+            pass
+        sys.exit(EXIT_SUCCESS)
+
+    cache: Optional["ResultCache"] = None
+    if not args.no_cache and profiler is None and not rulesets and not use_server:
+        from bibtex_linter.cache import ResultCache, ruleset_fingerprint
+        cache = ResultCache(args.cache_dir, fingerprint=ruleset_fingerprint())
+        cache.load()
+
+    # The results of each file, together with the name of the ruleset when checking multiple rulesets
+    results_per_file: Iterator[Tuple[str, Optional[str], Iterator[EntryResult]]]
+    if use_server:
+        results_per_file = with_ruleset_name((filename, verify_file_on_server(filename, ruleset, args.socket))
+                                             for filename in files)
+    elif rulesets:
+        results_per_file = verify_files_with_rulesets(files, rulesets, cited_names)
+    elif profiler is not None:
+        results_per_file = with_ruleset_name((filename, profiler.verify_file(filename, cited_names))
+                                             for filename in files)
+    elif len(files) > 1 and args.jobs != 1:
+        from bibtex_linter.parallel import verify_files_parallel
+        results_per_file = with_ruleset_name(verify_files_parallel(files, ruleset, args.jobs, cache=cache,
+                                                                   names=cited_names, threads=args.threads))
+    elif args.jobs != 1:
+        from bibtex_linter.parallel import verify_file_parallel
+        results_per_file = with_ruleset_name(
+            iter([(files[0], verify_file_parallel(files[0], ruleset, args.jobs, cache=cache, names=cited_names,
+                                                  threads=args.threads))]))
+    else:
+        from bibtex_linter.cache import verify_file
+        results_per_file = with_ruleset_name((filename, verify_file(filename, cache, cited_names))
+                                             for filename in files)
+    if args.duplicates:
+        results_per_file = with_duplicates(results_per_file, args.similarity, cited_names)
+
+    exit_code: int = EXIT_SUCCESS
+    total_number_of_violations: int = 0
+    # The number of entries of each file, which is the same for each ruleset, unless stopped early
+    number_of_entries_per_file: Dict[str, int] = {}
+    # The filename (and ruleset) together with its exit code and number of violations or the error message
+    file_summaries: List[Tuple[str, int, str]] = []
+    # The total number of invariant violations per ruleset, when checking multiple rulesets
+    number_of_violations_per_ruleset: Dict[str, int] = {}
+    unreadable_files: Set[str] = set()
+    # The casefolded names of the entries found in the files, to report the cited entries that are missing
+    found_names: Set[str] = set()
+
+    # Whether the verification stopped early, due to --fail-fast or --max-violations
+    stopped: bool = False
+
+    from bibtex_linter.output import create_writer
+    writer: "ResultWriter" = create_writer(args.format, sys.stdout, show_filenames=len(files) > 1)
+    for filename, ruleset_name, results in results_per_file:
+        if filename in unreadable_files:
+            continue
+        label: str = filename if ruleset_name is None else f"{filename} ({ruleset_name})"
+        if not args.count_only:
+            writer.start_file(filename, ruleset_name)
+        if cited_names is not None:
+            results = recording_names(results, found_names)
+        max_violations: Optional[int] = None
+        if args.max_violations is not None:
+            max_violations = args.max_violations - total_number_of_violations
+        try:
+            file_number_of_entries, file_number_of_violations = print_results(
+                results, count_only=args.count_only, max_violations=max_violations, fail_fast=args.fail_fast,
+                writer=writer, filename=filename)
+        except OSError as error:
+            writer.write_error(filename, error)
+            if not args.count_only:
+                writer.end_file(filename)
+            file_summaries.append((filename, EXIT_UNREADABLE_FILE, f"could not be read: {error}"))
+            exit_code = max(exit_code, EXIT_UNREADABLE_FILE)
+            unreadable_files.add(filename)
+            continue
+        if not args.count_only:
+            writer.end_file(filename)
+        number_of_entries_per_file[filename] = max(number_of_entries_per_file.get(filename, 0),
+                                                   file_number_of_entries)
+        total_number_of_violations += file_number_of_violations
+        if ruleset_name is not None:
+            number_of_violations_per_ruleset[ruleset_name] = \
+                number_of_violations_per_ruleset.get(ruleset_name, 0) + file_number_of_violations
+        file_exit_code: int = EXIT_VIOLATIONS if file_number_of_violations else EXIT_SUCCESS
+        file_summaries.append((label, file_exit_code, f"{file_number_of_violations} invariant violation(s) in "
+                                                      f"{file_number_of_entries} entries"))
+        exit_code = max(exit_code, file_exit_code)
+        if file_number_of_violations and (args.fail_fast or (args.max_violations is not None and
+                                                             total_number_of_violations >= args.max_violations)):
+            stopped = True
+            close_iterator(results)
+            close_iterator(results_per_file)
+            break
+    writer.close()
+    number_of_entries: int = sum(number_of_entries_per_file.values())
+
+    if cache is not None:
+        try:
+            cache.save()
+        except OSError as error:
+            print(f"Could not save the result cache: {error}", file=sys.stderr)
+
+    if len(file_summaries) > 1:
+        print("\n\nSummary:", file=messages)
+        for label, file_exit_code, summary in file_summaries:
+            symbol: str = {EXIT_SUCCESS: "✅", EXIT_VIOLATIONS: "❌"}.get(file_exit_code, "⚠️")
+            print(f"  {symbol} {label}: {summary}", file=messages)
+        for ruleset_name, number_of_violations in number_of_violations_per_ruleset.items():
+            print(f"\nFound {number_of_violations} invariant violation(s) with the ruleset '{ruleset_name}'.",
+                  file=messages)
+        print(f"\nFound {total_number_of_violations} invariant violation(s) in {number_of_entries} entries "
+              f"of {len(files)} {'file' if len(files) == 1 else 'files'}"
+              + (f" with {len(rulesets)} rulesets." if rulesets else "."), file=messages)
+    else:
+        print(f"\n\nFound {total_number_of_violations} invariant violation(s) in {number_of_entries} entries.",
+              file=messages)
+
+    if cited_names is not None and not stopped:
+        missing_names: List[str] = sorted(name for name in cited_names if name.casefold() not in found_names)
+        if missing_names:
+            print(f"\n⚠️ {len(missing_names)} cited entries are missing in the .bib files: {', '.join(missing_names)}",
+                  file=messages)
+
+    if stopped:
+        print("Stopped early, the remaining entries were not verified.", file=messages)
+    elif exit_code == EXIT_SUCCESS:
+        print("All entries passed verification.", file=messages)
 
-    sys.exit(1)  # Exit as failure
+    if profiler is not None:
+        if args.profile_json:
+            with open(args.profile_json, "w") as file:
+                json.dump(profiler.to_json(), file, indent=2)
+            print(f"\nWrote the profile to '{args.profile_json}'.", file=messages)
+        if args.profile:
+            print(f"\n\n{profiler.format_table()}", file=messages)
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,297 @@
+"""
+This module implements the writers of the verification results in the different output formats of the CLI.
+
+All writers collect their output in a single buffer, that is written to the stream whenever it exceeds `buffer_size`
+characters, instead of writing every line on its own. The results are written as they come in (streaming), so that the
+memory usage does not grow with the number of entries: Only the parts of the output that can only be written at the
+end (e.g. the rules of a SARIF log) are kept until then.
+
+The following formats are available:
+
+- `text`: The human-readable output of the CLI
+- `jsonl`: [JSON Lines](https://jsonlines.org/), one object per invariant violation (or per unreadable file)
+- `sarif`: A [SARIF 2.1.0](https://docs.oasis-open.org/sarif/sarif/v2.1.0/sarif-v2.1.0.html) log, e.g. for code
+  scanning
+- `junit`: A JUnit XML report with a test suite per file and a test case per entry, e.g. for CI dashboards
+"""
+from typing import Any, Callable, Dict, List, Optional, Sequence, TextIO, Type
+import abc
+import json
+import os
+
+from bibtex_linter.verification import EntryResult, SEVERITY_WARNING, Violation, ViolationLike
+
+DEFAULT_BUFFER_SIZE: int = 1 << 16
+
+# The rule ID of violations, that were returned as plain strings and therefore have no rule
+UNKNOWN_RULE: str = "invariant-violation"
+
+_SARIF_SCHEMA: str = "https://json.schemastore.org/sarif-2.1.0.json"
+_INFORMATION_URI: str = "https://github.com/s-heppner/python-bibtex-linter"
+
+
+class ResultWriter(abc.ABC):
+    """
+    Base class of the writers. The methods are called in the following order:
+
+    `start_file`, then `write_result` for each entry and `write_error`, if the file could not be read, then
+    `end_file`. This is repeated for each file, and finally `close`. When only counting the violations, the CLI calls
+    neither `start_file`, `write_result` nor `end_file`, but still `write_error`.
+
+    :param stream: The stream to write to, e.g. `sys.stdout`
+    :param buffer_size: Number of characters that are collected before writing them to the stream
+    """
+    def __init__(self, stream: TextIO, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.stream: TextIO = stream
+        self.buffer_size: int = buffer_size
+        self._buffer: List[str] = []
+        self._buffered: int = 0
+        # The ruleset of the current file, when checking multiple rulesets
+        self.ruleset: Optional[str] = None
+
+    def write(self, text: str) -> None:
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self.stream.write("".join(self._buffer))
+            self._buffer.clear()
+            self._buffered = 0
+        self.stream.flush()
+
+    def start_file(self, filename: str, ruleset: Optional[str] = None) -> None:
+        """
+        Start writing the results of a file.
+
+        :param filename: The file
+        :param ruleset: The name of the ruleset the results belong to, when checking multiple rulesets
+        """
+        self.ruleset = ruleset
+
+    @abc.abstractmethod
+    def write_result(self, filename: str, result: EntryResult, violations: Sequence[ViolationLike]) -> None:
+        """
+        Write the result of an entry.
+
+        :param filename: The file of the entry
+        :param result: The result of the entry
+        :param violations: The violations of the entry to write, which may be fewer than in `result`, if the
+            verification was stopped after a maximum number of violations
+        """
+
+    @abc.abstractmethod
+    def write_error(self, filename: str, error: Exception) -> None:
+        """
+        Write that the file could not be read.
+        """
+
+    def end_file(self, filename: str) -> None:
+        pass
+
+    def close(self) -> None:
+        """
+        Write the rest of the output and flush it. The stream itself is not closed.
+        """
+        self.flush()
+
+
+class TextWriter(ResultWriter):
+    """
+    The human-readable output.
+
+    :param show_filenames: Whether to write a heading per file, when checking multiple files
+    """
+    def __init__(self, stream: TextIO, show_filenames: bool = False, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        super().__init__(stream, buffer_size)
+        self.show_filenames: bool = show_filenames
+
+    def start_file(self, filename: str, ruleset: Optional[str] = None) -> None:
+        super().start_file(filename, ruleset)
+        if ruleset is not None:
+            self.write(f"\n\nChecking '{filename}' with the ruleset '{ruleset}':\n")
+        elif self.show_filenames:
+            self.write(f"\n\nChecking '{filename}':\n")
+
+    def write_result(self, filename: str, result: EntryResult, violations: Sequence[ViolationLike]) -> None:
+        if not violations:
+            return
+        self.write(f"\nEntry '{result.name}' of type '{result.entry_type}' failed verification:\n"
+                   f"  ❌ Invariant Violations:\n"
+                   + "".join(f"    - {issue}\n" for issue in violations))
+
+    def write_error(self, filename: str, error: Exception) -> None:
+        self.write(f"\n  ⚠️ Could not read '{filename}': {error}\n")
+
+
+def violation_to_json(filename: str, result: EntryResult, violation: ViolationLike) -> Dict[str, Any]:
+    """
+    Convert a violation into the JSON object written by the `JsonLinesWriter`.
+    """
+    if isinstance(violation, Violation):
+        return {"file": filename, **violation.to_json()}
+    return {
+        "file": filename,
+        "message": violation,
+        "entry": result.name,
+        "entry_type": result.entry_type,
+        "fields": [],
+        "severity": "error",
+        "rule": None,
+    }
+
+
+class JsonLinesWriter(ResultWriter):
+    """
+    One JSON object per line for each invariant violation, see `violation_to_json`, and for each unreadable file
+    (`{"file": ..., "error": ...}`). When checking multiple rulesets, the violations also contain the `ruleset`.
+    """
+    def write_result(self, filename: str, result: EntryResult, violations: Sequence[ViolationLike]) -> None:
+        for violation in violations:
+            data: Dict[str, Any] = violation_to_json(filename, result, violation)
+            if self.ruleset is not None:
+                data["ruleset"] = self.ruleset
+            self.write(json.dumps(data, ensure_ascii=False) + "\n")
+
+    def write_error(self, filename: str, error: Exception) -> None:
+        self.write(json.dumps({"file": filename, "error": str(error)}, ensure_ascii=False) + "\n")
+
+
+class SarifWriter(ResultWriter):
+    """
+    A SARIF log with a single run. The results are streamed, the rules and the notifications about unreadable files
+    are written at the end.
+    """
+    def __init__(self, stream: TextIO, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        super().__init__(stream, buffer_size)
+        self._rule_ids: Dict[str, None] = {}
+        self._notifications: List[Dict[str, Any]] = []
+        self._number_of_results: int = 0
+        self.write(f'{{"version": "2.1.0", "$schema": "{_SARIF_SCHEMA}", "runs": [{{"results": [')
+
+    def write_result(self, filename: str, result: EntryResult, violations: Sequence[ViolationLike]) -> None:
+        for violation in violations:
+            rule_id: str = UNKNOWN_RULE
+            level: str = "error"
+            if isinstance(violation, Violation):
+                rule_id = violation.rule or UNKNOWN_RULE
+                level = "warning" if violation.severity == SEVERITY_WARNING else "error"
+            if self.ruleset is not None:
+                rule_id = f"{self.ruleset}/{rule_id}"
+            self._rule_ids[rule_id] = None
+            sarif_result: Dict[str, Any] = {
+                "ruleId": rule_id,
+                "level": level,
+                "message": {"text": str(violation)},
+                "locations": [{
+                    "physicalLocation": {"artifactLocation": {"uri": filename.replace(os.sep, "/")}},
+                    "logicalLocations": [{"name": result.name, "kind": "object"}],
+                }],
+            }
+            self.write(("," if self._number_of_results else "") + json.dumps(sarif_result, ensure_ascii=False))
+            self._number_of_results += 1
+
+    def write_error(self, filename: str, error: Exception) -> None:
+        self._notifications.append({
+            "level": "error",
+            "message": {"text": f"Could not read '{filename}': {error}"},
+            "locations": [{"physicalLocation": {"artifactLocation": {"uri": filename.replace(os.sep, "/")}}}],
+        })
+
+    def close(self) -> None:
+        tool: Dict[str, Any] = {"driver": {
+            "name": "bibtex_linter",
+            "informationUri": _INFORMATION_URI,
+            "rules": [{"id": rule_id} for rule_id in self._rule_ids],
+        }}
+        invocation: Dict[str, Any] = {
+            "executionSuccessful": not self._notifications,
+            "toolExecutionNotifications": self._notifications,
+        }
+        self.write(f'], "tool": {json.dumps(tool)}, '
+                   f'"invocations": [{json.dumps(invocation, ensure_ascii=False)}]}}]}}\n')
+        super().close()
+
+
+class JUnitWriter(ResultWriter):
+    """
+    A JUnit XML report with a test suite per file and a test case per entry, that fails with the invariant violations
+    of the entry. Since the report is streamed, the test suites do not have the (optional) counts of their tests and
+    failures. A file that could not be read gets a test case with an error, in a test suite of its own if no test suite
+    was started for the file.
+    """
+    def __init__(self, stream: TextIO, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        super().__init__(stream, buffer_size)
+        # Only imported when needed, since `xml.sax.saxutils` imports `urllib.request`, which makes up a good part of
+        # the start-up time of the CLI
+        from xml.sax.saxutils import escape, quoteattr
+        self._escape: Callable[[str], str] = escape
+        self._quoteattr: Callable[[str], str] = quoteattr
+        # Whether a test suite was started and not ended yet
+        self._in_testsuite: bool = False
+        self.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites name="bibtex_linter">\n')
+
+    def start_file(self, filename: str, ruleset: Optional[str] = None) -> None:
+        super().start_file(filename, ruleset)
+        name: str = filename if ruleset is None else f"{filename} ({ruleset})"
+        self.write(f"  <testsuite name={self._quoteattr(name)}>\n")
+        self._in_testsuite = True
+
+    def write_result(self, filename: str, result: EntryResult, violations: Sequence[ViolationLike]) -> None:
+        testcase: str = \
+            f"    <testcase classname={self._quoteattr(filename)} name={self._quoteattr(result.name)}"
+        if not violations:
+            self.write(testcase + "/>\n")
+            return
+        message: str = f"Entry '{result.name}' of type '{result.entry_type}' failed verification"
+        details: str = self._escape("\n".join(str(violation) for violation in violations))
+        self.write(f"{testcase}>\n      <failure message={self._quoteattr(message)} type=\"InvariantViolation\">"
+                   f"{details}</failure>\n    </testcase>\n")
+
+    def write_error(self, filename: str, error: Exception) -> None:
+        in_testsuite: bool = self._in_testsuite
+        if not in_testsuite:
+            # E.g. when only counting the violations, no test suite is started for the files
+            self.start_file(filename)
+        self.write(f"    <testcase classname={self._quoteattr(filename)} name=\"read\">\n"
+                   f"      <error message={self._quoteattr(str(error))} "
+                   f"type={self._quoteattr(type(error).__name__)}/>\n"
+                   f"    </testcase>\n")
+        if not in_testsuite:
+            self.end_file(filename)
+
+    def end_file(self, filename: str) -> None:
+        if self._in_testsuite:
+            self.write("  </testsuite>\n")
+            self._in_testsuite = False
+
+    def close(self) -> None:
+        self.write("</testsuites>\n")
+        super().close()
+
+
+# The writers by the name of their output format
+WRITERS: Dict[str, Type[ResultWriter]] = {
+    "text": TextWriter,
+    "jsonl": JsonLinesWriter,
+    "sarif": SarifWriter,
+    "junit": JUnitWriter,
+}
+
+
+def create_writer(output_format: str, stream: TextIO, show_filenames: bool = False) -> ResultWriter:
+    """
+    Create the writer for the given output format, see `WRITERS`.
+
+    :param output_format: The name of the output format
+    :param stream: The stream to write to
+    :param show_filenames: Whether the `TextWriter` writes a heading per file
+    """
+    if output_format == "text":
+        return TextWriter(stream, show_filenames=show_filenames)
+    writer_class: Optional[Type[ResultWriter]] = WRITERS.get(output_format)
+    if writer_class is None:
+        raise ValueError(f"Unknown output format '{output_format}', expected one of: {', '.join(WRITERS)}")
+    return writer_class(stream)
@@ -0,0 +1,258 @@
+"""
+This module implements parsing and verifying BibTeX files in several processes.
+
+A single file is read in large chunks, that are cut before lines starting with an `@`. Such a line usually starts an
+entry, but it can also be part of a braced value, e.g. of an abstract. So each chunk is parsed and verified in a worker
+process only up to the first entry that is not closed within the chunk and might still be closed after it (see
+`parser.tokenize_prefix`), and the unconsumed rest of the chunk is returned to the main process. An entry that is never
+closed does not count: It is cut off at the next entry starting at the beginning of a line, just like `tokenize` does,
+as soon as the chunk reaches `parser.UNCLOSED_ENTRY_LOOKAHEAD` characters beyond that entry. If there is a rest, the
+chunk was not cut at an entry boundary: The rest, which is at most about one entry and the lookahead long, is carried
+into the next chunk, whose (speculative) results are discarded and which is verified again together with the rest.
+All other chunks are verified in parallel. The results are yielded in the original order of the entries, so the output
+does not depend on the number of workers or the chunk size.
+
+Many files are instead distributed as a whole over the worker processes, which load the ruleset only once.
+
+The worker processes do not get a copy of the result cache of the main process, which would be pickled for each of
+them. Instead, each worker loads the saved results from the file of the cache by itself and only looks results up in
+it. The new results are returned to the main process, which stores them in its cache.
+
+With `threads=True`, a pool of threads is used instead of processes. The threads share the ruleset and the result
+cache, so nothing needs to be loaded or pickled per worker, but on CPython with the GIL only one of them runs Python
+code at a time. This mode is meant for free-threaded builds of CPython (3.13 and later).
+"""
+from typing import AbstractSet, Any, Callable, Optional, List, Iterator, TextIO, Deque, Tuple, Iterable
+import collections
+import concurrent.futures
+import functools
+import os
+
+from bibtex_linter.cache import ResultCache, verify_tokens_with_keys
+from bibtex_linter.parser import EntryToken, tokenize, tokenize_prefix, tokenize_stream
+from bibtex_linter.rulesets import load_ruleset
+from bibtex_linter.verification import EntryResult
+
+# Number of characters read from the file for each chunk
+DEFAULT_CHUNK_SIZE: int = 1 << 20
+
+# The (read-only) result cache of a worker process, loaded from the file of the cache of the main process
+_worker_cache: Optional[ResultCache] = None
+# The names of the entries to verify in a worker process, or `None` to verify all of them
+_worker_names: Optional[AbstractSet[str]] = None
+
+
+def _last_entry_boundary(block: str) -> int:
+    """
+    Find the start of the last line in `block` that starts with an `@` (ignoring indentation).
+
+    :return: The offset of that line, or `-1` if there is no such line apart from (possibly) the first one
+    """
+    position: int = len(block)
+    while True:
+        position = block.rfind("@", 0, position)
+        if position <= 0:
+            return -1
+        line_start: int = block.rfind("\n", 0, position) + 1
+        if line_start > 0 and not block[line_start:position].strip():
+            return line_start
+        position = line_start
+
+
+def split_into_chunks(file: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Read a file in chunks of about `chunk_size` characters, that are each cut before a line starting with an `@`.
+    This is usually an entry boundary, but not always, see the module documentation.
+
+    :param file: A file object opened in text mode
+    :param chunk_size: Number of characters to read at once. A chunk can be larger, if a single entry is larger.
+    :return: Iterator over the chunks, that together contain the whole content of the file
+    """
+    rest: str = ""
+    while True:
+        block: str = file.read(chunk_size)
+        if not block:
+            if rest:
+                yield rest
+            return
+        block = rest + block
+        boundary: int = _last_entry_boundary(block)
+        if boundary == -1:
+            rest = block
+            continue
+        yield block[:boundary]
+        rest = block[boundary:]
+
+
+def _initialize_worker(ruleset: Optional[str], cache_directory: Optional[str], fingerprint: str = "",
+                       names: Optional[AbstractSet[str]] = None) -> None:
+    global _worker_cache, _worker_names
+    load_ruleset(ruleset)
+    if cache_directory is not None:
+        _worker_cache = ResultCache(cache_directory, fingerprint=fingerprint)
+        _worker_cache.load()
+    _worker_names = names
+
+
+def _verify_chunk(chunk: str, cache: Optional[ResultCache] = None, names: Optional[AbstractSet[str]] = None,
+                  final: bool = False) -> Tuple[List[Tuple[Optional[str], EntryResult]], str]:
+    """
+    Parse and verify the entries of a chunk up to the first entry that might be closed after the end of the chunk, see
+    `parser.tokenize_prefix`. This is executed in the workers.
+
+    :param final: Whether the chunk reaches up to the end of the file. Then all entries are verified.
+    :return: The results, and the unconsumed rest of the chunk
+    """
+    if final:
+        return list(verify_tokens_with_keys(tokenize(chunk, names), cache)), ""
+    tokens: List[EntryToken]
+    tokens, consumed = tokenize_prefix(chunk, names)
+    return list(verify_tokens_with_keys(tokens, cache)), chunk[consumed:]
+
+
+def _verify_file(filename: str, cache: Optional[ResultCache] = None,
+                 names: Optional[AbstractSet[str]] = None) -> List[Tuple[Optional[str], EntryResult]]:
+    """
+    Parse and verify a whole file. This is executed in the workers.
+    """
+    with open(filename, "r") as file:
+        return list(verify_tokens_with_keys(tokenize_stream(file, names=names), cache))
+
+
+def _verify_chunk_in_worker_process(chunk: str, final: bool = False) -> Tuple[List[Tuple[Optional[str], EntryResult]],
+                                                                              str]:
+    return _verify_chunk(chunk, _worker_cache, _worker_names, final)
+
+
+def _verify_file_in_worker_process(filename: str) -> List[Tuple[Optional[str], EntryResult]]:
+    return _verify_file(filename, _worker_cache, _worker_names)
+
+
+def _create_executor(ruleset: Optional[str], jobs: int, cache: Optional[ResultCache],
+                     names: Optional[AbstractSet[str]] = None,
+                     threads: bool = False) -> "concurrent.futures.Executor":
+    max_workers: Optional[int] = jobs if jobs != 0 else os.cpu_count()
+    if threads:
+        # The threads share the default ruleset of this process
+        load_ruleset(ruleset)
+        return concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    # Only the location and the fingerprint of the cache are passed, see the module documentation
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_initialize_worker,
+        initargs=(ruleset, cache.directory if cache is not None else None,
+                  cache.fingerprint if cache is not None else "", names),
+    )
+
+
+def verify_file_parallel(filename: str,
+                         ruleset: Optional[str],
+                         jobs: int,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE,
+                         cache: Optional[ResultCache] = None,
+                         names: Optional[AbstractSet[str]] = None,
+                         threads: bool = False) -> Iterator[EntryResult]:
+    """
+    Parse and verify a BibTeX file using a pool of `jobs` worker processes (or threads).
+
+    To limit the memory usage, only a few chunks per worker are in flight at the same time.
+
+    :param filename: Path to the .bib file
+    :param ruleset: The ruleset to load in the worker processes, see `rulesets.load_ruleset`
+    :param jobs: Number of worker processes. If `0`, one worker per CPU is used.
+    :param chunk_size: Number of characters per chunk, see `split_into_chunks`
+    :param cache: If given, the workers reuse the results in the cache and the new results are stored in it. Worker
+        processes only see the results saved in the file of the cache, see the module documentation.
+    :param names: If given, only the entries with one of these names are verified, see `parser.tokenize`
+    :param threads: Use threads instead of processes, see the module documentation
+    :return: Iterator over the `EntryResult`s, in the order of the entries in the file
+    """
+    max_chunks_in_flight: int = 2 * (jobs or os.cpu_count() or 1)
+    verify_chunk: Callable[..., Tuple[List[Tuple[Optional[str], EntryResult]], str]] = \
+        functools.partial(_verify_chunk, cache=cache, names=names) if threads else _verify_chunk_in_worker_process
+    with open(filename, "r") as file, _create_executor(ruleset, jobs, cache, names, threads) as executor:
+        pending: Deque[Tuple[str, "concurrent.futures.Future[Tuple[List[Tuple[Optional[str], EntryResult]], str]]"]] = \
+            collections.deque()
+        # The unconsumed rest of the previous chunk, see the module documentation
+        rest: str = ""
+        chunks: Iterator[str] = split_into_chunks(file, chunk_size)
+        try:
+            while True:
+                chunk: Optional[str] = next(chunks, None)
+                if chunk is not None:
+                    pending.append((chunk, executor.submit(verify_chunk, chunk)))
+                while pending and (chunk is None or len(pending) >= max_chunks_in_flight or pending[0][1].done()):
+                    finished_chunk, future = pending.popleft()
+                    if rest:
+                        # The chunk did not start at an entry boundary, so its results are wrong
+                        future = executor.submit(verify_chunk, rest + finished_chunk)
+                    results, rest = future.result()
+                    yield from _store_results(results, cache)
+                if chunk is None:
+                    break
+            if rest:
+                # The rest contains an entry that is not closed before the end of the file
+                results, _ = executor.submit(verify_chunk, rest, final=True).result()
+                yield from _store_results(results, cache)
+        finally:
+            # If the caller stopped early, do not wait for the chunks that were not started yet
+            _cancel(future for _, future in pending)
+
+
+def _store_results(results: List[Tuple[Optional[str], EntryResult]],
+                   cache: Optional[ResultCache]) -> Iterator[EntryResult]:
+    for key, result in results:
+        if cache is not None and key is not None:
+            cache.put(key, result)
+        yield result
+
+
+def _results_of_file(future: "concurrent.futures.Future[List[Tuple[Optional[str], EntryResult]]]",
+                     cache: Optional[ResultCache]) -> Iterator[EntryResult]:
+    yield from _store_results(future.result(), cache)
+
+
+def verify_files_parallel(filenames: Iterable[str],
+                          ruleset: Optional[str],
+                          jobs: int,
+                          cache: Optional[ResultCache] = None,
+                          names: Optional[AbstractSet[str]] = None,
+                          threads: bool = False) -> Iterator[Tuple[str, Iterator[EntryResult]]]:
+    """
+    Parse and verify many BibTeX files using a pool of `jobs` worker processes (or threads), each verifying whole
+    files.
+
+    :param filenames: Paths to the .bib files
+    :param ruleset: The ruleset to load in the worker processes, see `rulesets.load_ruleset`
+    :param jobs: Number of worker processes. If `0`, one worker per CPU is used.
+    :param cache: If given, the workers reuse the results in the cache and the new results are stored in it. Worker
+        processes only see the results saved in the file of the cache, see the module documentation.
+    :param names: If given, only the entries with one of these names are verified, see `parser.tokenize`
+    :param threads: Use threads instead of processes, see the module documentation
+    :return: Iterator over the filenames (in the given order) together with an iterator over their `EntryResult`s.
+        Iterating over the `EntryResult`s raises the `OSError`, if the file could not be read. The `EntryResult`s of a
+        file must be consumed, before moving on to the next file.
+    """
+    max_files_in_flight: int = 2 * (jobs or os.cpu_count() or 1)
+    verify_file: Callable[[str], List[Tuple[Optional[str], EntryResult]]] = \
+        functools.partial(_verify_file, cache=cache, names=names) if threads else _verify_file_in_worker_process
+    with _create_executor(ruleset, jobs, cache, names, threads) as executor:
+        pending: Deque[Tuple[str, "concurrent.futures.Future[List[Tuple[Optional[str], EntryResult]]]"]] = \
+            collections.deque()
+        try:
+            for filename in filenames:
+                pending.append((filename, executor.submit(verify_file, filename)))
+                if len(pending) >= max_files_in_flight:
+                    finished_filename, future = pending.popleft()
+                    yield finished_filename, _results_of_file(future, cache)
+            while pending:
+                finished_filename, future = pending.popleft()
+                yield finished_filename, _results_of_file(future, cache)
+        finally:
+            # If the caller stopped early, do not wait for the files that were not started yet
+            _cancel(future for _, future in pending)
+
+
+def _cancel(futures: Iterable["concurrent.futures.Future[Any]"]) -> None:
+    for future in futures:
+        future.cancel()
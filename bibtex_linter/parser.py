@@ -1,7 +1,8 @@
-from typing import List, Dict, Tuple
+from typing import AbstractSet, Generator, List, Dict, Tuple, Iterator, Optional, TextIO, Mapping
 import dataclasses
 import enum
 import re
+import sys
 
 
 RESOLVE_ENTRY_TYPE_ALIAS: Dict[str, str] = {
@@ -9,8 +10,188 @@ RESOLVE_ENTRY_TYPE_ALIAS: Dict[str, str] = {
     "electronic": "online",
 }
 
+# The tokenizer only ever looks at the characters matched by these patterns and skips everything in between in bulk.
+# `_SIMPLE_ENTRY` matches a whole entry in one go, as long as none of its values contains more than one level of nested
+# braces, which is the case for the vast majority of real world entries. `_FIELD` then picks the (contiguous) fields out
+# of its body. Anything else falls back to scanning the special characters of the entry one by one.
+_KEY = r'[^=,{}"\s]+'
+_VALUE = r'(?:\{(?:[^{}]++|\{[^{}]*+\})*+\}|"(?:[^"{}]++|\{[^{}]*+\})*+"|[^=,{}"\s]*+)'
+_ENTRY_START = re.compile(r"@(\w+)\s*\{")
+_ENTRY_NAME = re.compile(r"\s*([^,{}\s]*)")
+_SIMPLE_ENTRY = re.compile(
+    rf"@(\w+)\s*\{{\s*([^,{{}}\s]*)\s*((?:,\s*{_KEY}\s*=\s*{_VALUE}\s*)*+),?\s*\}}"
+)
+_FIELD = re.compile(rf",\s*({_KEY})\s*=\s*({_VALUE})")
+_NAME_END = re.compile(r"[,}]")
+_KEY_END = re.compile(r"[=,}]")
+_VALUE_SPECIAL_CHARACTERS = re.compile(r'[{}",]')
+# The start of an entry at the beginning of a line, where the tokenizer resumes after an entry that is never closed
+_LINE_ENTRY_START = re.compile(r"^[ \t]*@\w+\s*\{", re.MULTILINE)
+
+# An entry that is not closed within this many characters after the next entry starting at the beginning of a line is
+# cut off before that entry, see `EntryToken.closed`. This bounds how far the tokenizer needs to look ahead to tell
+# whether an entry is closed, so that the result does not depend on how the content is split into chunks.
+UNCLOSED_ENTRY_LOOKAHEAD: int = 1 << 16
+
+# A field as emitted by the tokenizer: The lowercase field key and the start and end offset of its raw value inside of
+# `EntryToken.text`.
+FieldSlice = Tuple[str, int, int]
+
+# Entries with the same field keys in the same order share one key table, mapping each key to its index in the tuple of
+# values of `CompactFields`. To keep pathological inputs from growing this without limit, at most
+# `_MAX_SHARED_KEY_TABLES` different key tables are shared, every key table after that belongs to its entry alone.
+_shared_key_tables: Dict[Tuple[str, ...], Dict[str, int]] = {}
+_MAX_SHARED_KEY_TABLES: int = 4096
+
+
+# The lowercase and interned field keys by the field key as written in the source, so that the keys of the common fields
+# are not lowercased and interned again for every entry. Bounded like the key tables.
+_field_keys: Dict[str, str] = {}
+
+
+def _field_key(raw_key: str) -> str:
+    key: Optional[str] = _field_keys.get(raw_key)
+    if key is None:
+        key = sys.intern(raw_key.lower())
+        if len(_field_keys) < _MAX_SHARED_KEY_TABLES:
+            _field_keys[raw_key] = key
+    return key
+
+
+def _key_table(keys: Tuple[str, ...]) -> Dict[str, int]:
+    """
+    Return the (shared, if possible) key table for the given field keys.
+    """
+    key_table: Optional[Dict[str, int]] = _shared_key_tables.get(keys)
+    if key_table is None:
+        key_table = {key: index for index, key in enumerate(keys)}
+        if len(_shared_key_tables) < _MAX_SHARED_KEY_TABLES:
+            _shared_key_tables[keys] = key_table
+    return key_table
+
+
+@dataclasses.dataclass(slots=True)
+class EntryToken:
+    """
+    A single, complete entry as found by the `tokenize` function, before any of its field values are normalized.
+
+    :ivar entry_type: Type of the entry, exactly as written in the source (e.g. `INPROCEEDINGS`)
+    :ivar name: Name or ID of the entry, with surrounding white spaces removed
+    :ivar fields: The fields of the entry as `(key, value_start, value_end)`, where the offsets point into `text`
+    :ivar text: The raw text of the whole entry, from the `@` up to and including the closing `}`
+    :ivar offset: Offset of `text` inside the scanned buffer
+    :ivar closed: `False` for an entry that is never closed, or only more than `UNCLOSED_ENTRY_LOOKAHEAD` characters
+        after the next entry that starts at the beginning of a line. Its `text` then ends before that entry, and its
+        `fields` are the ones found up to there.
+    """
+    entry_type: str
+    name: str
+    fields: List[FieldSlice]
+    text: str
+    offset: int = 0
+    closed: bool = True
+
+
+class CompactFields(Mapping[str, str]):
+    """
+    Read-only mapping of the field keys of an entry to their values, stored as a tuple of values and a key table that
+    is shared between all entries with the same field keys.
+
+    With millions of entries, this saves the per entry dict and the per entry copies of the field keys.
+
+    :param keys: The (interned) field keys
+    :param values: The field values, in the same order as `keys`
+    """
+    __slots__ = ("_key_table", "_values")
+
+    def __init__(self, keys: Tuple[str, ...], values: Tuple[str, ...]):
+        self._key_table: Dict[str, int] = _key_table(keys)
+        self._values: Tuple[str, ...] = values
+
+    def __getitem__(self, key: str) -> str:
+        return self._values[self._key_table[key]]
+
+    # Overridden, since the `Mapping.get` default implementation raises and catches a `KeyError` for missing fields.
+    # The simplified signature does not repeat the overloads of `Mapping.get`, hence the mypy ignore.
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:  # type: ignore[override]
+        index: Optional[int] = self._key_table.get(key)
+        return default if index is None else self._values[index]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._key_table
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._key_table)
+
+    def __len__(self) -> int:
+        return len(self._key_table)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self)!r})"
+
+
+class LazyFields(Mapping[str, str]):
+    """
+    Read-only mapping of the field keys of an entry to their values, that only normalizes a value the first time it is
+    accessed.
+
+    Checking whether a field exists (`"url" in entry.fields`) or iterating over the field keys never touches the values,
+    which makes rules that only look at the presence of fields almost free.
+
+    :param text: The raw text of the entry, see `EntryToken.text`
+    :param spans: Dict mapping each field key to the start and end offset of its raw value inside of `text`
+    :param strip_lines: See `BibTeXEntry.from_token`
+    """
+    __slots__ = ("text", "_spans", "_strip_lines", "_values")
+
+    def __init__(self, text: str, spans: Dict[str, Tuple[int, int]], strip_lines: bool = False):
+        self.text: str = text
+        self._spans: Dict[str, Tuple[int, int]] = spans
+        self._strip_lines: bool = strip_lines
+        self._values: Dict[str, str] = {}
+
+    def __getitem__(self, key: str) -> str:
+        value: Optional[str] = self._values.get(key)
+        if value is None:
+            start, end = self._spans[key]
+            value = BibTeXEntry._normalize_value(self.text[start:end], self._strip_lines)
+            self._values[key] = value
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._spans
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._spans)
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self)!r})"
+
+    @property
+    def strip_lines(self) -> bool:
+        return self._strip_lines
+
+    def span(self, key: str) -> Tuple[int, int]:
+        """
+        Return the start and end offset of the raw value of the field `key` inside of `text`.
+        Add `BibTeXEntry.offset` to get the position inside the parsed file.
+        """
+        return self._spans[key]
+
+
+def canonical_entry_type(entry_type: str) -> str:
+    """
+    Return the canonical form of an entry type, as used by `BibTeXEntry.entry_type`: In small letters, with the aliases
+    in `RESOLVE_ENTRY_TYPE_ALIAS` resolved, and interned via `sys.intern`.
+    """
+    entry_type = entry_type.lower()
+    return sys.intern(RESOLVE_ENTRY_TYPE_ALIAS.get(entry_type, entry_type))
+
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class BibTeXEntry:
     """
     An entry in a BibTeX file
@@ -18,14 +199,19 @@ class BibTeXEntry:
     :ivar entry_type: Type of the entry (e.g. `@misc`). We always assume that the `entry_type` is in small letters only,
         and we transform some common `entry_type` aliases to their "canonical" form (e.g. the name I prefer to use).
     :ivar name: Name or ID of the entry. So basically what is here: `@misc{Name_or_ID,`
-    :ivar fields: Fields of the entry, as a Dict mapping the field key (e.g. `author`) to its cleaned up value.
+    :ivar fields: Fields of the entry, as a Mapping from the field key (e.g. `author`) to its cleaned up value.
+        Parsed entries use the read-only `CompactFields`, or `LazyFields` if the entry was parsed in lazy mode.
+    :ivar offset: Offset of the entry inside the parsed file or string, if known. It is not compared, so the same entry
+        at another position in a file is still equal.
+    :ivar closed: `False`, if the entry was never closed (see `EntryToken.closed`), which `Ruleset.verify` reports
 
     Note:
       The field's key is transformed via `.lower()`, so you can always expect non-capitalized characters.
+      Field keys and the `entry_type` of parsed entries are interned via `sys.intern`.
 
     Note:
-       When parsing multi-line field values, the additional white spaces are removed, but the new line characters are
-       kept. For example, this:
+       When parsing multi-line field values with `strip_lines` (see `from_token`), the additional white spaces are
+       removed, but the new line characters are kept. For example, this:
        ```
        @misc{multiline_field,
          note = {This value
@@ -34,109 +220,287 @@ class BibTeXEntry:
        }
        ```
        will be parsed to: `{"note": "This value\nspans multiple\nlines"}`. For the implementation details, check out
-       the `BibTeXEntry._parse_field_value` static method.
+       the `BibTeXEntry._normalize_value` static method.
     """
     entry_type: str
     name: str
-    fields: Dict[str, str]
+    fields: Mapping[str, str]
+    offset: Optional[int] = dataclasses.field(default=None, compare=False)
+    closed: bool = True
 
     @classmethod
     def from_string(cls, entry_string: str) -> "BibTeXEntry":
         """
         Parse a `BibTeXEntry` from a string.
         """
-        # First, we find and canonicalize the `entry_type`
-        entry_type_string: str = entry_string.split("{")[0].lstrip("@").lower()
-        if RESOLVE_ENTRY_TYPE_ALIAS.get(entry_type_string):
-            entry_type: str = RESOLVE_ENTRY_TYPE_ALIAS[entry_type_string]
-        else:
-            entry_type = entry_type_string
+        entry_start = _ENTRY_START.search(entry_string)
+        token = _scan_entry(entry_string, entry_start) if entry_start else None
+        if token is None:
+            raise KeyError(f"Invalid BibTeX entry format:\n\n{entry_string}\n\n")
+        return cls.from_token(token)
 
-        name: str = entry_string.split("{")[1].split(",")[0]
-        raw_fields = cls._split_fields(entry_string)
-        fields: Dict[str, str] = {}
-        for raw_field in raw_fields:
-            key, value = cls._split_field_into_key_and_value(raw_field)
-            fields[key] = value
+    @classmethod
+    def from_token(cls, token: EntryToken, strip_lines: bool = False, lazy: bool = False) -> "BibTeXEntry":
+        """
+        Create a `BibTeXEntry` from an `EntryToken` emitted by the tokenizer.
+
+        :param token: The `EntryToken`
+        :param strip_lines: If `True`, the white spaces at the start and end of each line of a multi-line field value
+            are removed, as described in the class docstring.
+        :param lazy: If `True`, the field values are only normalized when they are accessed, see `LazyFields`
+        """
+        # First, we canonicalize the `entry_type`
+        entry_type: str = canonical_entry_type(token.entry_type)
+
+        text: str = token.text
+        fields: Mapping[str, str]
+        if lazy:
+            fields = LazyFields(
+                text,
+                {key: (value_start, value_end) for key, value_start, value_end in token.fields},
+                strip_lines,
+            )
+        else:
+            fields = CompactFields(
+                tuple([key for key, _, _ in token.fields]),
+                tuple([cls._normalize_value(text[value_start:value_end], strip_lines)
+                       for _, value_start, value_end in token.fields]),
+            )
 
         return BibTeXEntry(
             entry_type=entry_type,
-            name=name,
+            name=token.name,
             fields=fields,
+            offset=token.offset,
+            closed=token.closed,
         )
 
     @staticmethod
-    def _split_fields(entry_string: str) -> List[str]:
+    def _normalize_value(raw_value: str, strip_lines: bool) -> str:
         """
-        Extract the list of fields from the entry_string (same input as into `from_string`)
+        Normalize the raw value of a field, as it is sliced out of `EntryToken.text`.
         """
-        entry_string = entry_string.strip()
+        if strip_lines and "\n" in raw_value:
+            raw_value = "\n".join(line.strip() for line in raw_value.splitlines())
+        # Remove the trailing comma, the brackets `{}`, double brackets `{{}}` or quotation marks `"` around the value
+        # and the white spaces around it, with as few calls as possible, since this runs for every single field
+        raw_value = raw_value.strip().rstrip(",").strip()
+        if raw_value[:1] == "{":
+            if raw_value[-1:] != "}":
+                return raw_value
+            if raw_value[1:2] == "{" and raw_value[-2:-1] == "}":
+                return raw_value[2:-2].strip()
+            return raw_value[1:-1].strip()
+        if raw_value[:1] == '"' and raw_value[-1:] == '"':
+            return raw_value[1:-1].strip()
+        return raw_value
 
-        # Validate the entry starts with something like @type{ID,
-        if not re.match(r"^@\w+\s*{", entry_string):
-            raise KeyError(f"Invalid BibTeX entry format:\n\n{entry_string}\n\n")
 
-        # Clean up trailing junk
-        entry_string = entry_string.rstrip("}").rstrip(",\n")
+def _scan_entry(buffer: str, entry_start: re.Match[str]) -> Optional[EntryToken]:
+    """
+    Scan a single entry, starting at the already matched `@type{` and ending at its closing brace.
 
-        # Find the first `{` after entry type and extract what's inside
-        start = entry_string.find('{')
-        if start == -1:
-            raise KeyError(f"Could not split the fields of the entry:\n\n{entry_string}\n\n")
+    The scanner keeps track of the brace depth and of quoted values, so that commas and braces inside of field values
+    never end a field or the entry, no matter where the line breaks are.
 
-        entry_string = entry_string[start + 1:]
+    :param buffer: The string containing the entry
+    :param entry_start: The match of `_ENTRY_START` at the beginning of the entry
+    :return: The `EntryToken`, or `None` if the buffer ends before the entry is closed
+    """
+    start: int = entry_start.start()
+    simple_entry = _SIMPLE_ENTRY.match(buffer, start)
+    if simple_entry is not None:
+        text: str = buffer[start:simple_entry.end()]
+        return EntryToken(
+            entry_type=entry_start.group(1),
+            name=simple_entry.group(2),
+            fields=[
+                (_field_keys.get(field[1]) or _field_key(field[1]), field.start(2), field.end(2))
+                for field in _FIELD.finditer(text, simple_entry.start(3) - start, simple_entry.end(3) - start)
+            ],
+            text=text,
+            offset=start,
+        )
 
-        # Normalize comma-space-newline to comma-newline
-        # It is possible to have trailing white spaces on the line `author = {{John Doe}}, \n`,
-        # which we need to remove before we can split the entry into each field.
-        entry_string = re.sub(r",\s*\n", ",\n", entry_string)
+    position: int = entry_start.end()
+    fields: List[FieldSlice] = []
+
+    name_end = _NAME_END.search(buffer, position)
+    if name_end is None:
+        return None
+    name: str = buffer[position:name_end.start()].strip()
+    position = name_end.end()
+    delimiter: str = name_end.group()
+
+    while delimiter != "}":
+        key_end = _KEY_END.search(buffer, position)
+        if key_end is None:
+            return None
+        key: str = _field_key(buffer[position:key_end.start()].strip())
+        delimiter = key_end.group()
+        position = key_end.end()
+        if delimiter != "=":
+            # A key without a value, or just the empty space after a trailing comma
+            if key:
+                fields.append((key, key_end.start() - start, key_end.start() - start))
+            continue
+
+        value_start: int = position
+        depth: int = 0
+        inside_quotes: bool = False
+        while True:
+            special = _VALUE_SPECIAL_CHARACTERS.search(buffer, position)
+            if special is None:
+                return None
+            character: str = special.group()
+            position = special.end()
+            if character == "{":
+                depth += 1
+            elif character == "}":
+                if depth == 0:
+                    break
+                depth -= 1
+            elif depth == 0:
+                if character == '"':
+                    inside_quotes = not inside_quotes
+                elif not inside_quotes:
+                    break
+        fields.append((key, value_start - start, special.start() - start))
+        delimiter = character
+
+    return EntryToken(
+        entry_type=entry_start.group(1),
+        name=name,
+        fields=fields,
+        text=buffer[start:position],
+        offset=start,
+    )
+
+
+def _scan_unclosed_entry(buffer: str, entry_start: re.Match[str]) -> EntryToken:
+    """
+    Scan an entry that is not closed before the end of the buffer. Like the line based parser did, the entry is assumed
+    to end before the next entry that starts at the beginning of a line, and its fields up to there are scanned as if
+    the entry was closed there.
 
-        raw_fields = entry_string.split(",\n")
-        if raw_fields:
-            raw_fields.pop(0)  # remove entry ID
+    :param buffer: The string containing the entry, up to the end of the file
+    :param entry_start: The match of `_ENTRY_START` at the beginning of the entry
+    :return: The `EntryToken` with `closed` set to `False`
+    """
+    start: int = entry_start.start()
+    next_entry = _LINE_ENTRY_START.search(buffer, entry_start.end())
+    text: str = buffer[start:next_entry.start() if next_entry is not None else len(buffer)].rstrip()
+    # Close the open values and the entry itself
+    closed_text: str = text + "}" * max(1, text.count("{") - text.count("}"))
+    closed_entry_start = _ENTRY_START.match(closed_text)
+    token: Optional[EntryToken] = _scan_entry(closed_text, closed_entry_start) if closed_entry_start else None
+    if token is None:
+        # E.g. a quoted value that is not closed either
+        name = _ENTRY_NAME.match(buffer, entry_start.end())
+        return EntryToken(entry_type=entry_start.group(1), name=name.group(1) if name else "", fields=[], text=text,
+                          offset=start, closed=False)
+    return EntryToken(
+        entry_type=token.entry_type,
+        name=token.name,
+        fields=[(key, min(value_start, len(text)), min(value_end, len(text)))
+                for key, value_start, value_end in token.fields],
+        text=text,
+        offset=start,
+        closed=False,
+    )
+
+
+def _lookahead_end(buffer: str, entry_start: re.Match[str], end: Optional[int] = None) -> Optional[int]:
+    """
+    The offset up to which the entry needs to be closed, see `UNCLOSED_ENTRY_LOOKAHEAD`, or `None` if no entry starts
+    at the beginning of a line after it (before `end`).
+    """
+    next_entry = _LINE_ENTRY_START.search(buffer, entry_start.end(), len(buffer) if end is None else end)
+    return None if next_entry is None else next_entry.start() + UNCLOSED_ENTRY_LOOKAHEAD
 
-        return raw_fields
 
-    @staticmethod
-    def _parse_field_value(raw_value: str) -> str:
-        """
-        Parse and normalize a field value.
+def _scan_entry_or_unclosed(buffer: str, entry_start: re.Match[str], partial: bool = False) -> Optional[EntryToken]:
+    """
+    Scan an entry, see `_scan_entry`, or the entry that is cut off if it is not closed in time, see `EntryToken.closed`.
 
-        This will remove brackets `{}`, double brackets `{{}}`, quotation marks `"` and all additional stuff like
-        commas `,` and white spaces from the field value, while leaving the value itself intact.
+    :param partial: Whether the buffer only contains the beginning of the content
+    :return: The `EntryToken`, or `None` if the buffer is `partial` and the entry might still be closed after its end
+    """
+    token: Optional[EntryToken] = _scan_entry(buffer, entry_start)
+    if token is None:
+        if partial:
+            lookahead_end: Optional[int] = _lookahead_end(buffer, entry_start)
+            if lookahead_end is None or lookahead_end > len(buffer):
+                return None
+        return _scan_unclosed_entry(buffer, entry_start)
+    if len(token.text) > UNCLOSED_ENTRY_LOOKAHEAD:
+        # Only a large entry can be closed too late
+        end: int = token.offset + len(token.text)
+        lookahead_end = _lookahead_end(buffer, entry_start, end)
+        if lookahead_end is not None and end > lookahead_end:
+            return _scan_unclosed_entry(buffer, entry_start)
+    return token
+
+
+def _casefold_names(names: Optional[AbstractSet[str]]) -> Optional[AbstractSet[str]]:
+    return None if names is None else {name.casefold() for name in names}
+
+
+def tokenize(raw_content: str, names: Optional[AbstractSet[str]] = None, start: int = 0) -> Iterator[EntryToken]:
+    """
+    Scan a string containing one or more entries in a single pass and yield an `EntryToken` for each entry.
 
-        Note:
-          This does not change the `\\url{}` or `\\href{}{}` constructs, if they exist in the value.
+    Everything outside of entries is skipped. An entry that is not closed in time ends before the next entry starting
+    at the beginning of a line, see `EntryToken.closed`.
 
-        :param raw_value: The raw string of the value
-        :return: The normalized value
-        """
-        # First we remove the trailing comma, and any spaces before and after it.
-        raw_value = raw_value.strip().rstrip(',').strip()
+    :param raw_content: Single string with one or more entries
+    :param names: If given, only the entries with one of these names (ignoring the case, like BibTeX) are scanned. All
+        other entries are skipped up to the next `@type{`, without looking at their fields.
+    :param start: The offset in `raw_content` to start scanning at. The `EntryToken.offset` still refers to the whole
+        string.
+    :return: Iterator over the `EntryToken`s in the order they appear in the string
+    """
+    return _tokenize(raw_content, _casefold_names(names), start)
 
-        # If the value is in double brackets `{{`, we remove them
-        if raw_value.startswith('{{') and raw_value.endswith('}}'):
-            return raw_value[2:-2].strip()
 
-        # If the value is in single brackets `{`, we remove them
-        if (raw_value.startswith('{') and raw_value.endswith('}')) or \
-                (raw_value.startswith('"') and raw_value.endswith('"')):
-            return raw_value[1:-1].strip()
+def tokenize_prefix(raw_content: str, names: Optional[AbstractSet[str]] = None) -> Tuple[List[EntryToken], int]:
+    """
+    Like `tokenize`, for a string that is only the beginning of the content, e.g. a chunk of a file. The scanning stops
+    before the first entry that is not closed in the string, but might still be closed after its end.
 
-        return raw_value
+    :return: The `EntryToken`s, and the offset up to which the string was consumed. The rest of the string needs to be
+        scanned again, together with the content following it.
+    """
+    tokens: List[EntryToken] = []
+    scanning: Iterator[EntryToken] = _tokenize(raw_content, _casefold_names(names), partial=True)
+    while True:
+        try:
+            tokens.append(next(scanning))
+        except StopIteration as stop:
+            return tokens, stop.value
 
-    @staticmethod
-    def _split_field_into_key_and_value(raw_field: str) -> Tuple[str, str]:
-        """
-        Splits a field, such as `author = {{John Doe}},` into the field's key and value and cleans up both.
 
-        :param raw_field:
-        :return:
-        """
-        parts = raw_field.split("=", 1)
-        key = parts[0].strip().lower()
-        value = parts[1].strip() if len(parts) > 1 else ""
-        return key, BibTeXEntry._parse_field_value(value)
+def _tokenize(raw_content: str, names: Optional[AbstractSet[str]], start: int = 0,
+              partial: bool = False) -> Generator[EntryToken, None, int]:
+    """
+    The implementation of `tokenize` and `tokenize_prefix`, which returns the offset up to which the string was
+    consumed.
+    """
+    position: int = start
+    while True:
+        entry_start = _ENTRY_START.search(raw_content, position)
+        if entry_start is None:
+            return len(raw_content)
+        if names is not None:
+            name = _ENTRY_NAME.match(raw_content, entry_start.end())
+            if name is not None and name.group(1).casefold() not in names:
+                position = name.end()
+                continue
+        token = _scan_entry_or_unclosed(raw_content, entry_start, partial)
+        if token is None:
+            return entry_start.start()
+        position = token.offset + len(token.text)
+        yield token
 
 
 def split_entries(raw_content: str) -> List[str]:
@@ -145,37 +509,83 @@ def split_entries(raw_content: str) -> List[str]:
     further parsing
 
     :param raw_content: Single string with one or more entries
-    :return: List of substrings containing one entry each
+    :return: List of substrings containing one entry each. Entries that are not closed are left out.
     """
-    entries = []
-    brace_count = 0
-    current_entry = []
-    inside_entry = False
+    return [token.text for token in tokenize(raw_content) if token.closed]
 
-    for line in raw_content.splitlines():
-        line = line.strip()
-        if line.startswith('@'):
-            inside_entry = True
-            brace_count = 0
-            current_entry = [line]
-            brace_count += line.count('{') - line.count('}')
-        elif inside_entry:
-            current_entry.append(line)
-            brace_count += line.count('{') - line.count('}')
-            if brace_count == 0:
-                entries.append('\n'.join(current_entry))
-                inside_entry = False
 
-    return entries
+def tokenize_stream(file: TextIO, chunk_size: int = 1 << 16,
+                    names: Optional[AbstractSet[str]] = None) -> Iterator[EntryToken]:
+    """
+    Like `tokenize`, but read the content from a file object in chunks of `chunk_size` characters.
+
+    Only the part of the content that has not been tokenized yet is kept in memory, so the memory usage does not depend
+    on the size of the file, but only on the size of the largest entry. An entry that is not closed is emitted as soon
+    as the next entry starting at the beginning of a line and `UNCLOSED_ENTRY_LOOKAHEAD` characters after it have
+    been read, see `EntryToken.closed`, so it does not make the rest of the file end up in the buffer.
+    The `EntryToken.offset` refers to the position in the whole file, not in the current chunk.
+
+    :param file: A file object opened in text mode
+    :param chunk_size: Number of characters to read at once
+    :param names: If given, only the entries with one of these names are scanned, see `tokenize`
+    :return: Iterator over the `EntryToken`s in the order they appear in the file
+    """
+    names = _casefold_names(names)
+    buffer: str = ""
+    buffer_offset: int = 0
+    read_size: int = chunk_size
+    while True:
+        chunk: str = file.read(read_size)
+        buffer += chunk
+        position: int = 0
+        while True:
+            entry_start = _ENTRY_START.search(buffer, position)
+            if entry_start is None:
+                # Keep a possibly cut off `@type` at the end of the buffer for the next round
+                last_at: int = buffer.rfind("@", position)
+                position = last_at if last_at != -1 else len(buffer)
+                break
+            if names is not None:
+                name = _ENTRY_NAME.match(buffer, entry_start.end())
+                if name is not None and name.end() == len(buffer) and chunk:
+                    # The name might continue in the next chunk
+                    position = entry_start.start()
+                    break
+                if name is not None and name.group(1).casefold() not in names:
+                    position = name.end()
+                    continue
+            token = _scan_entry_or_unclosed(buffer, entry_start, partial=bool(chunk))
+            if token is None:
+                position = entry_start.start()
+                break
+            position = token.offset + len(token.text)
+            token.offset += buffer_offset
+            yield token
+        if not chunk:
+            return
+        # While a single large entry (or an unclosed one and its lookahead) fills the whole buffer, read more at once,
+        # so that it is not scanned again and again for every chunk
+        read_size = chunk_size if position > 0 else 2 * read_size
+        buffer = buffer[position:]
+        buffer_offset += position
+
+
+def iter_bibtex_file(filename: str, chunk_size: int = 1 << 16, lazy: bool = False,
+                     names: Optional[AbstractSet[str]] = None) -> Iterator[BibTeXEntry]:
+    """
+    Parse a BibTeX file and yield the parsed `BibTeXEntry`s one by one, while the file is read in chunks.
+
+    Use this instead of `parse_bibtex_file` for large files, that do not need to be held in memory as a whole.
+    If `lazy` is `True`, the field values are only normalized when they are accessed, see `LazyFields`.
+    If `names` is given, only the entries with one of these names are parsed, see `tokenize`.
+    """
+    with open(filename, "r") as file:
+        for token in tokenize_stream(file, chunk_size, names):
+            yield BibTeXEntry.from_token(token, strip_lines=True, lazy=lazy)
 
 
-def parse_bibtex_file(filename: str) -> List[BibTeXEntry]:
+def parse_bibtex_file(filename: str, lazy: bool = False) -> List[BibTeXEntry]:
     """
     Parse a BibTeX file and return the list of parsed `BibTeXEntry`s
     """
-    with open(filename, "r") as file:
-        raw_entries: List[str] = split_entries(file.read())
-        entries: List[BibTeXEntry] = []
-        for raw_entry_string in raw_entries:
-            entries.append(BibTeXEntry.from_string(raw_entry_string))
-    return entries
+    return list(iter_bibtex_file(filename, lazy=lazy))
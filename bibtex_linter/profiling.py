@@ -0,0 +1,176 @@
+"""
+This module implements profiling the rules of a ruleset.
+
+The `Profiler` verifies entries just like `Ruleset.verify`, but measures the time of each rule call. The time spent
+parsing the entries is measured separately, so that slow rules can be told apart from a slow parser.
+"""
+from typing import AbstractSet, Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import dataclasses
+import time
+
+from bibtex_linter.parser import BibTeXEntry, EntryToken, tokenize_stream
+from bibtex_linter.verification import EntryResult, Ruleset, RuleSnapshot, Violation, ViolationLike, default_ruleset, \
+    parser_violations, rule_name
+
+# The key of the statistics of a rule for one entry type
+_RuleKey = Tuple[Callable[[BibTeXEntry], Sequence[ViolationLike]], str]
+
+
+@dataclasses.dataclass(slots=True)
+class RuleStatistics:
+    """
+    The measurements of a rule, either for all entry types or for a single one.
+
+    :ivar calls: Number of calls of the rule
+    :ivar total_time: Total time spent in the rule, in seconds
+    :ivar max_time: Longest single call of the rule, in seconds
+    :ivar violations: Number of invariant violations returned by the rule
+    """
+    calls: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    violations: int = 0
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def add(self, other: "RuleStatistics") -> None:
+        self.calls += other.calls
+        self.total_time += other.total_time
+        self.max_time = max(self.max_time, other.max_time)
+        self.violations += other.violations
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "total_time": self.total_time,
+            "mean_time": self.mean_time,
+            "max_time": self.max_time,
+            "violations": self.violations,
+        }
+
+
+class Profiler:
+    """
+    Verify entries while measuring the parse time, the verification time and the time of each rule per entry type.
+
+    :param ruleset: The ruleset to verify the entries with. If `None`, the default ruleset is used, like
+        `verification.verify` does.
+    """
+    def __init__(self, ruleset: Optional[Ruleset] = None) -> None:
+        self.ruleset: Ruleset = ruleset if ruleset is not None else default_ruleset()
+        self.number_of_entries: int = 0
+        self.parse_time: float = 0.0
+        self.verify_time: float = 0.0
+        # The statistics by the rule and the entry type it was called for. The rules themselves are the keys, since
+        # different rules may have the same name.
+        self.rule_statistics: Dict[_RuleKey, RuleStatistics] = {}
+
+    def verify(self, entry: BibTeXEntry) -> List[ViolationLike]:
+        """
+        Execute all rules for the entry, like `Ruleset.verify`, and measure each of them.
+        """
+        errors: List[ViolationLike] = parser_violations(entry)
+        verify_start: float = time.perf_counter()
+        # Read the snapshot only once, so that all rules come from the same one
+        snapshot: RuleSnapshot = self.ruleset.snapshot()
+        for check in snapshot.rules_for(entry.entry_type):
+            start: float = time.perf_counter()
+            violations: Sequence[ViolationLike] = check(entry)
+            duration: float = time.perf_counter() - start
+            key: _RuleKey = (check, entry.entry_type)
+            statistics: Optional[RuleStatistics] = self.rule_statistics.get(key)
+            if statistics is None:
+                statistics = self.rule_statistics[key] = RuleStatistics()
+            statistics.calls += 1
+            statistics.total_time += duration
+            if duration > statistics.max_time:
+                statistics.max_time = duration
+            statistics.violations += len(violations)
+            if violations:
+                name: str = rule_name(check)
+                for violation in violations:
+                    # Like `Ruleset.verify`, name the rule of the violations that the rule did not name itself
+                    if isinstance(violation, Violation) and violation.rule is None:
+                        violation.rule = name
+                errors.extend(violations)
+        self.verify_time += time.perf_counter() - verify_start
+        self.number_of_entries += 1
+        return errors
+
+    def verify_file(self, filename: str, names: Optional[AbstractSet[str]] = None) -> Iterator[EntryResult]:
+        """
+        Parse and verify a BibTeX file entry by entry, measuring the parsing and the verification.
+
+        The field values are parsed eagerly, so that their parse time is not attributed to the first rule accessing
+        them. If `names` is given, only the entries with one of these names are parsed, see `parser.tokenize`.
+        """
+        with open(filename, "r") as file:
+            tokens: Iterator[EntryToken] = tokenize_stream(file, names=names)
+            while True:
+                start: float = time.perf_counter()
+                token: Optional[EntryToken] = next(tokens, None)
+                if token is None:
+                    self.parse_time += time.perf_counter() - start
+                    return
+                entry: BibTeXEntry = BibTeXEntry.from_token(token, strip_lines=True)
+                self.parse_time += time.perf_counter() - start
+                yield EntryResult(name=entry.name, entry_type=entry.entry_type, violations=self.verify(entry))
+
+    def statistics_by_rule(self) -> List[Tuple[str, RuleStatistics, Dict[str, RuleStatistics]]]:
+        """
+        Return the name and the statistics of each rule over all entry types, together with the statistics per entry
+        type, sorted by the total time (the slowest rule first). Different rules with the same name are listed
+        separately.
+        """
+        by_rule: Dict[Callable[[BibTeXEntry], Sequence[ViolationLike]],
+                      Tuple[RuleStatistics, Dict[str, RuleStatistics]]] = {}
+        for (rule, entry_type), statistics in self.rule_statistics.items():
+            total, by_entry_type = by_rule.setdefault(rule, (RuleStatistics(), {}))
+            total.add(statistics)
+            by_entry_type[entry_type] = statistics
+        return sorted(((rule_name(rule), total, by_entry_type) for rule, (total, by_entry_type) in by_rule.items()),
+                      key=lambda item: item[1].total_time, reverse=True)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "entries": self.number_of_entries,
+            "parse_time": self.parse_time,
+            "verify_time": self.verify_time,
+            "rules": [
+                {
+                    "rule": name,
+                    **total.to_json(),
+                    "entry_types": {entry_type: statistics.to_json()
+                                    for entry_type, statistics in sorted(by_entry_type.items())},
+                }
+                for name, total, by_entry_type in self.statistics_by_rule()
+            ],
+        }
+
+    def format_table(self) -> str:
+        """
+        Format the measurements as a table, with a row per rule (the slowest rule first), each followed by a row per
+        entry type, if the rule was called for more than one entry type.
+        """
+        lines: List[str] = [
+            f"Profile of {self.number_of_entries} entries:",
+            f"  Parsing:      {self.parse_time:10.3f} s",
+            f"  Verification: {self.verify_time:10.3f} s",
+            "",
+            f"  {'Rule':<40} {'Calls':>9} {'Total [ms]':>11} {'Mean [µs]':>10} {'Max [µs]':>10} {'Violations':>10}",
+        ]
+        for name, total, by_entry_type in self.statistics_by_rule():
+            lines.append(_format_row(name, total))
+            if len(by_entry_type) == 1:
+                continue
+            for entry_type, statistics in sorted(by_entry_type.items(),
+                                                 key=lambda item: item[1].total_time, reverse=True):
+                lines.append(_format_row(f"  {entry_type}", statistics))
+        return "\n".join(lines)
+
+
+def _format_row(name: str, statistics: RuleStatistics) -> str:
+    return (f"  {name:<40} {statistics.calls:>9} {statistics.total_time * 1e3:>11.2f} "
+            f"{statistics.mean_time * 1e6:>10.2f} {statistics.max_time * 1e6:>10.2f} {statistics.violations:>10}")
@@ -0,0 +1,168 @@
+"""
+This module implements loading the rulesets, either the ones shipped with the `bibtex_linter` or custom ones from a
+path.
+
+Loading a ruleset imports its module, which registers its rules via the `@linter_rule` decorator.
+Declarative rulesets in a `.toml` file are compiled and registered via `declarative.load_field_rules`.
+
+`load_ruleset` registers the rules in the default ruleset of the process, which is used by `verification.verify`.
+`create_ruleset` instead loads a ruleset into its own `Ruleset` object, so that several rulesets can be used side by
+side, e.g. to check the same entries against several citation styles via `verify_file_with_rulesets`.
+
+Both can be called from several threads at once. The modules of custom rulesets are imported under unique module
+names, so that they never replace each other in `sys.modules`.
+"""
+from typing import AbstractSet, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+import importlib
+import importlib.util
+import itertools
+import operator
+import os
+import sys
+import threading
+
+from bibtex_linter.declarative import load_field_rules
+from bibtex_linter.parser import iter_bibtex_file
+from bibtex_linter.verification import EntryResult, Ruleset, collecting_rules, collecting_ruleset
+
+# Maps the names of the shipped rulesets to their modules
+BUILTIN_RULESETS = {
+    "default": "bibtex_linter.ieeetr_rules",
+    "ieeetr": "bibtex_linter.ieeetr_rules",
+    "IEEEtran": "bibtex_linter.ieeetran_rules",
+}
+
+# The rulesets that have already been loaded in this process, so that their rules are not registered twice.
+_loaded_rulesets: Set[Optional[str]] = set()
+# Held while loading or creating a ruleset, so that a ruleset that is requested by several threads is loaded only once.
+# Reentrant, since a ruleset could load another one while being loaded.
+_loading_lock: threading.RLock = threading.RLock()
+# Numbers the modules of the rulesets, see `import_from_path`
+_module_numbers: Iterator[int] = itertools.count()
+# Files up to this size (in bytes) are parsed only once for all rulesets by `verify_file_with_rulesets`. Larger files
+# are parsed once per ruleset instead, since the results for the other rulesets would be kept in memory meanwhile.
+MAX_SHARED_PARSE_SIZE: int = 1 << 24
+
+
+def import_from_path(file_path: str, module_name: Optional[str] = None) -> None:
+    """
+    Import a given module using its path.
+
+    The file of the module and the files of the modules it imports from its own directory (or below) are added to the
+    `Ruleset.source_files` of the ruleset that collects the rules, see `cache.ruleset_fingerprint`.
+
+    :param module_name: The name of the module in `sys.modules`. If `None`, a unique name is used.
+    """
+    if module_name is None:
+        module_name = f"bibtex_linter_ruleset_{next(_module_numbers)}"
+    # (2025-04-24, s-heppner)
+    # This is taken directly from the importlib documentation:
+    # https://docs.python.org/3/library/importlib.html#importing-a-source-file-directly
+    # It seems a bit cursed, but I guess as long as it works and really only used on known and safe `rules.py`...
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    if not spec or not spec.loader:
+        raise ImportError(f"Could not import ruleset from '{file_path}'.")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    modules_before: Set[str] = set(sys.modules)
+    spec.loader.exec_module(module)
+    directory: str = os.path.join(os.path.dirname(os.path.abspath(file_path)), "")
+    source_files: List[str] = [file_path]
+    for imported_module_name in set(sys.modules) - modules_before:
+        imported_file: Optional[str] = getattr(sys.modules.get(imported_module_name), "__file__", None)
+        if imported_file and os.path.abspath(imported_file).startswith(directory):
+            source_files.append(imported_file)
+    collecting_ruleset().add_source_files(source_files)
+
+
+def load_ruleset(ruleset: Optional[str]) -> None:
+    """
+    Load a ruleset, unless it has already been loaded in this process.
+
+    :param ruleset: Name of one of the `BUILTIN_RULESETS`, path to a `rules.py` or to a declarative `rules.toml`.
+        If `None`, the default ruleset (ieeetr) is loaded.
+    """
+    with _loading_lock:
+        if ruleset in _loaded_rulesets:
+            return
+        if ruleset is None:
+            importlib.import_module(BUILTIN_RULESETS["default"])
+        elif ruleset in BUILTIN_RULESETS:
+            importlib.import_module(BUILTIN_RULESETS[ruleset])
+        elif ruleset.endswith(".toml"):
+            load_field_rules(ruleset)
+        else:
+            import_from_path(ruleset)
+        _loaded_rulesets.add(ruleset)
+
+
+# The rulesets created by `create_ruleset`, by the name or path they were created from
+_created_rulesets: Dict[Optional[str], Ruleset] = {}
+
+
+def create_ruleset(ruleset: Optional[str]) -> Ruleset:
+    """
+    Load a ruleset into its own `Ruleset` object, instead of the default ruleset (see `load_ruleset`).
+
+    The module of the ruleset is executed again for this, under a module name of its own, so that the rules of
+    different rulesets never mix. Each ruleset is only created once per process.
+
+    :param ruleset: Name of one of the `BUILTIN_RULESETS`, path to a `rules.py` or to a declarative `rules.toml`.
+        If `None`, the default ruleset (ieeetr) is created.
+    """
+    created_ruleset: Optional[Ruleset] = _created_rulesets.get(ruleset)
+    if created_ruleset is not None:
+        return created_ruleset
+    with _loading_lock:
+        # Another thread may have created the ruleset while this one waited for the lock
+        created_ruleset = _created_rulesets.get(ruleset)
+        if created_ruleset is not None:
+            return created_ruleset
+        created_ruleset = Ruleset(ruleset if ruleset is not None else "default")
+        with collecting_rules(created_ruleset):
+            if ruleset is None or ruleset in BUILTIN_RULESETS:
+                spec = importlib.util.find_spec(BUILTIN_RULESETS[ruleset if ruleset is not None else "default"])
+                if not spec or not spec.origin:
+                    raise ImportError(f"Could not find the ruleset '{ruleset}'.")
+                import_from_path(spec.origin)
+            elif ruleset.endswith(".toml"):
+                load_field_rules(ruleset)
+            else:
+                import_from_path(ruleset)
+        _created_rulesets[ruleset] = created_ruleset
+        return created_ruleset
+
+
+def _verify_file(filename: str, ruleset: Ruleset, names: Optional[AbstractSet[str]]) -> Iterator[EntryResult]:
+    for entry in iter_bibtex_file(filename, lazy=True, names=names):
+        yield EntryResult(name=entry.name, entry_type=entry.entry_type, violations=ruleset.verify(entry))
+
+
+def verify_file_with_rulesets(filename: str, rulesets: Sequence[Ruleset],
+                              names: Optional[AbstractSet[str]] = None,
+                              max_shared_parse_size: int = MAX_SHARED_PARSE_SIZE) -> List[Iterator[EntryResult]]:
+    """
+    Parse a BibTeX file once and verify each entry with all of the given rulesets.
+    If `names` is given, only the entries with one of these names are parsed, see `parser.tokenize`.
+
+    The results are usually consumed one ruleset after another, so while iterating over the results of one ruleset,
+    the results for all other rulesets are kept in memory, which grows with the number of entries. Therefore, a file
+    larger than `max_shared_parse_size` bytes is parsed again for each ruleset instead.
+
+    :return: An iterator over the `EntryResult`s of each ruleset, in the order of the rulesets. The file is parsed
+        while iterating over them. Iterating raises the `OSError`, if the file could not be read.
+    """
+    try:
+        size: int = os.path.getsize(filename)
+    except OSError:
+        # Reported while iterating
+        size = max_shared_parse_size + 1
+    if len(rulesets) < 2 or size > max_shared_parse_size:
+        return [_verify_file(filename, ruleset, names) for ruleset in rulesets]
+    results: Iterator[Tuple[EntryResult, ...]] = (
+        tuple(EntryResult(name=entry.name, entry_type=entry.entry_type, violations=ruleset.verify(entry))
+              for ruleset in rulesets)
+        for entry in iter_bibtex_file(filename, lazy=True, names=names)
+    )
+    return [map(operator.itemgetter(index), results_of_ruleset)
+            for index, results_of_ruleset in enumerate(itertools.tee(results, len(rulesets)))]
@@ -1,43 +1,581 @@
 """
 This module implements verification of constraints or invariants.
 
-When using the decorators, they automatically load the method below them into the `_rules` list at time
+When using the decorators, they automatically load the method below them into the default ruleset at time
 of import.
+
+Verifying is safe from several threads at once: Each `Ruleset` publishes its rules as an immutable `RuleSnapshot`,
+that is replaced as a whole when a rule is added, so `verify` never sees a half-registered rule and does not need a
+lock.
 """
-from typing import Callable, TypeVar, List, Optional, Set
+from typing import Any, Callable, cast, FrozenSet, Hashable, TypeVar, List, Mapping, Optional, Set, Iterable, \
+    Iterator, Dict, Sequence, Tuple, Union
+import collections
+import contextlib
+import contextvars
+import dataclasses
+import itertools
+import os
+import threading
+
+from bibtex_linter.parser import BibTeXEntry, LazyFields
+
+# The severities of a `Violation`
+SEVERITY_ERROR: str = "error"
+SEVERITY_WARNING: str = "warning"
+
+# The message templates of the helper functions below, see `Violation.template`
+REQUIRED_FIELDS_TEMPLATE: str = "Entry '{entry_name}' misses the following required fields: [{fields}]"
+REQUIRED_FIELD_TEMPLATE: str = "Entry '{entry_name}' misses required field [{fields}]. {explanation}"
+OMITTED_FIELDS_TEMPLATE: str = ("Entry '{entry_name}' has fields present that would be omitted in the compiled "
+                                "document: [{fields}]. This could lead to a loss of information.")
+DISALLOWED_FIELDS_TEMPLATE: str = ("Entry '{entry_name}' has fields present that would be omitted in the compiled "
+                                   "document: [{fields}].")
+DISALLOWED_FIELD_TEMPLATE: str = "Entry '{entry_name}' contains disallowed field [{fields}]. {explanation}"
+UNCLOSED_ENTRY_TEMPLATE: str = ("Entry '{entry_name}' is never closed, it was cut off before the next entry starting "
+                                "at the beginning of a line.")
+# The rule of the violation reported for an entry that is never closed, see `BibTeXEntry.closed`
+UNCLOSED_ENTRY_RULE: str = "unclosed_entry"
+
+
+class Violation:
+    """
+    A structured invariant violation of an entry, whose message is only rendered when it is needed.
+
+    Rules may return plain strings or `Violation`s. For compatibility with the plain strings, a `Violation` converts
+    to its message via `str()` and compares equal to (and hashes like) its message.
+
+    :ivar template: The template of the message, formatted via `str.format` with `entry_name`, `entry_type`, `fields`
+        (sorted and comma separated) and the `arguments`
+    :ivar entry_name: Name or ID of the entry
+    :ivar entry_type: Type of the entry
+    :ivar fields: The field keys this violation is about
+    :ivar arguments: Further arguments of the `template`
+    :ivar severity: `SEVERITY_ERROR` or `SEVERITY_WARNING`
+    :ivar rule: The name of the rule that found this violation, set by `verify` if the rule did not set it
+    """
+    __slots__ = ("template", "entry_name", "entry_type", "fields", "arguments", "severity", "rule", "_message")
+
+    def __init__(self,
+                 template: str,
+                 entry_name: str,
+                 entry_type: str = "",
+                 fields: Iterable[str] = (),
+                 arguments: Optional[Dict[str, Any]] = None,
+                 severity: str = SEVERITY_ERROR,
+                 rule: Optional[str] = None):
+        self.template: str = template
+        self.entry_name: str = entry_name
+        self.entry_type: str = entry_type
+        self.fields: Iterable[str] = fields
+        self.arguments: Optional[Dict[str, Any]] = arguments
+        self.severity: str = severity
+        self.rule: Optional[str] = rule
+        self._message: Optional[str] = None
 
-from bibtex_linter.parser import BibTeXEntry
+    @property
+    def message(self) -> str:
+        if self._message is None:
+            self._message = self.template.format(
+                entry_name=self.entry_name,
+                entry_type=self.entry_type,
+                fields=", ".join(sorted(self.fields)),
+                **(self.arguments or {}),
+            )
+        return self._message
 
-# The dynamic list of known rules.
-# This list gets updated when a method with the `@linter_rule` decorator gets imported.
-_rules: List[Callable[[BibTeXEntry], List[str]]] = []
+    def __str__(self) -> str:
+        return self.message
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.message!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (str, Violation)):
+            return self.message == str(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.message)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "message": self.message,
+            "entry": self.entry_name,
+            "entry_type": self.entry_type,
+            "fields": sorted(self.fields),
+            "severity": self.severity,
+            "rule": self.rule,
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Violation":
+        """
+        Recreate a `Violation` from the result of `to_json`, with the already rendered message.
+        """
+        violation = cls(template="", entry_name=data["entry"], entry_type=data["entry_type"], fields=data["fields"],
+                        severity=data["severity"], rule=data["rule"])
+        violation._message = data["message"]
+        return violation
+
+
+# An invariant violation as returned by a rule, either a plain string or a structured `Violation`
+ViolationLike = Union[str, Violation]
 
 # For the type annotations, we define a `LINTER_RULE_TYPE` variable, which describes the type of the methods that
-# define the linter rules.
-LINTER_RULE_TYPE = TypeVar("LINTER_RULE_TYPE", bound=Callable[[BibTeXEntry], List[str]])
+# define the linter rules. They may return plain strings, `Violation`s or a mix of both.
+LINTER_RULE_TYPE = TypeVar("LINTER_RULE_TYPE", bound=Callable[[BibTeXEntry], Sequence[ViolationLike]])
+
+# The type of the batch implementation of a linter rule, see `batch_implementation`
+BATCH_RULE_TYPE = TypeVar("BATCH_RULE_TYPE", bound=Callable[["EntryBatch"], Sequence[Sequence[ViolationLike]]])
+
+_T = TypeVar("_T")
+
+
+# Default number of results of rules kept by a `RuleCache`
+DEFAULT_RULE_CACHE_SIZE: int = 100_000
+
+
+def entry_content_key(entry: BibTeXEntry) -> Hashable:
+    """
+    A key that is equal for entries with the same type, name and fields. For lazily parsed entries, the raw text of the
+    entry is used, so that the field values do not need to be normalized for this.
+    """
+    if isinstance(entry.fields, LazyFields):
+        return entry.entry_type, entry.name, entry.fields.text, entry.fields.strip_lines
+    return entry.entry_type, entry.name, tuple(entry.fields.items())
+
+
+class RuleCache:
+    """
+    A bounded in-memory cache of the results of rules, by the rule and the content of the entry (see
+    `entry_content_key`), so that entries that are verified again and again (e.g. the same popular references in many
+    uploaded files) only run each rule once.
+
+    The least recently used results are dropped first. Rules whose result depends on anything else than the type, name
+    and fields of the entry have to opt out via `@linter_rule(pure=False)`.
+
+    The cache can be used from several threads at once. The rules are executed outside of its lock, so a result that
+    is missing may be computed by more than one thread.
+
+    :param max_size: Maximum number of results kept, i.e. of pairs of a rule and an entry
+    :ivar hits: Number of results taken from the cache
+    :ivar misses: Number of results computed by calling the rule
+    """
+    def __init__(self, max_size: int = DEFAULT_RULE_CACHE_SIZE):
+        self.max_size: int = max_size
+        self.hits: int = 0
+        self.misses: int = 0
+        self._results: collections.OrderedDict[Tuple[Callable[[BibTeXEntry], Sequence[ViolationLike]], Hashable],
+                                               Tuple[ViolationLike, ...]] = collections.OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def verify(self, rules: Iterable[Callable[[BibTeXEntry], Sequence[ViolationLike]]],
+               entry: BibTeXEntry) -> List[ViolationLike]:
+        """
+        Execute the rules for the entry, taking the results of the pure rules from the cache, if possible.
+        """
+        errors: List[ViolationLike] = []
+        content_key: Optional[Hashable] = None
+        for check in rules:
+            if not getattr(check, "_is_pure", True):
+                violations: Sequence[ViolationLike] = check(entry)
+                if violations:
+                    _set_rule(violations, check)
+                    errors.extend(violations)
+                continue
+            if content_key is None:
+                content_key = entry_content_key(entry)
+            key = (check, content_key)
+            with self._lock:
+                cached: Optional[Tuple[ViolationLike, ...]] = self._results.get(key)
+                if cached is not None:
+                    self.hits += 1
+                    self._results.move_to_end(key)
+                else:
+                    self.misses += 1
+            if cached is not None:
+                errors.extend(cached)
+                continue
+            violations = check(entry)
+            if violations:
+                _set_rule(violations, check)
+                errors.extend(violations)
+            with self._lock:
+                self._results[key] = tuple(violations)
+                if len(self._results) > self.max_size:
+                    self._results.popitem(last=False)
+        return errors
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(hits={self.hits}, misses={self.misses}, size={len(self)})"
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class RuleSnapshot:
+    """
+    The rules of a `Ruleset` at one point in time. A snapshot is never changed, adding a rule creates a new one (see
+    `with_rule`), so it can be read from several threads without a lock.
+
+    :ivar rules: The rules, in the order they were registered
+    :ivar rules_by_entry_type: The index of the rules by the entry type they apply to, so that `verify` does not have
+        to look at every rule for every entry. Each tuple contains the rules for this entry type, as well as the rules
+        for all entry types, in the order they were registered. The entry types without a rule of their own use
+        `rules_for_all_entry_types`.
+    :ivar rules_for_all_entry_types: The rules for all entry types, in the order they were registered
+    :ivar source_files: The paths of the files the rules were loaded from, e.g. a declarative `rules.toml`, see
+        `cache.ruleset_fingerprint`
+    """
+    rules: Tuple[Callable[[BibTeXEntry], Sequence[ViolationLike]], ...] = ()
+    rules_by_entry_type: Mapping[str, Tuple[Callable[[BibTeXEntry], Sequence[ViolationLike]], ...]] = \
+        dataclasses.field(default_factory=dict)
+    rules_for_all_entry_types: Tuple[Callable[[BibTeXEntry], Sequence[ViolationLike]], ...] = ()
+    source_files: FrozenSet[str] = frozenset()
+
+    def with_rule(self, rule: Callable[[BibTeXEntry], Sequence[ViolationLike]],
+                  entry_type: Optional[str]) -> "RuleSnapshot":
+        """
+        Return a new snapshot with the rule added to the rules and to the index of the rules by entry type.
+        """
+        if entry_type is None:
+            return RuleSnapshot(
+                rules=self.rules + (rule,),
+                rules_by_entry_type={key: rules + (rule,) for key, rules in self.rules_by_entry_type.items()},
+                rules_for_all_entry_types=self.rules_for_all_entry_types + (rule,),
+                source_files=self.source_files,
+            )
+        rules_by_entry_type = dict(self.rules_by_entry_type)
+        rules_by_entry_type[entry_type] = self.rules_for(entry_type) + (rule,)
+        return RuleSnapshot(rules=self.rules + (rule,), rules_by_entry_type=rules_by_entry_type,
+                            rules_for_all_entry_types=self.rules_for_all_entry_types, source_files=self.source_files)
+
+    def with_source_files(self, source_files: Iterable[str]) -> "RuleSnapshot":
+        """
+        Return a new snapshot with the given paths added to the `source_files`.
+        """
+        return dataclasses.replace(self, source_files=self.source_files.union(source_files))
+
+    def rules_for(self, entry_type: str) -> Tuple[Callable[[BibTeXEntry], Sequence[ViolationLike]], ...]:
+        """
+        Return the rules to check for entries of the given entry type, in the order they were registered.
+        """
+        return self.rules_by_entry_type.get(entry_type, self.rules_for_all_entry_types)
+
+
+class Ruleset:
+    """
+    An isolated registry of linter rules, e.g. the rules of one citation style.
+
+    Rules are added via the `rule` decorator of the ruleset. The `@linter_rule` decorator adds the rules to the
+    ruleset that is currently collecting rules, see `collecting_rules`. This is the global default ruleset used by
+    `verify`, unless a ruleset is loaded into its own `Ruleset` via `rulesets.create_ruleset`.
+
+    Rules can be added and entries verified from several threads at once, see `RuleSnapshot`. An entry is verified
+    with the rules registered when its verification started.
+
+    :param name: The name of the ruleset, e.g. `IEEEtran`
+    """
+    def __init__(self, name: str = "default"):
+        self.name: str = name
+        # The current rules, replaced as a whole (under `_lock`) whenever a rule is added
+        self._snapshot: RuleSnapshot = RuleSnapshot()
+        self._lock: threading.Lock = threading.Lock()
+        # If set, `verify` takes the results of the pure rules from this cache, see `memoize`
+        self.rule_cache: Optional[RuleCache] = None
+
+    @property
+    def rules(self) -> Tuple[Callable[[BibTeXEntry], Sequence[ViolationLike]], ...]:
+        """
+        The rules, in the order they were registered.
+        """
+        return self._snapshot.rules
+
+    @property
+    def rules_by_entry_type(self) -> Mapping[str, Tuple[Callable[[BibTeXEntry], Sequence[ViolationLike]], ...]]:
+        return self._snapshot.rules_by_entry_type
+
+    @property
+    def source_files(self) -> FrozenSet[str]:
+        """
+        The paths of the files the rules were loaded from, see `add_source_files`.
+        """
+        return self._snapshot.source_files
+
+    @property
+    def rules_for_all_entry_types(self) -> Tuple[Callable[[BibTeXEntry], Sequence[ViolationLike]], ...]:
+        return self._snapshot.rules_for_all_entry_types
+
+    def snapshot(self) -> RuleSnapshot:
+        """
+        Return the current rules, e.g. to check many entries with the same rules while other threads add rules.
+        """
+        return self._snapshot
+
+    def restore(self, snapshot: RuleSnapshot) -> None:
+        """
+        Replace the rules by the ones of an earlier snapshot, e.g. to remove the rules registered by a test.
+        """
+        with self._lock:
+            self._snapshot = snapshot
+
+    def rule(self, entry_type: Optional[str] = None,
+             pure: bool = True) -> Callable[[LINTER_RULE_TYPE], LINTER_RULE_TYPE]:
+        """
+        Decorator to add a method to this ruleset, like `linter_rule`.
+
+        If `entry_type` is `None`, the rule is checked for all entry types.
+        """
+        def wrapper(func: LINTER_RULE_TYPE) -> LINTER_RULE_TYPE:
+            setattr(func, "_is_invariant", True)
+            setattr(func, "_entry_type", entry_type)
+            if not pure:
+                setattr(func, "_is_pure", False)
+            self.add_rule(func, entry_type)
+            return func
+        return wrapper
+
+    def memoize(self, max_size: int = DEFAULT_RULE_CACHE_SIZE) -> RuleCache:
+        """
+        Let `verify` remember the results of the pure rules of this ruleset in a `RuleCache`, which is returned, e.g.
+        to look at its hits and misses. If the ruleset already has a `RuleCache`, it is kept.
+        """
+        with self._lock:
+            if self.rule_cache is None:
+                self.rule_cache = RuleCache(max_size)
+            return self.rule_cache
+
+    def add_rule(self, rule: Callable[[BibTeXEntry], Sequence[ViolationLike]], entry_type: Optional[str]) -> None:
+        """
+        Add a rule to `rules` and to the index of the rules by entry type.
+        """
+        with self._lock:
+            self._snapshot = self._snapshot.with_rule(rule, entry_type)
+
+    def add_source_files(self, source_files: Iterable[str]) -> None:
+        """
+        Remember the files the rules are loaded from, which are not modules of the rules themselves (e.g. a declarative
+        `rules.toml`, or a module imported by a `rules.py`), so that a change of them invalidates the cached results.
+        """
+        with self._lock:
+            self._snapshot = self._snapshot.with_source_files(os.path.abspath(path) for path in source_files)
+
+    def rules_for(self, entry_type: str) -> Tuple[Callable[[BibTeXEntry], Sequence[ViolationLike]], ...]:
+        """
+        Return the rules to check for entries of the given entry type, in the order they were registered.
+        """
+        return self._snapshot.rules_for(entry_type)
+
+    def verify(self, entry: BibTeXEntry) -> List[ViolationLike]:
+        """
+        Execute all rules of this ruleset for the entry.
+        """
+        # Read the snapshot only once, so that all rules come from the same one
+        snapshot: RuleSnapshot = self._snapshot
+        rules = snapshot.rules_by_entry_type.get(entry.entry_type, snapshot.rules_for_all_entry_types)
+        rule_cache: Optional[RuleCache] = self.rule_cache
+        if rule_cache is not None:
+            return parser_violations(entry) + rule_cache.verify(rules, entry)
+        errors: List[ViolationLike] = parser_violations(entry)
+
+        for check in rules:
+            violations = check(entry)
+            if violations:
+                _set_rule(violations, check)
+                errors.extend(violations)
+
+        return errors
+
+    def verify_batch(self, batch: "EntryBatch") -> List[List[ViolationLike]]:
+        """
+        Execute all rules of this ruleset for the entry type of the batch, using their batch implementation if they
+        have one.
+
+        :return: The invariant violations of each entry, in the same order and as returned by `verify`
+        """
+        entries: List[BibTeXEntry] = batch.entries
+        violations: List[List[ViolationLike]] = [parser_violations(entry) for entry in entries]
+        indices: range = range(len(entries))
+        for check in self._snapshot.rules_for(batch.entry_type):
+            check_batch: Optional[Callable[[EntryBatch], Sequence[Sequence[ViolationLike]]]] = \
+                getattr(check, "_batch_implementation", None)
+            column: Sequence[Sequence[ViolationLike]] = \
+                check_batch(batch) if check_batch is not None else list(map(check, entries))
+            # Only visit the entries that actually violate the rule
+            for index in itertools.compress(indices, column):
+                _set_rule(column[index], check)
+                violations[index].extend(column[index])
+        return violations
+
+    def verify_many(self, entries: Sequence[BibTeXEntry]) -> List["EntryResult"]:
+        """
+        Verify many entries at once. The entries are grouped by entry type into `EntryBatch`es, so that rules with a
+        batch implementation are called only once per entry type.
+
+        :return: The `EntryResult` of each entry, in the same order as the entries
+        """
+        indices_by_entry_type: Dict[str, List[int]] = {}
+        for index, entry in enumerate(entries):
+            indices_by_entry_type.setdefault(entry.entry_type, []).append(index)
+
+        results: List[Optional[EntryResult]] = [None] * len(entries)
+        for entry_type, indices in indices_by_entry_type.items():
+            batch = EntryBatch(entry_type=entry_type, entries=[entries[index] for index in indices])
+            for index, name, entry_violations in zip(indices, batch.names, self.verify_batch(batch)):
+                results[index] = EntryResult(name=name, entry_type=entry_type, violations=entry_violations)
+        return cast(List[EntryResult], results)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.name!r})"
+
+
+# The default ruleset, that `verify` uses and that `rulesets.load_ruleset` loads the rules into.
+# Its rules get updated when a method with the `@linter_rule` decorator gets imported.
+_default_ruleset: Ruleset = Ruleset()
+
+# The ruleset that the `@linter_rule` decorator adds the rules to, see `collecting_rules`. This is a context variable,
+# so that threads loading different rulesets at the same time do not add their rules to each other's ruleset.
+_collecting_ruleset: contextvars.ContextVar[Ruleset] = contextvars.ContextVar("collecting_ruleset",
+                                                                              default=_default_ruleset)
+
+
+@contextlib.contextmanager
+def collecting_rules(ruleset: Ruleset) -> Iterator[Ruleset]:
+    """
+    Context manager, in which the `@linter_rule` decorator adds the rules to the given ruleset instead of the default
+    ruleset, e.g. while importing the module of a ruleset. This only affects the current thread.
+    """
+    token: contextvars.Token[Ruleset] = _collecting_ruleset.set(ruleset)
+    try:
+        yield ruleset
+    finally:
+        _collecting_ruleset.reset(token)
+
+
+def default_ruleset() -> Ruleset:
+    """
+    Return the default ruleset, that `verify` uses and that `rulesets.load_ruleset` loads the rules into.
+    """
+    return _default_ruleset
+
+
+def collecting_ruleset() -> Ruleset:
+    """
+    Return the ruleset that the `@linter_rule` decorator currently adds the rules to, see `collecting_rules`.
+    """
+    return _collecting_ruleset.get()
 
 
-def linter_rule(entry_type: Optional[str] = None) -> Callable[[LINTER_RULE_TYPE], LINTER_RULE_TYPE]:
+def linter_rule(entry_type: Optional[str] = None,
+                pure: bool = True) -> Callable[[LINTER_RULE_TYPE], LINTER_RULE_TYPE]:
     """
     Decorator to mark a method defines rules to be checked by the linter for a specific entry type.
 
     If `entry_type` is `None`, we assume it is valid for all types.
+    If the result of the rule depends on anything else than the type, name and fields of the entry (e.g. on other
+    files or on the time), set `pure` to `False`, so that its results are never taken from a `RuleCache`.
+    """
+    return _collecting_ruleset.get().rule(entry_type, pure)
+
+
+def batch_implementation(rule: Callable[[BibTeXEntry], Sequence[ViolationLike]]
+                         ) -> Callable[[BATCH_RULE_TYPE], BATCH_RULE_TYPE]:
     """
-    def wrapper(func: LINTER_RULE_TYPE) -> LINTER_RULE_TYPE:
-        setattr(func, "_is_invariant", True)
-        setattr(func, "_entry_type", entry_type)
-        _rules.append(func)
+    Decorator to mark a method as the batch implementation of the given linter rule, used by `verify_many`.
+
+    The batch implementation gets an `EntryBatch` of entries of one entry type and has to return the same as calling
+    the rule for each of the entries, i.e. one list of rule violations per entry.
+    """
+    def wrapper(func: BATCH_RULE_TYPE) -> BATCH_RULE_TYPE:
+        setattr(rule, "_batch_implementation", func)
         return func
     return wrapper
 
 
+def rule_name(rule: Callable[[BibTeXEntry], Sequence[ViolationLike]]) -> str:
+    """
+    Return a readable name of a rule, e.g. `check_online` or `field_rule_online` for a declarative rule.
+    """
+    return str(getattr(rule, "__qualname__", None) or getattr(rule, "__name__", None) or repr(rule))
+
+
+def required_fields_violations(entry: BibTeXEntry, fields: Set[str]) -> List[Violation]:
+    """
+    Helper function to check the existence of a set of required fields for the given entry.
+    """
+    if not fields.issubset(entry.fields):
+        missing = fields.difference(entry.fields)
+        return [Violation(REQUIRED_FIELDS_TEMPLATE, entry.name, entry.entry_type, missing)]
+    return []
+
+
+def required_field_violations(entry: BibTeXEntry, field: str, explanation: str) -> List[Violation]:
+    """
+    Helper function to check the existence of one field for the given entry.
+    If it does not exist, include the explanation sentence in the invariant violation text to help the user fill
+    out the required field.
+    """
+    if field not in entry.fields:
+        return [Violation(REQUIRED_FIELD_TEMPLATE, entry.name, entry.entry_type, (field,),
+                          arguments={"explanation": explanation})]
+    return []
+
+
+def omitted_fields_violations(entry: BibTeXEntry, fields: Set[str]) -> List[Violation]:
+    """
+    Helper function to check the existence of a set of omitted fields for the given entry.
+    """
+    omitted_fields_present = fields.intersection(entry.fields)
+
+    if omitted_fields_present:
+        return [Violation(OMITTED_FIELDS_TEMPLATE, entry.name, entry.entry_type, omitted_fields_present)]
+    return []
+
+
+def disallowed_fields_violations(entry: BibTeXEntry, fields: Set[str]) -> List[Violation]:
+    """
+    Helper function to check that no disallowed fields are existing in the given entry.
+    """
+    disallowed_fields_present = fields.intersection(entry.fields)
+
+    if disallowed_fields_present:
+        return [Violation(DISALLOWED_FIELDS_TEMPLATE, entry.name, entry.entry_type, disallowed_fields_present)]
+    return []
+
+
+def disallowed_field_violations(entry: BibTeXEntry, field: str, explanation: str) -> List[Violation]:
+    """
+    Helper function to check the existence of a disallowed one field for the given entry.
+    If it does exist, include the explanation sentence in the invariant violation text to help the user understand
+    why it is disallowed.
+    """
+    if field in entry.fields:
+        return [Violation(DISALLOWED_FIELD_TEMPLATE, entry.name, entry.entry_type, (field,),
+                          arguments={"explanation": explanation})]
+    return []
+
+
+# The `check_*` helpers return the messages as plain strings, like they always did, for the rules that work with
+# strings. They format the messages directly, without creating a `Violation` first. The `*_violations` helpers above
+# return structured `Violation`s with the fields and the severity instead.
+
 def check_required_fields(entry: BibTeXEntry, fields: Set[str]) -> List[str]:
     """
     Helper function to check the existence of a set of required fields for the given entry.
     """
-    existing_fields: Set[str] = set(entry.fields.keys())
     if not fields.issubset(entry.fields):
-        missing = fields - existing_fields
+        missing = fields.difference(entry.fields)
         return [f"Entry '{entry.name}' misses the following required fields: [{', '.join(sorted(missing))}]"]
     return []
 
@@ -48,7 +586,7 @@ def check_required_field(entry: BibTeXEntry, field: str, explanation: str) -> Li
     If it does not exist, include the explanation sentence in the invariant violation text to help the user fill
     out the required field.
     """
-    if field not in entry.fields.keys():
+    if field not in entry.fields:
         return [f"Entry '{entry.name}' misses required field [{field}]. {explanation}"]
     return []
 
@@ -57,8 +595,7 @@ def check_omitted_fields(entry: BibTeXEntry, fields: Set[str]) -> List[str]:
     """
     Helper function to check the existence of a set of omitted fields for the given entry.
     """
-    existing_fields: Set[str] = set(entry.fields.keys())
-    omitted_fields_present = fields & existing_fields
+    omitted_fields_present = fields.intersection(entry.fields)
 
     if omitted_fields_present:
         return [f"Entry '{entry.name}' has fields present that would be omitted in the compiled document: "
@@ -70,8 +607,7 @@ def check_disallowed_fields(entry: BibTeXEntry, fields: Set[str]) -> List[str]:
     """
     Helper function to check that no disallowed fields are existing in the given entry.
     """
-    existing_fields: Set[str] = set(entry.fields.keys())
-    disallowed_fields_present = fields & existing_fields
+    disallowed_fields_present = fields.intersection(entry.fields)
 
     if disallowed_fields_present:
         return [f"Entry '{entry.name}' has fields present that would be omitted in the compiled document: "
@@ -85,22 +621,116 @@ def check_disallowed_field(entry: BibTeXEntry, field: str, explanation: str) ->
     If it does exist, include the explanation sentence in the invariant violation text to help the user understand
     why it is disallowed.
     """
-    if field in entry.fields.keys():
+    if field in entry.fields:
         return [f"Entry '{entry.name}' contains disallowed field [{field}]. {explanation}"]
     return []
 
 
-def verify(entry: BibTeXEntry) -> List[str]:
+def parser_violations(entry: BibTeXEntry) -> List[ViolationLike]:
+    """
+    The violations found while parsing the entry, which are reported by every ruleset before the violations of its
+    rules.
+    """
+    if entry.closed:
+        return []
+    return [Violation(UNCLOSED_ENTRY_TEMPLATE, entry.name, entry.entry_type, rule=UNCLOSED_ENTRY_RULE)]
+
+
+def _set_rule(violations: Iterable[ViolationLike], rule: Callable[[BibTeXEntry], Sequence[ViolationLike]]) -> None:
+    """
+    Set the rule of the `Violation`s, that the rule did not set itself.
+    """
+    name: Optional[str] = None
+    for violation in violations:
+        if isinstance(violation, Violation) and violation.rule is None:
+            if name is None:
+                name = rule_name(rule)
+            violation.rule = name
+
+
+def verify(entry: BibTeXEntry) -> List[ViolationLike]:
     """
     Call this function to execute all imported methods that have the `invariant` decorator.
 
     Warning: This is basically remote code execution, so be sure to know what methods are imported!
     """
-    errors = []
+    return _default_ruleset.verify(entry)
 
-    for check in _rules:
-        entry_type = getattr(check, "_entry_type", None)
-        if entry_type is None or entry_type == entry.entry_type:
-            errors.extend(check(entry))
 
-    return errors
+def memoize(max_size: int = DEFAULT_RULE_CACHE_SIZE) -> RuleCache:
+    """
+    Let `verify` remember the results of the pure rules of the default ruleset, see `Ruleset.memoize`.
+    """
+    return _default_ruleset.memoize(max_size)
+
+
+@dataclasses.dataclass(slots=True)
+class EntryResult:
+    """
+    The result of verifying a single `BibTeXEntry`
+
+    :ivar name: Name or ID of the verified entry
+    :ivar entry_type: Type of the verified entry
+    :ivar violations: The invariant violations found in the entry, empty if the entry passed verification
+    """
+    name: str
+    entry_type: str
+    violations: List[ViolationLike]
+
+
+@dataclasses.dataclass(slots=True)
+class EntryBatch:
+    """
+    A columnar view of entries of the same entry type, that is passed to the batch implementations of linter rules.
+
+    Further columns, such as the field bitmasks of the entries (see `declarative.entry_field_masks`), are computed via
+    `column` on first use and then shared by all rules verifying the batch.
+
+    :ivar entry_type: The entry type of all entries
+    :ivar entries: The entries
+    :ivar names: The names of the entries, in the same order
+    """
+    entry_type: str
+    entries: List[BibTeXEntry]
+    names: List[str] = dataclasses.field(init=False)
+    _columns: Dict[Callable[[List[BibTeXEntry]], List[Any]], List[Any]] = dataclasses.field(
+        init=False, default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        self.names = [entry.name for entry in self.entries]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def column(self, function: Callable[[List[BibTeXEntry]], List[_T]]) -> List[_T]:
+        """
+        Return the column computed by `function` from the entries (one value per entry), computing it only once per
+        batch.
+        """
+        values: Optional[List[_T]] = self._columns.get(function)
+        if values is None:
+            values = function(self.entries)
+            self._columns[function] = values
+        return values
+
+
+def verify_batch(batch: EntryBatch) -> List[List[ViolationLike]]:
+    """
+    Execute all rules of the default ruleset for the entry type of the batch, see `Ruleset.verify_batch`.
+    """
+    return _default_ruleset.verify_batch(batch)
+
+
+def verify_many(entries: Sequence[BibTeXEntry]) -> List[EntryResult]:
+    """
+    Verify many entries at once with the default ruleset, see `Ruleset.verify_many`.
+    """
+    return _default_ruleset.verify_many(entries)
+
+
+def verify_entries(entries: Iterable[BibTeXEntry]) -> Iterator[EntryResult]:
+    """
+    Verify the given entries one after another and yield an `EntryResult` for each of them.
+    """
+    for entry in entries:
+        yield EntryResult(name=entry.name, entry_type=entry.entry_type, violations=verify(entry))
@@ -0,0 +1,118 @@
+"""
+This module implements the watch mode, which keeps the ruleset loaded and verifies files again whenever they change.
+
+The files are polled for modifications. When a file changed, it is parsed again, but only the entries that were added
+or changed since the last time are verified again. All other entries reuse their previous `EntryResult`, which is found
+via the hash of the raw text of the entry.
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import hashlib
+import os
+import time
+
+from bibtex_linter.parser import BibTeXEntry, EntryToken, tokenize_stream
+from bibtex_linter.verification import EntryResult, ViolationLike, verify
+
+# Default number of seconds between two checks for modifications
+DEFAULT_INTERVAL: float = 0.5
+
+
+def verify_changed_entries(tokens: Iterable[EntryToken],
+                           previous_results: Dict[bytes, EntryResult],
+                           verify_entry: Callable[[BibTeXEntry], Sequence[ViolationLike]] = verify
+                           ) -> Tuple[List[EntryResult], Dict[bytes, EntryResult], int]:
+    """
+    Verify the entries, reusing the `EntryResult`s of the entries with the same raw text from `previous_results`.
+
+    :param tokens: The entries to verify
+    :param previous_results: The results of the previous call, by the hash of the raw text of their entries
+    :param verify_entry: The function verifying an entry, e.g. `Ruleset.verify`
+    :return: The `EntryResult`s of all entries, the results to pass as `previous_results` to the next call and the
+        number of entries that were verified again
+    """
+    results: List[EntryResult] = []
+    current_results: Dict[bytes, EntryResult] = {}
+    number_of_verified_entries: int = 0
+    for token in tokens:
+        key: bytes = hashlib.blake2b(token.text.encode(), digest_size=16).digest()
+        result: Optional[EntryResult] = previous_results.get(key) or current_results.get(key)
+        if result is None:
+            entry = BibTeXEntry.from_token(token, strip_lines=True, lazy=True)
+            result = EntryResult(name=entry.name, entry_type=entry.entry_type, violations=list(verify_entry(entry)))
+            number_of_verified_entries += 1
+        current_results[key] = result
+        results.append(result)
+    return results, current_results, number_of_verified_entries
+
+
+class FileWatcher:
+    """
+    Watch a single file and keep the `EntryResult`s of its last verification.
+
+    :param filename: Path to the .bib file
+    """
+    def __init__(self, filename: str):
+        self.filename: str = filename
+        self._last_signature: Optional[Tuple[int, int]] = None
+        self._results: Dict[bytes, EntryResult] = {}
+
+    def has_changed(self) -> bool:
+        """
+        Check whether the file was modified since the last call. A missing file (e.g. while an editor replaces it) is
+        not considered a change.
+        """
+        try:
+            stat = os.stat(self.filename)
+        except OSError:
+            return False
+        signature: Tuple[int, int] = (stat.st_mtime_ns, stat.st_size)
+        changed: bool = signature != self._last_signature
+        self._last_signature = signature
+        return changed
+
+    def verify(self) -> Tuple[List[EntryResult], int]:
+        """
+        Parse the file and verify the entries that were added or changed since the last call.
+
+        :return: The `EntryResult`s of all entries in the file and the number of entries that were verified again
+        """
+        try:
+            file = open(self.filename, "r")
+        except OSError:
+            # Make sure that the file is read again in the next round
+            self._last_signature = None
+            raise
+        with file:
+            results, self._results, number_of_verified_entries = verify_changed_entries(tokenize_stream(file),
+                                                                                        self._results)
+        return results, number_of_verified_entries
+
+
+def watch(filenames: Iterable[str],
+          on_change: Callable[[str, List[EntryResult], int], None],
+          interval: float = DEFAULT_INTERVAL,
+          max_rounds: Optional[int] = None) -> None:
+    """
+    Watch the given files and verify them whenever they change, including once at the start.
+
+    :param filenames: Paths to the .bib files
+    :param on_change: Called with the filename, the `EntryResult`s of all of its entries and the number of entries that
+        were verified again, whenever a file was verified
+    :param interval: Number of seconds between two checks for modifications
+    :param max_rounds: Stop after this many checks. If `None`, watch until interrupted.
+    """
+    watchers: List[FileWatcher] = [FileWatcher(filename) for filename in filenames]
+    rounds: int = 0
+    while max_rounds is None or rounds < max_rounds:
+        if rounds:
+            time.sleep(interval)
+        rounds += 1
+        for watcher in watchers:
+            if not watcher.has_changed():
+                continue
+            try:
+                results, number_of_verified_entries = watcher.verify()
+            except OSError:
+                # The file vanished between checking and reading it, we try again in the next round
+                continue
+            on_change(watcher.filename, results, number_of_verified_entries)
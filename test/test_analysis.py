@@ -0,0 +1,60 @@
+import importlib.util
+import unittest
+
+from bibtex_linter.declarative import FieldRule
+from bibtex_linter.parser import BibTeXEntry
+
+NUMPY_AVAILABLE: bool = importlib.util.find_spec("numpy") is not None
+if NUMPY_AVAILABLE:
+    from bibtex_linter.analysis import FieldPresenceMatrix, check_field_rules, field_rule_reports
+
+ENTRIES = [
+    BibTeXEntry(entry_type="article", name="a", fields={"author": "Jane", "title": "Work", "year": "2020"}),
+    BibTeXEntry(entry_type="misc", name="b", fields={"title": "Website", "url": "example.com"}),
+    BibTeXEntry(entry_type="article", name="c", fields={"title": "Work", "url": "example.com"}),
+    BibTeXEntry(entry_type="article", name="d", fields={"author": "Jane", "title": "Work", "year": "2020"}),
+]
+
+RULES = [
+    FieldRule("article", required={"author", "title", "year"}, omitted={"url"}),
+    FieldRule("misc", required={"title", "howpublished"}, disallowed={"url", "editor"}),
+    FieldRule("book", required={"publisher"}),
+]
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, "NumPy is not installed")
+class TestFieldPresenceMatrix(unittest.TestCase):
+    def test_from_entries(self) -> None:
+        matrix = FieldPresenceMatrix.from_entries(ENTRIES)
+        self.assertEqual(["a", "b", "c", "d"], matrix.names)
+        self.assertEqual(["article", "misc"], matrix.entry_types)
+        self.assertEqual([0, 1, 0, 0], matrix.entry_type_indices.tolist())
+        self.assertEqual(["author", "title", "year", "url"], matrix.field_keys)
+        self.assertEqual([[True, True, True, False],
+                          [False, True, False, True],
+                          [False, True, False, True],
+                          [True, True, True, False]], matrix.presence.tolist())
+        self.assertEqual({"author": 2, "title": 3, "year": 2, "url": 1}, matrix.field_counts("article"))
+        self.assertEqual([[False, True], [False, False], [False, False], [False, True]],
+                         matrix.columns(["editor", "year"]).tolist())
+
+    def test_check_field_rules(self) -> None:
+        matrix = FieldPresenceMatrix.from_entries(ENTRIES)
+        expected = [[violation for rule in RULES if rule.entry_type == entry.entry_type for violation in rule(entry)]
+                    for entry in ENTRIES]
+        self.assertEqual(expected, check_field_rules(matrix, RULES))
+        self.assertEqual([], expected[0])
+
+    def test_field_rule_reports(self) -> None:
+        reports = field_rule_reports(FieldPresenceMatrix.from_entries(ENTRIES), RULES)
+        self.assertEqual(["article", "misc", "book"], [report.entry_type for report in reports])
+        self.assertEqual(3, reports[0].number_of_entries)
+        self.assertEqual({"author": 1, "year": 1}, reports[0].missing)
+        self.assertEqual({"url": 1}, reports[0].omitted)
+        self.assertEqual({"howpublished": 1}, reports[1].missing)
+        self.assertEqual({"url": 1}, reports[1].disallowed)
+        self.assertFalse(reports[2].has_violations)
+
+
+if __name__ == "__main__":
+    unittest.main()
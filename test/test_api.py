@@ -0,0 +1,106 @@
+from typing import List
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from bibtex_linter.api import lint_path, lint_text
+from bibtex_linter.parser import BibTeXEntry
+from bibtex_linter.rulesets import create_ruleset
+from bibtex_linter.verification import Ruleset, SEVERITY_WARNING, Violation
+
+RAW_ENTRIES = """@misc{first,
+  author = {Jane Doe},
+  title = {A Title},
+  howpublished = {Online},
+  year = {2024},
+  note = {Accessed: 2024-01-01}
+}
+
+@misc{second,
+  note = {ü}
+}
+"""
+
+
+class TestLintText(unittest.TestCase):
+    def test_str_and_bytes(self) -> None:
+        result = lint_text(RAW_ENTRIES, name="refs.bib")
+        self.assertEqual("refs.bib", result.file)
+        self.assertEqual("default", result.ruleset)
+        self.assertEqual(["first", "second"], [entry_result.name for entry_result in result.results])
+        self.assertEqual(["second"], [entry_result.name for entry_result in result.failed_entries])
+        self.assertFalse(result.passed)
+        self.assertEqual(len(result.results[1].violations), result.number_of_violations)
+        self.assertEqual(result, lint_text(RAW_ENTRIES.encode(), name="refs.bib"))
+        with self.assertRaises(UnicodeDecodeError):
+            lint_text(RAW_ENTRIES.encode("latin-1"))
+
+    def test_rulesets_are_reused(self) -> None:
+        ruleset = create_ruleset("IEEEtran")
+        self.assertEqual(lint_text(RAW_ENTRIES, ruleset), lint_text(RAW_ENTRIES, "IEEEtran"))
+        self.assertIs(ruleset, create_ruleset("IEEEtran"))
+
+        custom = Ruleset("custom")
+
+        @custom.rule()
+        def needs_doi(entry: BibTeXEntry) -> List[Violation]:
+            return [Violation("{entry_name}: doi", entry.name, entry.entry_type, severity=SEVERITY_WARNING)]
+
+        result = lint_text(RAW_ENTRIES, custom, names={"FIRST"})
+        self.assertEqual("custom", result.ruleset)
+        self.assertEqual((1, 1, 1), (result.number_of_entries, result.number_of_violations, result.number_of_warnings))
+        data = result.to_json()
+        self.assertEqual((None, "custom", 1), (data["file"], data["ruleset"], data["number_of_violations"]))
+        self.assertEqual("first: doi", Violation.from_json(data["results"][0]["violations"][0]).message)
+
+
+# A ruleset that reports the title of each entry, to compare the parsed values
+TITLE_RULES = """from typing import List
+from bibtex_linter.parser import BibTeXEntry
+from bibtex_linter.verification import linter_rule
+
+
+@linter_rule()
+def title(entry: BibTeXEntry) -> List[str]:
+    return [entry.fields.get("title", "")]
+"""
+
+
+class TestLintPath(unittest.TestCase):
+    def test_file(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "refs.bib")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(RAW_ENTRIES)
+            result = lint_path(path, encoding="utf-8")
+            self.assertEqual(path, result.file)
+            self.assertEqual(lint_text(RAW_ENTRIES).results, result.results)
+            with self.assertRaises(OSError):
+                lint_path(os.path.join(directory, "missing.bib"))
+
+    def test_same_result_as_cli(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "refs.bib")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("@misc{multi,\n  title = {A Title\n           over Two Lines},\n}\n")
+            rules_path = os.path.join(directory, "rules.py")
+            with open(rules_path, "w", encoding="utf-8") as file:
+                file.write(TITLE_RULES)
+            result = lint_path(path, rules_path, encoding="utf-8")
+            package_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            cli = subprocess.run(
+                [sys.executable, "-m", "bibtex_linter.main", "--no-cache", "--format", "jsonl", "--ruleset", rules_path,
+                 path],
+                capture_output=True, text=True, encoding="utf-8", cwd=package_directory,
+                env={**os.environ, "PYTHONPATH": package_directory},
+            )
+        self.assertEqual(["A Title\nover Two Lines"], result.results[0].violations)
+        self.assertEqual(result.results[0].violations,
+                         [json.loads(line)["message"] for line in cli.stdout.splitlines()])
+
+
+if __name__ == "__main__":
+    unittest.main()
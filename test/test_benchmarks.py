@@ -0,0 +1,22 @@
+import unittest
+
+from benchmarks.generate_corpus import CorpusConfig, generate_corpus
+from bibtex_linter.parser import tokenize, BibTeXEntry
+
+
+class TestGenerateCorpus(unittest.TestCase):
+    def test_corpus_is_deterministic_and_parsable(self) -> None:
+        config = CorpusConfig(number_of_entries=200, seed=1, multiline_probability=0.5, nested_brace_probability=0.5)
+        corpus = generate_corpus(config)
+        self.assertEqual(corpus, generate_corpus(config))
+        self.assertNotEqual(corpus, generate_corpus(CorpusConfig(number_of_entries=200, seed=2)))
+
+        entries = [BibTeXEntry.from_token(token, strip_lines=True) for token in tokenize(corpus)]
+        self.assertEqual(200, len(entries))
+        self.assertEqual(200, len({entry.name for entry in entries}))
+        self.assertTrue(any("\n" in value for entry in entries for value in entry.fields.values()))
+        self.assertTrue(any("{" in entry.fields.get("title", "") for entry in entries))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+from typing import List
+import os
+import tempfile
+import unittest
+
+from bibtex_linter.cache import ResultCache, verify_tokens, ruleset_fingerprint
+from bibtex_linter.declarative import load_field_rules
+from bibtex_linter.parser import tokenize
+from bibtex_linter.verification import collecting_rules, EntryResult, Ruleset, Violation, ViolationLike, \
+    REQUIRED_FIELDS_TEMPLATE
+
+RAW_ENTRIES = """@misc{first,
+  note = {1}
+}
+@misc{second,
+  note = {2}
+}"""
+
+
+class TestResultCache(unittest.TestCase):
+    def test_key_depends_on_fingerprint(self) -> None:
+        entry_text = "@misc{a, note = {1}}"
+        self.assertEqual(ResultCache(fingerprint="x").key(entry_text), ResultCache(fingerprint="x").key(entry_text))
+        self.assertNotEqual(ResultCache(fingerprint="x").key(entry_text), ResultCache(fingerprint="y").key(entry_text))
+        self.assertEqual(ruleset_fingerprint(), ruleset_fingerprint())
+
+    def test_fingerprint_depends_on_declarative_rules(self) -> None:
+        entry_text = "@misc{a, note = {1}}"
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "rules.toml")
+            with open(path, "w") as file:
+                file.write('[misc]\nrequired = ["note"]\n')
+            ruleset = Ruleset("toml")
+            with collecting_rules(ruleset):
+                load_field_rules(path)
+            self.assertIn(os.path.abspath(path), ruleset.source_files)
+
+            cache = ResultCache(directory, fingerprint=ruleset_fingerprint(ruleset))
+            cache.put(cache.key(entry_text), EntryResult(name="a", entry_type="misc", violations=[]))
+            cache.save()
+            loaded_cache = ResultCache(directory, fingerprint=ruleset_fingerprint(ruleset))
+            loaded_cache.load()
+            self.assertIsNotNone(loaded_cache.get(loaded_cache.key(entry_text)))
+
+            with open(path, "w") as file:
+                file.write('[misc]\nrequired = ["note", "year"]\n')
+            self.assertNotEqual(cache.fingerprint, ruleset_fingerprint(ruleset))
+            loaded_cache = ResultCache(directory, fingerprint=ruleset_fingerprint(ruleset))
+            loaded_cache.load()
+            self.assertIsNone(loaded_cache.get(loaded_cache.key(entry_text)))
+
+    def test_cached_results_are_reused(self) -> None:
+        cache = ResultCache(fingerprint="test")
+        first_token = next(tokenize(RAW_ENTRIES))
+        cached_result = EntryResult(name="first", entry_type="misc", violations=["Cached violation"])
+        cache.put(cache.key(first_token.text), cached_result)
+
+        results = list(verify_tokens(tokenize(RAW_ENTRIES), cache))
+        self.assertEqual(["first", "second"], [result.name for result in results])
+        self.assertEqual(cached_result, results[0])
+        self.assertEqual(2, len(cache))
+
+    def test_save_and_load_keeps_most_recently_used(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResultCache(directory, fingerprint="test", max_entries=2)
+            for name in ("a", "b", "c"):
+                cache.put(name, EntryResult(name=name, entry_type="misc", violations=[]))
+            self.assertIsNotNone(cache.get("a"))
+            cache.save()
+            self.assertTrue(os.path.exists(os.path.join(directory, ".gitignore")))
+
+            loaded_cache = ResultCache(directory, fingerprint="test")
+            loaded_cache.load()
+            self.assertEqual(2, len(loaded_cache))
+            self.assertIsNone(loaded_cache.get("b"))
+            self.assertEqual(EntryResult(name="a", entry_type="misc", violations=[]), loaded_cache.get("a"))
+
+    def test_save_and_load_keeps_violations(self) -> None:
+        violation = Violation(REQUIRED_FIELDS_TEMPLATE, "a", "misc", {"note"}, rule="rule")
+        violations: List[ViolationLike] = ["Plain violation", violation]
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResultCache(directory, fingerprint="test")
+            cache.put("a", EntryResult(name="a", entry_type="misc", violations=violations))
+            cache.save()
+
+            loaded_cache = ResultCache(directory, fingerprint="test")
+            loaded_cache.load()
+            result = loaded_cache.get("a")
+        assert result is not None
+        self.assertEqual(violations, result.violations)
+        loaded_violation = result.violations[1]
+        assert isinstance(loaded_violation, Violation)
+        self.assertEqual(violation.to_json(), loaded_violation.to_json())
+
+    def test_load_ignores_broken_cache_file(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "results.json"), "w") as file:
+                file.write("{not json")
+            cache = ResultCache(directory)
+            cache.load()
+            self.assertEqual(0, len(cache))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+
+from bibtex_linter.citations import find_citations
+
+
+class TestFindCitations(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as file:
+            file.write(content)
+        return path
+
+    def test_aux(self) -> None:
+        self.write("chapter.aux", "\\citation{c}\n")
+        aux = self.write("paper.aux", "\\relax\n\\citation{a}\n\\citation{b, a}\n\\abx@aux@cite{0}{d}\n"
+                                      "\\@input{chapter.aux}\n")
+        self.assertEqual(frozenset({"a", "b", "c", "d"}), find_citations([aux]))
+
+    def test_tex(self) -> None:
+        tex = self.write("paper.tex", "As shown by \\citet*{a} and others~\\cite[see][p.~3]{b,c}.\n"
+                                      "\\parencite{d} % \\cite{commented}\n"
+                                      "100\\% \\nocite{e}\n")
+        self.assertEqual(frozenset({"a", "b", "c", "d", "e"}), find_citations([tex]))
+
+    def test_nocite_all(self) -> None:
+        aux = self.write("paper.aux", "\\citation{a}\n\\citation{*}\n")
+        self.assertIsNone(find_citations([aux]))
+
+    def test_missing_file(self) -> None:
+        with self.assertRaises(OSError):
+            find_citations([os.path.join(self.directory.name, "missing.aux")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+import unittest.mock
+
+from bibtex_linter.daemon import default_socket_path, LintServer, request, result_from_json, serve_socket, \
+    serve_stream
+
+RAW_ENTRIES = """@misc{first,
+  note = {1}
+}
+
+@misc{second,
+  note = {2}
+}
+"""
+
+
+class TestLintServer(unittest.TestCase):
+    def test_content_is_only_verified_when_changed(self) -> None:
+        server = LintServer()
+        answer = server.handle({"content": RAW_ENTRIES, "name": "refs.bib"})
+        self.assertTrue(answer["ok"])
+        self.assertEqual(["first", "second"], [result["name"] for result in answer["results"]])
+        self.assertEqual(2, answer["verified"])
+        self.assertEqual(0, server.handle({"content": RAW_ENTRIES, "name": "refs.bib"})["verified"])
+        answer = server.handle({"content": RAW_ENTRIES.replace("{2}", "{changed}"), "name": "refs.bib"})
+        self.assertEqual(1, answer["verified"])
+        results = [result_from_json(result) for result in answer["results"]]
+        self.assertTrue(all(result.violations for result in results))
+
+    def test_rule_results_are_memoized_across_documents(self) -> None:
+        server = LintServer()
+        server.handle({"content": RAW_ENTRIES, "name": "first.bib"})
+        before = server.handle({"command": "stats"})["rulesets"]["None"]
+        answer = server.handle({"content": RAW_ENTRIES, "name": "second.bib"})
+        self.assertEqual(2, answer["verified"])
+        after = server.handle({"command": "stats"})["rulesets"]["None"]
+        self.assertGreater(after["hits"], before["hits"])
+        self.assertEqual(before["misses"], after["misses"])
+
+    def test_file(self) -> None:
+        server = LintServer()
+        with tempfile.TemporaryDirectory() as directory:
+            bib_path = os.path.join(directory, "refs.bib")
+            with open(bib_path, "w") as file:
+                file.write(RAW_ENTRIES)
+            self.assertEqual(2, server.handle({"path": bib_path})["verified"])
+            self.assertEqual(0, server.handle({"path": bib_path})["verified"])
+            answer = server.handle({"path": bib_path, "ruleset": "IEEEtran"})
+            self.assertEqual(("IEEEtran", 2), (answer["ruleset"], answer["verified"]))
+
+    def test_errors(self) -> None:
+        server = LintServer()
+        self.assertFalse(server.handle({"path": "/does/not/exist.bib"})["ok"])
+        self.assertFalse(server.handle({"content": "", "ruleset": "/does/not/exist.py"})["ok"])
+        self.assertFalse(server.handle({"command": "unknown"})["ok"])
+        self.assertFalse(json.loads(server.handle_line("not json"))["ok"])
+
+    def test_least_recently_checked_documents_are_dropped(self) -> None:
+        server = LintServer(max_documents=1)
+        server.handle({"content": RAW_ENTRIES, "name": "a"})
+        server.handle({"content": RAW_ENTRIES, "name": "b"})
+        self.assertEqual(2, server.handle({"content": RAW_ENTRIES, "name": "a"})["verified"])
+
+    def test_serve_stream(self) -> None:
+        requests = [{"command": "ping"}, {"content": RAW_ENTRIES}, {"command": "shutdown"}, {"command": "ping"}]
+        output = io.StringIO()
+        serve_stream(LintServer(), io.StringIO("".join(json.dumps(message) + "\n" for message in requests)), output)
+        answers = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(3, len(answers))
+        self.assertEqual(2, len(answers[1]["results"]))
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets are not available")
+class TestServeSocket(unittest.TestCase):
+    def test_requests_over_the_socket(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            socket_path = os.path.join(directory, "server.sock")
+            self.assertIsNone(request({"command": "ping"}, socket_path))
+            thread = threading.Thread(target=serve_socket, args=(LintServer(), socket_path))
+            thread.start()
+            try:
+                for _ in range(100):
+                    if request({"command": "ping"}, socket_path) is not None:
+                        break
+                    thread.join(0.05)
+                answer = request({"content": RAW_ENTRIES}, socket_path)
+                assert answer is not None
+                self.assertEqual(2, len(answer["results"]))
+            finally:
+                request({"command": "shutdown"}, socket_path)
+                thread.join()
+            self.assertFalse(os.path.exists(socket_path))
+
+    def test_silent_client_does_not_block_others(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            socket_path = os.path.join(directory, "server.sock")
+            thread = threading.Thread(target=serve_socket, args=(LintServer(), socket_path, 0.2))
+            thread.start()
+            try:
+                for _ in range(100):
+                    if request({"command": "ping"}, socket_path) is not None:
+                        break
+                    thread.join(0.05)
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as silent_client:
+                    silent_client.connect(socket_path)
+                    answer = request({"command": "ping"}, socket_path, timeout=5)
+                    self.assertIsNotNone(answer)
+            finally:
+                request({"command": "shutdown"}, socket_path)
+                thread.join()
+
+    def test_server_that_does_not_answer(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            socket_path = os.path.join(directory, "server.sock")
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+                listener.bind(socket_path)
+                listener.listen()
+                # Accepted by the backlog, but never answered
+                self.assertIsNone(request({"command": "ping"}, socket_path, timeout=0.2))
+                connection, _ = listener.accept()
+                connection.close()
+
+                def close_connection() -> None:
+                    connection, _ = listener.accept()
+                    connection.close()
+
+                thread = threading.Thread(target=close_connection)
+                thread.start()
+                try:
+                    self.assertIsNone(request({"command": "ping"}, socket_path, timeout=5))
+                finally:
+                    thread.join()
+
+    def test_only_a_stale_socket_is_removed(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            socket_path = os.path.join(directory, "refs.bib")
+            with open(socket_path, "w") as file:
+                file.write(RAW_ENTRIES)
+            with self.assertRaises(OSError):
+                serve_socket(LintServer(), socket_path)
+            with open(socket_path, "r") as file:
+                self.assertEqual(RAW_ENTRIES, file.read())
+
+            socket_path = os.path.join(directory, "server.sock")
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+                stale.bind(socket_path)
+            thread = threading.Thread(target=serve_socket, args=(LintServer(), socket_path))
+            thread.start()
+            try:
+                for _ in range(100):
+                    if request({"command": "ping"}, socket_path) is not None:
+                        break
+                    thread.join(0.05)
+                self.assertIsNotNone(request({"command": "ping"}, socket_path))
+            finally:
+                request({"command": "shutdown"}, socket_path)
+                thread.join()
+            self.assertFalse(os.path.exists(socket_path))
+
+    def test_default_socket_is_private(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            with unittest.mock.patch.dict(os.environ, {"XDG_RUNTIME_DIR": directory}):
+                self.assertEqual(os.path.join(directory, "bibtex_linter.sock"), default_socket_path())
+                os.chmod(directory, 0o755)
+                with self.assertRaises(OSError):
+                    serve_socket(LintServer(), default_socket_path())
+        with unittest.mock.patch.dict(os.environ, {"XDG_RUNTIME_DIR": ""}):
+            self.assertNotEqual(tempfile.gettempdir(), os.path.dirname(default_socket_path()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import concurrent.futures
+import os
+import tempfile
+import unittest
+
+from bibtex_linter import verification
+from bibtex_linter.declarative import FieldRule, compile_field_rules, field_keys, field_mask, load_field_rules
+from bibtex_linter.parser import BibTeXEntry
+from bibtex_linter.verification import check_disallowed_fields, check_omitted_fields, check_required_fields, verify, \
+    EntryBatch
+
+
+class TestFieldRule(unittest.TestCase):
+    def test_messages_match_helpers(self) -> None:
+        required = {"author", "title", "journal", "year"}
+        omitted = {"language", "url"}
+        disallowed = {"editor", "type"}
+        rule = FieldRule("article", required=required, omitted=omitted, disallowed=disallowed)
+        for fields in ({},
+                       {"author": "Jane", "title": "Work", "journal": "J", "year": "2020"},
+                       {"author": "Jane", "url": "example.com", "language": "en", "type": "X", "note": "n"}):
+            entry = BibTeXEntry(entry_type="article", name="declarative", fields=fields)
+            expected = (check_required_fields(entry, required)
+                        + check_omitted_fields(entry, omitted)
+                        + check_disallowed_fields(entry, disallowed))
+            self.assertEqual(expected, rule(entry))
+
+    def test_check_batch(self) -> None:
+        rule = FieldRule("article", required={"author", "year"}, omitted={"url"})
+        entries = [
+            BibTeXEntry(entry_type="article", name="a", fields={"author": "Jane", "year": "2020"}),
+            BibTeXEntry(entry_type="article", name="b", fields={"url": "example.com"}),
+            BibTeXEntry(entry_type="article", name="c", fields={"year": "2020", "author": "Jane", "url": "x"}),
+            BibTeXEntry(entry_type="article", name="d", fields={"url": "example.com"}),
+        ]
+        self.assertEqual([rule(entry) for entry in entries], rule.check_batch(EntryBatch("article", entries)))
+
+    def test_unknown_kind(self) -> None:
+        with self.assertRaises(ValueError):
+            compile_field_rules({"article": {"requird": ["author"]}})
+
+    def test_field_sets_must_be_lists_of_field_keys(self) -> None:
+        for field_rules in ({"article": {"required": "title"}},
+                            {"article": {"omitted": ["url", 1]}},
+                            {"article": {"disallowed": 3}},
+                            {"article": ["title"]}):
+            with self.subTest(field_rules=field_rules):
+                with self.assertRaisesRegex(ValueError, "'article'"):
+                    compile_field_rules(field_rules)  # type: ignore[arg-type]
+
+    def test_entry_type_aliases(self) -> None:
+        rule, = compile_field_rules({"InProceedings": {"required": ["Booktitle"]}})
+        self.assertEqual("conference", rule.entry_type)
+        entry = BibTeXEntry.from_string("@inproceedings{alias, booktitle = {Proceedings}}")
+        self.assertEqual([], rule(entry))
+        self.assertEqual(1, len(rule(BibTeXEntry.from_string("@inproceedings{alias, title = {Paper}}"))))
+
+    def test_bits_assigned_by_several_threads(self) -> None:
+        keys = [[f"concurrent_{thread}_{index}" for index in range(50)] for thread in range(8)]
+        with concurrent.futures.ThreadPoolExecutor(8) as executor:
+            masks = list(executor.map(field_mask, keys))
+        for keys_of_thread, mask in zip(keys, masks):
+            self.assertEqual(sorted(keys_of_thread), field_keys(mask))
+
+
+class TestLoadFieldRules(unittest.TestCase):
+    def setUp(self) -> None:
+        # Remember the registered rules, so that the rules registered in these tests do not leak into other tests
+        self._snapshot = verification._default_ruleset.snapshot()
+
+    def tearDown(self) -> None:
+        verification._default_ruleset.restore(self._snapshot)
+
+    def test_load_toml(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "rules.toml")
+            with open(path, "w") as file:
+                file.write('[declarative_test_type]\nrequired = ["author", "year"]\ndisallowed = ["editor"]\n')
+            rules = load_field_rules(path)
+
+        self.assertEqual(["declarative_test_type"], [rule.entry_type for rule in rules])
+        entry = BibTeXEntry(entry_type="declarative_test_type", name="toml", fields={"author": "Jane", "editor": "X"})
+        expected = [
+            "Entry 'toml' misses the following required fields: [year]",
+            "Entry 'toml' has fields present that would be omitted in the compiled document: [editor].",
+        ]
+        self.assertEqual(expected, verify(entry))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+from typing import Dict, List
+import unittest
+
+from bibtex_linter.duplicates import DuplicateDetector, find_duplicates, normalize_doi, title_words, \
+    MAX_COMPARISONS_PER_WORD
+from bibtex_linter.parser import BibTeXEntry
+from bibtex_linter.verification import SEVERITY_WARNING
+
+
+def entry(name: str, **fields: str) -> BibTeXEntry:
+    return BibTeXEntry(entry_type="article", name=name, fields=fields)
+
+
+class TestNormalization(unittest.TestCase):
+    def test_title_words(self) -> None:
+        self.assertEqual(["deep", "learning", "an", "übersicht"],
+                         title_words("{Deep} \\textit{Learning}: An Übersicht"))
+        self.assertEqual(["the", "companion"], title_words("The \\LaTeX{} Companion"))
+
+    def test_normalize_doi(self) -> None:
+        self.assertEqual("10.1000/abc", normalize_doi(" https://doi.org/10.1000/ABC"))
+        self.assertEqual("10.1000/abc", normalize_doi("doi:10.1000/abc"))
+
+
+class TestDuplicateDetector(unittest.TestCase):
+    def rules(self, entries: List[BibTeXEntry]) -> Dict[str, List[str]]:
+        detector = DuplicateDetector()
+        return {e.name: [str(violation.rule) for violation in detector.check(e)] for e in entries}
+
+    def test_duplicate_keys(self) -> None:
+        rules = self.rules([entry("smith"), entry("jones"), entry("Smith")])
+        self.assertEqual({"smith": [], "jones": [], "Smith": ["duplicate_key"]}, rules)
+
+    def test_duplicate_titles_and_dois(self) -> None:
+        rules = self.rules([
+            entry("a", title="{Deep} Learning of Handwritten Digits", doi="10.1000/abc"),
+            entry("b", title="Deep learning of handwritten digits.", doi="https://doi.org/10.1000/ABC"),
+            entry("c", title="Deep Learning of Handwritten Letters", doi="10.1000/abd"),
+        ])
+        self.assertEqual({"a": [], "b": ["duplicate_doi", "duplicate_title"], "c": []}, rules)
+
+    def test_similar_titles(self) -> None:
+        detector = DuplicateDetector(similarity=0.8)
+        first = entry("a", title="Recognition of handwritten digits in noisy images with deep neural networks")
+        similar = entry("b", title="Recognition of handwritten digits in noisy images using deep neural networks")
+        different = entry("c", title="Recognition of handwritten letters in noisy images")
+        self.assertEqual([], detector.check(first))
+        violations = detector.check(similar)
+        self.assertEqual(1, len(violations))
+        self.assertEqual(("similar_title", SEVERITY_WARNING), (violations[0].rule, violations[0].severity))
+        self.assertIn("entry 'a'", str(violations[0]))
+        self.assertEqual([], detector.check(different))
+
+    def test_similar_titles_beyond_max_comparisons_per_word(self) -> None:
+        # The words seen first count as the most common ones, so "beta" is in the prefix of each of the other titles
+        common_words = " ".join(f"common{i}" for i in range(2 * MAX_COMPARISONS_PER_WORD + 2))
+        others = [entry(f"other{i}", title=f"beta common{2 * i} common{2 * i + 1}")
+                  for i in range(MAX_COMPARISONS_PER_WORD + 1)]
+        entries = [entry("common", title=common_words), entry("a", title="alpha beta"), *others,
+                   entry("b", title="alpha beta delta")]
+        for max_comparisons_per_word in (MAX_COMPARISONS_PER_WORD, None):
+            detector = DuplicateDetector(0.5, max_comparisons_per_word)
+            rules = [str(violation.rule) for e in entries for violation in detector.check(e)]
+            with self.subTest(max_comparisons_per_word=max_comparisons_per_word):
+                # With the limit, "a" is not among the most recent titles with "beta", so "b" is not compared with it
+                self.assertEqual([] if max_comparisons_per_word else ["similar_title"], rules)
+
+    def test_find_duplicates(self) -> None:
+        entries = [entry(f"entry{i}", title=f"Title number {i}") for i in range(100)]
+        entries.append(entry("copy", title="Title Number 42"))
+        results = list(find_duplicates(entries))
+        self.assertEqual([e.name for e in entries], [result.name for result in results])
+        self.assertEqual(["Entry 'copy' has the same title as entry 'entry42'."],
+                         [str(violation) for result in results for violation in result.violations])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import io
+import json
+import random
+import unittest
+from typing import Any, Dict, List
+
+from bibtex_linter.lsp import BibDocument, LanguageServer, read_message, write_message
+from bibtex_linter.rulesets import create_ruleset
+
+RAW_ENTRIES = """@misc{first,
+  note = {1}
+}
+
+@article{second,
+  author = {Some Author},
+  title = {A Title},
+  url = {https://example.com}
+}
+"""
+
+
+class TestBibDocument(unittest.TestCase):
+    def test_diagnostics_point_to_the_fields(self) -> None:
+        document = BibDocument(RAW_ENTRIES, create_ruleset(None))
+        ranges = {diagnostic["message"]: diagnostic["range"] for diagnostic in document.diagnostics()}
+        # Missing fields point to the name of the entry
+        missing = next(message for message in ranges if "first" in message)
+        self.assertEqual({"start": {"line": 0, "character": 6}, "end": {"line": 0, "character": 11}}, ranges[missing])
+        omitted = next(message for message in ranges if "second" in message and "omitted" in message)
+        self.assertEqual({"start": {"line": 7, "character": 2}, "end": {"line": 7, "character": 29}},
+                         ranges[omitted])
+
+    def test_only_touched_entries_are_verified_again(self) -> None:
+        document = BibDocument(RAW_ENTRIES, create_ruleset(None))
+        self.assertEqual(2, document.number_of_verified_entries)
+        document.change([{"range": {"start": {"line": 1, "character": 10}, "end": {"line": 1, "character": 11}},
+                          "text": "changed"}])
+        self.assertEqual(1, document.number_of_verified_entries)
+        self.assertIn("note = {changed}", document.text)
+        document.change([{"range": {"start": {"line": 0, "character": 0}, "end": {"line": 0, "character": 0}},
+                          "text": "\n\n"}])
+        self.assertEqual(0, document.number_of_verified_entries)
+        self.assertEqual([2, 6], [entry.line for entry in document.entries])
+
+    def test_incremental_changes_match_a_full_parse(self) -> None:
+        ruleset = create_ruleset(None)
+        rng = random.Random(0)
+        pieces = ["}", "{", "@misc{x,", "\n", "a", " title = {T},", "@article{", ",", '"', "ü😀"]
+        document = BibDocument(RAW_ENTRIES * 3, ruleset)
+        for _ in range(300):
+            start = rng.randrange(len(document.text) + 1)
+            end = min(len(document.text), start + rng.choice([0, 1, 5]))
+            document.replace(start, end, "".join(rng.choice(pieces) for _ in range(rng.randint(0, 2))))
+            self.assertEqual(BibDocument(document.text, ruleset).entries, document.entries)
+
+    def test_utf16_columns(self) -> None:
+        document = BibDocument("% 😀\n@misc{a}", create_ruleset(None))
+        # The emoji counts as two UTF-16 code units
+        self.assertEqual(3, document.offset_at({"line": 0, "character": 4}))
+        self.assertEqual(4, document.offset_at({"line": 1, "character": 0}))
+        self.assertEqual(len(document.text), document.offset_at({"line": 5, "character": 0}))
+
+
+class TestLanguageServer(unittest.TestCase):
+    def exchange(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        input_stream = io.BytesIO()
+        for message in messages:
+            write_message(input_stream, message)
+        input_stream.seek(0)
+        output = io.BytesIO()
+        LanguageServer(output).serve(input_stream)
+        output.seek(0)
+        answers: List[Dict[str, Any]] = []
+        while (answer := read_message(output)) is not None:
+            answers.append(answer)
+        return answers
+
+    def test_session(self) -> None:
+        uri = "file:///refs.bib"
+        answers = self.exchange([
+            {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {"capabilities": {}}},
+            {"jsonrpc": "2.0", "method": "initialized", "params": {}},
+            {"jsonrpc": "2.0", "method": "textDocument/didOpen",
+             "params": {"textDocument": {"uri": uri, "languageId": "bibtex", "version": 1, "text": RAW_ENTRIES}}},
+            {"jsonrpc": "2.0", "method": "textDocument/didChange",
+             "params": {"textDocument": {"uri": uri, "version": 2}, "contentChanges": [{"text": ""}]}},
+            {"jsonrpc": "2.0", "id": 2, "method": "textDocument/hover", "params": {}},
+            {"jsonrpc": "2.0", "id": 3, "method": "shutdown"},
+            {"jsonrpc": "2.0", "method": "exit"},
+        ])
+        self.assertEqual(2, answers[0]["result"]["capabilities"]["textDocumentSync"]["change"])
+        self.assertEqual("textDocument/publishDiagnostics", answers[1]["method"])
+        self.assertEqual(uri, answers[1]["params"]["uri"])
+        self.assertTrue(answers[1]["params"]["diagnostics"])
+        self.assertEqual([], answers[2]["params"]["diagnostics"])
+        self.assertEqual(-32601, answers[3]["error"]["code"])
+        self.assertEqual({"jsonrpc": "2.0", "id": 3, "result": None}, answers[4])
+
+    def test_errors_are_reported(self) -> None:
+        answers = self.exchange([
+            {"jsonrpc": "2.0", "method": "textDocument/didChange",
+             "params": {"textDocument": {"uri": "file:///unknown.bib"}, "contentChanges": []}},
+        ])
+        self.assertEqual("window/logMessage", answers[0]["method"])
+        self.assertIn("KeyError", json.dumps(answers[0]))
+
+    def test_invalid_messages_are_answered_with_parse_errors(self) -> None:
+        input_stream = io.BytesIO()
+        input_stream.write(b"Content-Length: 9\r\n\r\n{invalid}")
+        input_stream.write(b"Content-Length: 2\r\n\r\n[]")
+        input_stream.write(b"Content-Length: many\r\n\r\n")
+        input_stream.write(b"Content-Type: application/json\r\n\r\n")
+        write_message(input_stream, {"jsonrpc": "2.0", "id": 1, "method": "shutdown"})
+        input_stream.seek(0)
+        output = io.BytesIO()
+        server = LanguageServer(output)
+        server.serve(input_stream)
+        output.seek(0)
+        answers: List[Dict[str, Any]] = []
+        while (answer := read_message(output)) is not None:
+            answers.append(answer)
+        self.assertEqual([-32700] * 4, [answer["error"]["code"] for answer in answers[:4]])
+        self.assertEqual([None] * 4, [answer["id"] for answer in answers[:4]])
+        self.assertEqual({"jsonrpc": "2.0", "id": 1, "result": None}, answers[4])
+        self.assertTrue(server.shut_down)
+
+
+if __name__ == "__main__":
+    unittest.main()
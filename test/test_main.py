@@ -0,0 +1,85 @@
+from typing import Iterator
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from bibtex_linter.main import find_bib_files, print_results, split_ruleset_argument
+from bibtex_linter.verification import EntryResult
+
+
+class TestFindBibFiles(unittest.TestCase):
+    def test_directories_globs_and_files(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            for relative_path in ("a/refs.bib", "b/nested/refs.bib", "b/notes.txt", "c/refs.bib"):
+                path = os.path.join(directory, relative_path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w") as file:
+                    file.write("")
+
+            actual = find_bib_files([
+                os.path.join(directory, "b"),
+                os.path.join(directory, "*", "refs.bib"),
+                os.path.join(directory, "missing.bib"),
+            ])
+            expected = [
+                os.path.join(directory, "b", "nested", "refs.bib"),
+                os.path.join(directory, "a", "refs.bib"),
+                os.path.join(directory, "c", "refs.bib"),
+                os.path.join(directory, "missing.bib"),
+            ]
+            self.assertEqual(expected, actual)
+
+
+class TestSplitRulesetArgument(unittest.TestCase):
+    def test_split_ruleset_argument(self) -> None:
+        self.assertEqual((["refs.bib"], None), split_ruleset_argument(["refs.bib"]))
+        self.assertEqual((["refs.bib"], "IEEEtran"), split_ruleset_argument(["refs.bib", "IEEEtran"]))
+        self.assertEqual((["a.bib", "b.bib"], "rules.py"), split_ruleset_argument(["a.bib", "b.bib", "rules.py"]))
+        self.assertEqual((["a.bib", "b.bib"], None), split_ruleset_argument(["a.bib", "b.bib"]))
+        self.assertEqual((["refs.bib"], "rules.toml"), split_ruleset_argument(["refs.bib", "rules.toml"]))
+
+
+class TestPrintResults(unittest.TestCase):
+    def setUp(self) -> None:
+        self.consumed: int = 0
+
+    def results(self) -> Iterator[EntryResult]:
+        for name, violations in (("a", []), ("b", ["b1", "b2"]), ("c", []), ("d", ["d1"]), ("e", ["e1", "e2"])):
+            self.consumed += 1
+            yield EntryResult(name=name, entry_type="misc", violations=list(violations))
+
+    def test_all_results(self) -> None:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual((5, 5), print_results(self.results()))
+        self.assertIn("    - e2", output.getvalue())
+
+    def test_fail_fast(self) -> None:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual((2, 2), print_results(self.results(), fail_fast=True))
+        self.assertEqual(2, self.consumed)
+        self.assertIn("    - b2", output.getvalue())
+        self.assertNotIn("Entry 'd'", output.getvalue())
+
+    def test_max_violations(self) -> None:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual((4, 3), print_results(self.results(), max_violations=3))
+        self.assertEqual(4, self.consumed)
+        self.assertIn("    - d1", output.getvalue())
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual((5, 4), print_results(self.results(), max_violations=4))
+
+    def test_count_only(self) -> None:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual((5, 5), print_results(self.results(), count_only=True))
+        self.assertEqual("", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
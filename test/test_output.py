@@ -0,0 +1,100 @@
+from typing import List
+import io
+import json
+import unittest
+import xml.etree.ElementTree as ElementTree
+
+from bibtex_linter.output import create_writer, ResultWriter, UNKNOWN_RULE
+from bibtex_linter.verification import EntryResult, OMITTED_FIELDS_TEMPLATE, Violation, ViolationLike
+
+VIOLATIONS: List[ViolationLike] = [
+    Violation(OMITTED_FIELDS_TEMPLATE, "b", "misc", {"url"}, rule="field_rule_misc"),
+    "Entry 'b' has a <strange> & \"quoted\" problem.",
+]
+RESULTS: List[EntryResult] = [
+    EntryResult(name="a", entry_type="misc", violations=[]),
+    EntryResult(name="b", entry_type="misc", violations=VIOLATIONS),
+]
+
+
+def write(writer: ResultWriter) -> None:
+    writer.start_file("refs.bib")
+    for result in RESULTS:
+        writer.write_result("refs.bib", result, result.violations)
+    writer.end_file("refs.bib")
+    writer.start_file("missing.bib")
+    writer.write_error("missing.bib", FileNotFoundError("No such file"))
+    writer.end_file("missing.bib")
+    writer.close()
+
+
+class TestWriters(unittest.TestCase):
+    def output(self, output_format: str) -> str:
+        stream = io.StringIO()
+        # A small buffer, so that the output is written in several parts
+        writer = create_writer(output_format, stream)
+        writer.buffer_size = 16
+        write(writer)
+        return stream.getvalue()
+
+    def test_text(self) -> None:
+        expected = (
+            "\nEntry 'b' of type 'misc' failed verification:\n"
+            "  ❌ Invariant Violations:\n"
+            "    - Entry 'b' has fields present that would be omitted in the compiled document: [url]. "
+            "This could lead to a loss of information.\n"
+            "    - Entry 'b' has a <strange> & \"quoted\" problem.\n"
+            "\n  ⚠️ Could not read 'missing.bib': No such file\n"
+        )
+        self.assertEqual(expected, self.output("text"))
+
+    def test_jsonl(self) -> None:
+        lines = [json.loads(line) for line in self.output("jsonl").splitlines()]
+        self.assertEqual(3, len(lines))
+        self.assertEqual({"file": "refs.bib", "message": str(VIOLATIONS[0]), "entry": "b", "entry_type": "misc",
+                          "fields": ["url"], "severity": "error", "rule": "field_rule_misc"}, lines[0])
+        self.assertEqual((VIOLATIONS[1], None), (lines[1]["message"], lines[1]["rule"]))
+        self.assertEqual({"file": "missing.bib", "error": "No such file"}, lines[2])
+
+    def test_sarif(self) -> None:
+        run = json.loads(self.output("sarif"))["runs"][0]
+        self.assertEqual(["field_rule_misc", UNKNOWN_RULE], [result["ruleId"] for result in run["results"]])
+        self.assertEqual([str(violation) for violation in VIOLATIONS],
+                         [result["message"]["text"] for result in run["results"]])
+        self.assertEqual([{"id": "field_rule_misc"}, {"id": UNKNOWN_RULE}], run["tool"]["driver"]["rules"])
+        self.assertFalse(run["invocations"][0]["executionSuccessful"])
+
+    def test_junit(self) -> None:
+        root = ElementTree.fromstring(self.output("junit"))
+        suites = root.findall("testsuite")
+        self.assertEqual(["refs.bib", "missing.bib"], [suite.get("name") for suite in suites])
+        testcases = suites[0].findall("testcase")
+        self.assertEqual(["a", "b"], [testcase.get("name") for testcase in testcases])
+        self.assertIsNone(testcases[0].find("failure"))
+        failure = testcases[1].find("failure")
+        assert failure is not None
+        self.assertEqual("\n".join(str(violation) for violation in VIOLATIONS), failure.text)
+        self.assertIsNotNone(suites[1].find("testcase/error"))
+
+    def test_junit_error_without_testsuite(self) -> None:
+        # When only counting the violations, only the errors are written
+        stream = io.StringIO()
+        writer = create_writer("junit", stream)
+        writer.write_error("missing.bib", FileNotFoundError("No such file"))
+        writer.close()
+        root = ElementTree.fromstring(stream.getvalue())
+        self.assertEqual([], root.findall("testcase"))
+        self.assertEqual(["missing.bib"], [suite.get("name") for suite in root.findall("testsuite")])
+        self.assertIsNotNone(root.find("testsuite/testcase/error"))
+
+    def test_writers_are_abstract(self) -> None:
+        with self.assertRaises(TypeError):
+            ResultWriter(io.StringIO())  # type: ignore[abstract]
+
+    def test_unknown_format(self) -> None:
+        with self.assertRaises(ValueError):
+            create_writer("yaml", io.StringIO())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import concurrent.futures
+import io
+import os
+import tempfile
+import unittest
+import unittest.mock
+from typing import Any
+
+from bibtex_linter import parallel
+from bibtex_linter.cache import ResultCache
+from bibtex_linter.parallel import split_into_chunks, verify_file_parallel, verify_files_parallel
+from bibtex_linter.parser import iter_bibtex_file, split_entries, tokenize
+from bibtex_linter.rulesets import load_ruleset
+from bibtex_linter.verification import EntryResult, verify_entries
+
+
+class TestSplitIntoChunks(unittest.TestCase):
+    def test_chunks_are_cut_at_entry_boundaries(self) -> None:
+        bib_path = os.path.join(os.path.dirname(__file__), "test_refs.bib")
+        with open(bib_path, "r") as file:
+            raw = file.read()
+        for chunk_size in (1, 50, 200, 1 << 20):
+            with self.subTest(chunk_size=chunk_size):
+                chunks = list(split_into_chunks(io.StringIO(raw), chunk_size))
+                self.assertEqual(raw, "".join(chunks))
+                self.assertEqual(split_entries(raw), [entry for chunk in chunks for entry in split_entries(chunk)])
+
+    def test_indented_entry_start(self) -> None:
+        raw = "@misc{a, note = {1}}\n  @misc{b, note = {2}}\n"
+        self.assertEqual(["@misc{a, note = {1}}\n", "  @misc{b, note = {2}}\n"],
+                         list(split_into_chunks(io.StringIO(raw), 10)))
+
+
+class TestVerifyFileParallel(unittest.TestCase):
+    def test_same_results_as_serial(self) -> None:
+        bib_path = os.path.join(os.path.dirname(__file__), "test_template", "maximal_example_refs.bib")
+        load_ruleset("ieeetr")
+        expected = list(verify_entries(iter_bibtex_file(bib_path)))
+        actual = list(verify_file_parallel(bib_path, "ieeetr", jobs=2, chunk_size=100))
+        self.assertEqual(expected, actual)
+        actual = list(verify_file_parallel(bib_path, "ieeetr", jobs=2, chunk_size=100, threads=True))
+        self.assertEqual(expected, actual)
+
+    def test_entry_start_inside_of_value(self) -> None:
+        raw = ("@article{a, title = {A}, year = {2020}}\n"
+               "@misc{b, abstract = {Lines starting with an at sign are allowed in values, e.g.\n"
+               "@misc{x, note = {1}}\n"
+               "is not an entry.}}\n"
+               "@misc{c, note = {3}}\n"
+               "@misc{d, note = {4\n"
+               "@misc{e, note = {5}}\n")
+        with tempfile.TemporaryDirectory() as directory:
+            bib_path = os.path.join(directory, "refs.bib")
+            with open(bib_path, "w") as file:
+                file.write(raw)
+            load_ruleset("ieeetr")
+            expected = list(verify_entries(iter_bibtex_file(bib_path)))
+            self.assertEqual(["a", "b", "c", "d", "e"], [result.name for result in expected])
+            for chunk_size in (1, 30, 80, 1 << 20):
+                for threads in (False, True):
+                    with self.subTest(chunk_size=chunk_size, threads=threads):
+                        actual = list(verify_file_parallel(bib_path, "ieeetr", jobs=2, chunk_size=chunk_size,
+                                                           threads=threads))
+                        self.assertEqual(expected, actual)
+
+    def test_unclosed_entry_in_large_file(self) -> None:
+        entries = [f"@misc{{e{i},\n  title = {{Title {i}}},\n  note = {{{'x' * 200}}}\n}}\n" for i in range(4000)]
+        entries[3] = "@misc{broken,\n  title = {Never closed,\n"
+        raw = "".join(entries)
+        chunk_size = 1 << 16
+        chunk_lengths = []
+
+        def verify_chunk(chunk: str, *args: Any, **kwargs: Any) -> Any:
+            chunk_lengths.append(len(chunk))
+            return verify_chunk_unpatched(chunk, *args, **kwargs)
+
+        verify_chunk_unpatched = parallel._verify_chunk
+        with tempfile.TemporaryDirectory() as directory:
+            bib_path = os.path.join(directory, "refs.bib")
+            with open(bib_path, "w") as file:
+                file.write(raw)
+            load_ruleset("ieeetr")
+            expected = list(verify_entries(iter_bibtex_file(bib_path)))
+            with unittest.mock.patch.object(parallel, "_verify_chunk", verify_chunk):
+                actual = list(verify_file_parallel(bib_path, "ieeetr", jobs=2, chunk_size=chunk_size, threads=True))
+        self.assertEqual(expected, actual)
+        self.assertEqual("broken", expected[3].name)
+        self.assertEqual(len(entries), len(expected))
+        # Only the chunks up to the end of the lookahead after the unclosed entry are verified again
+        self.assertLess(sum(chunk_lengths), 1.5 * len(raw))
+
+    def test_many_files(self) -> None:
+        bib_paths = [
+            os.path.join(os.path.dirname(__file__), "test_template", "maximal_example_refs.bib"),
+            os.path.join(os.path.dirname(__file__), "missing.bib"),
+            os.path.join(os.path.dirname(__file__), "test_refs.bib"),
+        ]
+        load_ruleset("ieeetr")
+        for threads in (False, True):
+            results_per_file = verify_files_parallel(bib_paths, "ieeetr", jobs=2, threads=threads)
+            for bib_path, (filename, results) in zip(bib_paths, results_per_file):
+                with self.subTest(bib_path=bib_path, threads=threads):
+                    self.assertEqual(bib_path, filename)
+                    if os.path.exists(bib_path):
+                        self.assertEqual(list(verify_entries(iter_bibtex_file(bib_path))), list(results))
+                    else:
+                        with self.assertRaises(OSError):
+                            list(results)
+
+    def test_worker_processes_load_the_saved_cache(self) -> None:
+        bib_path = os.path.join(os.path.dirname(__file__), "test_template", "maximal_example_refs.bib")
+        load_ruleset("ieeetr")
+        expected = list(verify_entries(iter_bibtex_file(bib_path)))
+        with open(bib_path, "r") as file:
+            first_token = next(iter(tokenize(file.read())))
+        cached_result = EntryResult(name=first_token.name, entry_type="cached", violations=["From the cache"])
+        expected[0] = cached_result
+        with tempfile.TemporaryDirectory() as directory:
+            saved_cache = ResultCache(directory, fingerprint="parallel")
+            saved_cache.put(saved_cache.key(first_token.text), cached_result)
+            saved_cache.save()
+            for threads in (False, True):
+                with self.subTest(threads=threads):
+                    cache = ResultCache(directory, fingerprint="parallel")
+                    cache.load()
+                    self.assertEqual(expected, list(verify_file_parallel(bib_path, "ieeetr", jobs=2, chunk_size=100,
+                                                                         cache=cache, threads=threads)))
+                    _, results = next(verify_files_parallel([bib_path], "ieeetr", jobs=2, cache=cache,
+                                                            threads=threads))
+                    self.assertEqual(expected, list(results))
+                    self.assertEqual(len(expected), len(cache))
+
+            # Only the location and the fingerprint of the cache are passed to the worker processes
+            with unittest.mock.patch.object(concurrent.futures, "ProcessPoolExecutor",
+                                            wraps=concurrent.futures.ProcessPoolExecutor) as executor:
+                list(verify_file_parallel(bib_path, "ieeetr", jobs=2, cache=cache))
+            self.assertNotIn(cache, executor.call_args.kwargs["initargs"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,25 @@
+import io
 import unittest
 import os
-from typing import Dict, List
-
-from bibtex_linter.parser import BibTeXEntry, split_entries, parse_bibtex_file
+from typing import Dict, List, Optional
+
+from bibtex_linter.parser import (
+    BibTeXEntry,
+    CompactFields,
+    LazyFields,
+    split_entries,
+    parse_bibtex_file,
+    iter_bibtex_file,
+    tokenize,
+    tokenize_prefix,
+    tokenize_stream,
+    UNCLOSED_ENTRY_LOOKAHEAD,
+)
+from bibtex_linter.verification import UNCLOSED_ENTRY_RULE, verify
 
 
 class TestBibTeXEntry(unittest.TestCase):
-    def test_parse_field_value(self) -> None:
+    def test_normalize_value(self) -> None:
         test_cases = [
             ("{John Doe}", "John Doe"),
             ("{{John Doe}}", "John Doe"),
@@ -32,83 +45,68 @@ class TestBibTeXEntry(unittest.TestCase):
 
         for raw_value, expected in test_cases:
             with self.subTest(raw_value=raw_value):
-                result = BibTeXEntry._parse_field_value(raw_value)
+                result = BibTeXEntry._normalize_value(raw_value, False)
                 self.assertEqual(expected, result)
 
-    def test_split_fields_basic(self) -> None:
+    def test_fields_basic(self) -> None:
         entry = """@article{doe2020,
   author = {John Doe},
   title = {A Study},
   year = {2020}
 }"""
-        expected = [
-            "  author = {John Doe}",
-            "  title = {A Study}",
-            "  year = {2020}"
-        ]
-        result = BibTeXEntry._split_fields(entry)
+        expected = {"author": "John Doe", "title": "A Study", "year": "2020"}
+        result = dict(BibTeXEntry.from_string(entry).fields)
         self.assertEqual(expected, result)
 
-    def test_split_fields_with_trailing_comma_and_newline(self) -> None:
+    def test_fields_with_trailing_comma_and_newline(self) -> None:
         entry = """@book{smith2021,
   author = {Jane Smith},
   title = {The Book of Testing},
   year = {2021},
 }"""
-        expected = [
-            "  author = {Jane Smith}",
-            "  title = {The Book of Testing}",
-            "  year = {2021}"
-        ]
-        result = BibTeXEntry._split_fields(entry)
+        expected = {"author": "Jane Smith", "title": "The Book of Testing", "year": "2021"}
+        result = dict(BibTeXEntry.from_string(entry).fields)
         self.assertEqual(expected, result)
 
-    def test_split_fields_multiline_values(self) -> None:
+    def test_fields_multiline_values(self) -> None:
         entry = """@misc{nested2022,
   author = {{Industrial Digital Twin Association e. V.}},
   url = {https://example.com},
   note = {Line 1
           Line 2}
 }"""
-        expected = [
-            "  author = {{Industrial Digital Twin Association e. V.}}",
-            "  url = {https://example.com}",
-            "  note = {Line 1\n          Line 2}"
-        ]
-        result = BibTeXEntry._split_fields(entry)
+        expected = {
+            "author": "Industrial Digital Twin Association e. V.",
+            "url": "https://example.com",
+            "note": "Line 1\n          Line 2",
+        }
+        result = dict(BibTeXEntry.from_string(entry).fields)
         self.assertEqual(expected, result)
 
-    def test_split_fields_with_extra_whitespace(self) -> None:
+    def test_fields_with_extra_whitespace(self) -> None:
         entry = ("@misc{id123,  \n    "
                  "author    =    {Someone}  , \n    "
                  "title=   {  Extra Spaces   }   , \n    "
                  "year= {2023}    }")
-        expected = [
-            "    author    =    {Someone}  ",
-            "    title=   {  Extra Spaces   }   ",
-            "    year= {2023}    "
-        ]
-        result = BibTeXEntry._split_fields(entry)
+        expected = {"author": "Someone", "title": "Extra Spaces", "year": "2023"}
+        result = dict(BibTeXEntry.from_string(entry).fields)
         self.assertEqual(expected, result)
 
-    def test_split_fields_with_linebreak_after_entry_type(self) -> None:
+    def test_fields_with_linebreak_after_entry_type(self) -> None:
         entry = """@misc
 {
 id456,
   author = {Spaced Out},
   title = {Linebreak test}
 }"""
-        expected = [
-            "  author = {Spaced Out}",
-            "  title = {Linebreak test}"
-        ]
-        result = BibTeXEntry._split_fields(entry)
+        expected = {"author": "Spaced Out", "title": "Linebreak test"}
+        result = dict(BibTeXEntry.from_string(entry).fields)
         self.assertEqual(expected, result)
 
-    def test_split_fields_missing_open_brace(self) -> None:
+    def test_fields_missing_open_brace(self) -> None:
         entry = "article, author = {John Doe}, title = {Oops}"
         with self.assertRaises(KeyError):
-            BibTeXEntry._split_fields(entry)
+            BibTeXEntry.from_string(entry)
 
     def test_field_with_equals_in_value(self) -> None:
         bibtex_string = """@misc{test_entry,
@@ -183,6 +181,118 @@ id456,
         self.assertEqual(expected, actual)
 
 
+class TestTokenize(unittest.TestCase):
+    def test_field_slices(self) -> None:
+        raw = """@ARTICLE{key1,
+  Author = {John Doe},
+  year = 2020
+}"""
+        tokens = list(tokenize(raw))
+        self.assertEqual(1, len(tokens))
+        token = tokens[0]
+        self.assertEqual("ARTICLE", token.entry_type)
+        self.assertEqual("key1", token.name)
+        self.assertEqual(raw, token.text)
+        self.assertEqual(
+            [("author", "{John Doe}"), ("year", "2020")],
+            [(key, token.text[start:end]) for key, start, end in token.fields]
+        )
+
+    def test_fields_without_line_breaks(self) -> None:
+        raw = '@misc{key2, author = "Doe, John", title = {A, B, and C}, note = {x}}'
+        entry = BibTeXEntry.from_token(next(tokenize(raw)))
+        self.assertEqual({"author": "Doe, John", "title": "A, B, and C", "note": "x"}, entry.fields)
+
+    def test_comma_newline_inside_value(self) -> None:
+        raw = """@misc{key3,
+  title = {First part,
+           second part},
+  year = {2020}
+}"""
+        entry = BibTeXEntry.from_token(next(tokenize(raw)), strip_lines=True)
+        self.assertEqual({"title": "First part,\nsecond part", "year": "2020"}, entry.fields)
+
+    def test_deeply_nested_braces(self) -> None:
+        raw = """@misc{key4,
+  title = {{A {{deeply} nested}, title}},
+  note = "Quoted {with, braces}"
+}"""
+        entry = BibTeXEntry.from_token(next(tokenize(raw)))
+        self.assertEqual("A {{deeply} nested}, title", entry.fields["title"])
+        self.assertEqual("Quoted {with, braces}", entry.fields["note"])
+
+    def test_offsets_and_text_between_entries(self) -> None:
+        raw = """Some comment with an email@example.com in it.
+@misc{a, note = {1}}
+More text
+@misc{b, note = {2}}"""
+        tokens = list(tokenize(raw))
+        self.assertEqual(["a", "b"], [token.name for token in tokens])
+        for token in tokens:
+            self.assertEqual(token.text, raw[token.offset:token.offset + len(token.text)])
+
+    def test_offset_is_not_compared(self) -> None:
+        entries = [BibTeXEntry.from_token(token) for token in tokenize("@misc{a, note = {1}}\n@misc{a, note = {1}}")]
+        self.assertEqual([0, 21], [entry.offset for entry in entries])
+        self.assertEqual(entries[0], entries[1])
+        self.assertEqual(BibTeXEntry(entry_type="misc", name="a", fields={"note": "1"}), entries[0])
+
+
+class TestCompactFields(unittest.TestCase):
+    def test_shared_key_table_and_interned_strings(self) -> None:
+        raw = """@ARTICLE{first,
+  Author = {A},
+  title = {B}
+}
+@article{second,
+  author = {C},
+  TITLE = {D}
+}"""
+        first, second = [BibTeXEntry.from_token(token) for token in tokenize(raw)]
+        assert isinstance(first.fields, CompactFields) and isinstance(second.fields, CompactFields)
+        self.assertIs(first.fields._key_table, second.fields._key_table)
+        self.assertIs(first.entry_type, second.entry_type)
+        self.assertEqual({"author": "A", "title": "B"}, first.fields)
+        self.assertEqual({"author": "C", "title": "D"}, second.fields)
+        self.assertEqual("D", second.fields.get("title"))
+        self.assertIsNone(second.fields.get("year"))
+        self.assertFalse(hasattr(first, "__dict__"))
+
+
+class TestLazyFields(unittest.TestCase):
+    def test_lazy_entries_equal_eager_entries(self) -> None:
+        bib_path = os.path.join(os.path.dirname(__file__), "test_refs.bib")
+        eager_entries = parse_bibtex_file(bib_path)
+        lazy_entries = parse_bibtex_file(bib_path, lazy=True)
+        self.assertEqual(len(eager_entries), len(lazy_entries))
+        for eager, lazy in zip(eager_entries, lazy_entries):
+            with self.subTest(name=eager.name):
+                self.assertIsInstance(lazy.fields, LazyFields)
+                self.assertEqual(eager, lazy)
+
+    def test_values_are_only_normalized_on_access(self) -> None:
+        raw = """@misc{lazy,
+  author = {{Someone}},
+  abstract = {A very
+              long abstract}
+}"""
+        entry = BibTeXEntry.from_token(next(tokenize(raw)), strip_lines=True, lazy=True)
+        fields = entry.fields
+        assert isinstance(fields, LazyFields)
+        self.assertIn("abstract", fields)
+        self.assertNotIn("url", fields)
+        self.assertEqual(["author", "abstract"], list(fields.keys()))
+        self.assertEqual({}, fields._values)
+
+        self.assertEqual("Someone", fields["author"])
+        self.assertEqual({"author": "Someone"}, fields._values)
+        self.assertIsNone(fields.get("url"))
+
+        start, end = fields.span("abstract")
+        self.assertEqual("{A very\n              long abstract}", fields.text[start:end])
+        self.assertEqual("A very\nlong abstract", fields["abstract"])
+
+
 class TestSplitEntries(unittest.TestCase):
     def test_single_entry(self) -> None:
         raw = """@article{key1,
@@ -409,5 +519,100 @@ class TestParseBibtexFile(unittest.TestCase):
                 self.assertEqual(expected["type"], match.entry_type)  # type: ignore
 
 
+class TestStreaming(unittest.TestCase):
+    def test_tokenize_stream_matches_tokenize(self) -> None:
+        bib_path = os.path.join(os.path.dirname(__file__), "test_refs.bib")
+        with open(bib_path, "r") as file:
+            raw = file.read()
+        expected = list(tokenize(raw))
+        for chunk_size in (1, 7, 64, 1 << 16):
+            with self.subTest(chunk_size=chunk_size):
+                actual = list(tokenize_stream(io.StringIO(raw), chunk_size))
+                self.assertEqual(expected, actual)
+
+    def test_iter_bibtex_file(self) -> None:
+        bib_path = os.path.join(os.path.dirname(__file__), "test_refs.bib")
+        expected = parse_bibtex_file(bib_path)
+        actual = list(iter_bibtex_file(bib_path, chunk_size=16))
+        self.assertEqual(expected, actual)
+
+    def test_incomplete_entry_at_end_of_stream(self) -> None:
+        raw = "@misc{a, note = {1}}\n@misc{b, note = {2"
+        tokens = list(tokenize_stream(io.StringIO(raw), chunk_size=5))
+        self.assertEqual([("a", True), ("b", False)], [(token.name, token.closed) for token in tokens])
+
+    def test_unclosed_entry_is_reported_and_skipped(self) -> None:
+        raw = ("@misc{a, note = {1},\n  title = {Not {closed}\n\n"
+               "@misc{b, note = {2}}\n  @article{c, title = {3}}\n@misc{d, note = {x@misc{e}}")
+        expected = [("a", False, ["note", "title"]), ("b", True, ["note"]), ("c", True, ["title"]),
+                    ("d", False, ["note"])]
+        tokens = list(tokenize(raw))
+        self.assertEqual(expected, [(token.name, token.closed, [key for key, _, _ in token.fields])
+                                    for token in tokens])
+        self.assertEqual("1", BibTeXEntry.from_token(tokens[0]).fields["note"])
+        self.assertEqual(raw.index("@misc{b"), tokens[1].offset)
+        for chunk_size in (1, 7, 1 << 16):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(tokens, list(tokenize_stream(io.StringIO(raw), chunk_size)))
+        self.assertEqual([tokens[1].text, tokens[2].text], split_entries(raw))
+
+        violations = verify(BibTeXEntry.from_token(tokens[0]))
+        self.assertEqual(UNCLOSED_ENTRY_RULE, getattr(violations[0], "rule"))
+
+    def test_entry_closed_after_the_lookahead(self) -> None:
+        filler = "x" * (UNCLOSED_ENTRY_LOOKAHEAD // 2)
+        for closed in (True, False):
+            with self.subTest(closed=closed):
+                abstract = filler if closed else filler * 3
+                raw = f"@misc{{a, abstract = {{\n@misc{{b, note = {{{abstract}}}}}\n}}}}\n@misc{{c, note = {{3}}}}\n"
+                tokens = list(tokenize(raw))
+                expected = [("a", True), ("c", True)] if closed else [("a", False), ("b", True), ("c", True)]
+                self.assertEqual(expected, [(token.name, token.closed) for token in tokens])
+                self.assertEqual(tokens, list(tokenize_stream(io.StringIO(raw), 1 << 12)))
+
+    def test_unclosed_entry_does_not_buffer_the_rest_of_the_file(self) -> None:
+        entries = [f"@misc{{e{index}, note = {{{index}}}}}\n" for index in range(20000)]
+        entries[3] = "@misc{broken,\n  title = {Never closed,\n"
+        raw = "".join(entries)
+        read_sizes: List[int] = []
+
+        class RecordingStringIO(io.StringIO):
+            def read(self, size: Optional[int] = -1) -> str:
+                read_sizes.append(-1 if size is None else size)
+                return super().read(size)
+
+        tokens = list(tokenize_stream(RecordingStringIO(raw), 1 << 12))
+        self.assertEqual(tokens, list(tokenize(raw)))
+        self.assertEqual(("broken", False), (tokens[3].name, tokens[3].closed))
+        self.assertEqual(20000, len(tokens))
+        self.assertLessEqual(max(read_sizes), 2 * UNCLOSED_ENTRY_LOOKAHEAD)
+
+    def test_tokenize_prefix(self) -> None:
+        raw = "@misc{a, note = {1}}\n@misc{b, note = {2}}\n@misc{c, note = {3\n@misc{d, note = {4}}\n"
+        tokens, consumed = tokenize_prefix(raw)
+        self.assertEqual(["a", "b"], [token.name for token in tokens])
+        self.assertEqual(raw.index("@misc{c"), consumed)
+        tokens, consumed = tokenize_prefix(raw[:consumed])
+        self.assertEqual((["a", "b"], consumed), ([token.name for token in tokens], len(raw[:consumed])))
+        # Once the lookahead after the next entry is in the string, an entry that is not closed is cut off
+        raw += "%" * UNCLOSED_ENTRY_LOOKAHEAD
+        tokens, consumed = tokenize_prefix(raw)
+        self.assertEqual([("a", True), ("b", True), ("c", False), ("d", True)],
+                         [(token.name, token.closed) for token in tokens])
+        self.assertEqual(len(raw), consumed)
+
+    def test_only_the_given_names(self) -> None:
+        bib_path = os.path.join(os.path.dirname(__file__), "test_refs.bib")
+        with open(bib_path, "r") as file:
+            raw = file.read()
+        all_tokens = list(tokenize(raw))
+        names = {all_tokens[1].name.upper(), all_tokens[-1].name, "missing"}
+        expected = [all_tokens[1], all_tokens[-1]]
+        self.assertEqual(expected, list(tokenize(raw, names)))
+        for chunk_size in (1, 7, 1 << 16):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(expected, list(tokenize_stream(io.StringIO(raw), chunk_size, names)))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,53 @@
+from typing import Callable, List
+import os
+import unittest
+
+from bibtex_linter.parser import BibTeXEntry, iter_bibtex_file
+from bibtex_linter.profiling import Profiler
+from bibtex_linter.rulesets import load_ruleset
+from bibtex_linter.verification import Ruleset, ViolationLike, verify_entries
+
+
+class TestProfiler(unittest.TestCase):
+    def test_same_results_as_verify(self) -> None:
+        load_ruleset("ieeetr")
+        bib_path = os.path.join(os.path.dirname(__file__), "test_template", "maximal_example_refs.bib")
+        profiler = Profiler()
+        self.assertEqual(list(verify_entries(iter_bibtex_file(bib_path))), list(profiler.verify_file(bib_path)))
+        from bibtex_linter.ieeetr_rules import check_online
+
+        self.assertEqual(9, profiler.number_of_entries)
+        self.assertGreater(profiler.parse_time, 0)
+        self.assertGreater(profiler.verify_time, 0)
+        statistics = profiler.rule_statistics[(check_online, "online")]
+        self.assertEqual(1, statistics.calls)
+        self.assertLessEqual(statistics.max_time, statistics.total_time)
+
+        profile = profiler.to_json()
+        self.assertEqual(9, profile["entries"])
+        rules = {rule["rule"]: rule for rule in profile["rules"]}
+        self.assertEqual(1, rules["field_rule_online"]["calls"])
+        self.assertEqual(["online"], list(rules["field_rule_online"]["entry_types"]))
+        self.assertEqual(sum(result["violations"] for result in profile["rules"]),
+                         sum(len(result.violations) for result in verify_entries(iter_bibtex_file(bib_path))))
+        self.assertIn("check_online", profiler.format_table())
+
+    def test_rules_with_the_same_name(self) -> None:
+        def make_rule(message: str) -> Callable[[BibTeXEntry], List[ViolationLike]]:
+            def check_note(entry: BibTeXEntry) -> List[ViolationLike]:
+                return [message]
+            return check_note
+
+        ruleset = Ruleset("profiled")
+        first, second = make_rule("first"), make_rule("second")
+        ruleset.rule()(first)
+        ruleset.rule()(second)
+        profiler = Profiler(ruleset)
+        entry = BibTeXEntry(entry_type="misc", name="a", fields={})
+        self.assertEqual(ruleset.verify(entry), profiler.verify(entry))
+        self.assertEqual({(first, "misc"), (second, "misc")}, set(profiler.rule_statistics))
+        self.assertEqual([1, 1], [rule["calls"] for rule in profiler.to_json()["rules"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
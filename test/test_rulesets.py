@@ -0,0 +1,77 @@
+from typing import List
+import concurrent.futures
+import os
+import sys
+import tempfile
+import unittest
+
+from bibtex_linter import verification
+from bibtex_linter.parser import parse_bibtex_file
+from bibtex_linter.rulesets import create_ruleset, import_from_path, verify_file_with_rulesets
+from bibtex_linter.verification import EntryResult
+
+TEST_FILE: str = os.path.join(os.path.dirname(__file__), "test_template", "maximal_example_refs.bib")
+
+
+class TestCreateRuleset(unittest.TestCase):
+    def test_builtin_rulesets_do_not_mix(self) -> None:
+        number_of_rules = len(verification._default_ruleset)
+        ieeetr = create_ruleset("ieeetr")
+        ieeetran = create_ruleset("IEEEtran")
+        self.assertIs(ieeetr, create_ruleset("ieeetr"))
+        self.assertTrue(ieeetr.rules)
+        self.assertTrue(ieeetran.rules)
+        self.assertFalse(set(map(id, ieeetr.rules)) & set(map(id, ieeetran.rules)))
+        self.assertEqual(number_of_rules, len(verification._default_ruleset))
+
+    def test_toml_ruleset(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "rules.toml")
+            with open(path, "w") as file:
+                file.write('[article]\nrequired = ["isbn"]\n')
+            ruleset = create_ruleset(path)
+        self.assertEqual(1, len(ruleset))
+
+    def test_created_in_several_threads(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            paths: List[str] = []
+            for number in range(4):
+                paths.append(os.path.join(directory, f"rules_{number}.py"))
+                with open(paths[-1], "w") as file:
+                    file.write("from bibtex_linter.verification import linter_rule\n\n\n"
+                               f"@linter_rule()\ndef rule_{number}(entry):\n    return []\n")
+            with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+                rulesets = list(executor.map(create_ruleset, paths + paths))
+        # Each ruleset is only created once and gets exactly the rules of its own module
+        self.assertEqual(rulesets[:4], rulesets[4:])
+        self.assertEqual([[f"rule_{number}"] for number in range(4)],
+                         [[rule.__name__ for rule in ruleset.rules] for ruleset in rulesets[:4]])
+
+    def test_modules_get_unique_names(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "rules.py")
+            with open(path, "w") as file:
+                file.write("VALUE = 1\n")
+            modules_before = set(sys.modules)
+            with verification.collecting_rules(verification.Ruleset()):
+                import_from_path(path)
+                import_from_path(path)
+        new_modules = set(sys.modules) - modules_before
+        self.assertEqual(2, len(new_modules))
+        self.assertNotIn("ruleset", new_modules)
+
+    def test_verify_file_with_rulesets(self) -> None:
+        rulesets = [create_ruleset("ieeetr"), create_ruleset("IEEEtran")]
+        entries = parse_bibtex_file(TEST_FILE)
+        for max_shared_parse_size in (0, os.path.getsize(TEST_FILE)):
+            with self.subTest(max_shared_parse_size=max_shared_parse_size):
+                results = verify_file_with_rulesets(TEST_FILE, rulesets, max_shared_parse_size=max_shared_parse_size)
+                for ruleset, results_of_ruleset in zip(rulesets, results):
+                    expected = [EntryResult(name=entry.name, entry_type=entry.entry_type,
+                                            violations=ruleset.verify(entry))
+                                for entry in entries]
+                    self.assertEqual(expected, list(results_of_ruleset))
+
+
+if __name__ == "__main__":
+    unittest.main()
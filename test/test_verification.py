@@ -1,13 +1,19 @@
+import concurrent.futures
 import unittest
-from typing import List, Set
+from typing import Callable, List, Set
 
-from bibtex_linter.verification import check_required_fields, check_omitted_fields, verify, linter_rule
-from bibtex_linter.parser import BibTeXEntry
+from bibtex_linter import verification
+from bibtex_linter.verification import check_required_fields, check_omitted_fields, verify, linter_rule, \
+    batch_implementation, verify_many, EntryBatch, EntryResult, Violation, ViolationLike, OMITTED_FIELDS_TEMPLATE, \
+    Ruleset, RuleCache, collecting_rules, omitted_fields_violations, required_fields_violations, check_required_field, \
+    check_disallowed_fields, check_disallowed_field, required_field_violations, disallowed_fields_violations, \
+    disallowed_field_violations
+from bibtex_linter.parser import BibTeXEntry, tokenize
 
 
 @linter_rule(entry_type="test_entry_type")
 def example_linter_rule(entry: BibTeXEntry) -> List[str]:
-    violations = []
+    violations: List[str] = []
     required_fields: Set[str] = {"author", "title", "howpublished", "year"}
     omitted_fields: Set[str] = {"language", "organization", "address", "pages", "url"}
     violations.extend(check_required_fields(entry, required_fields))
@@ -15,6 +21,16 @@ def example_linter_rule(entry: BibTeXEntry) -> List[str]:
     return violations
 
 
+# The same rule as `example_linter_rule`, with structured `Violation`s
+STRUCTURED_RULES = Ruleset("structured")
+
+
+@STRUCTURED_RULES.rule(entry_type="test_entry_type")
+def example_structured_rule(entry: BibTeXEntry) -> List[Violation]:
+    return (required_fields_violations(entry, {"author", "title", "howpublished", "year"})
+            + omitted_fields_violations(entry, {"language", "organization", "address", "pages", "url"}))
+
+
 class TestVerification(unittest.TestCase):
     def test_check_required_fields_missing(self) -> None:
         entry = BibTeXEntry(
@@ -55,6 +71,20 @@ class TestVerification(unittest.TestCase):
         )
         self.assertEqual([], check_omitted_fields(entry, {"url"}))
 
+    def test_check_helpers_return_strings(self) -> None:
+        entry = BibTeXEntry(entry_type="test_entry_type", name="strings", fields={"url": "x"})
+        violations = (check_required_fields(entry, {"author", "year"}) + check_omitted_fields(entry, {"url"})
+                      + check_required_field(entry, "title", "Add it.") + check_disallowed_fields(entry, {"url"})
+                      + check_disallowed_field(entry, "url", "Remove it."))
+        self.assertEqual([str] * 5, [type(violation) for violation in violations])
+        structured = (required_fields_violations(entry, {"author", "year"}) + omitted_fields_violations(entry, {"url"})
+                      + required_field_violations(entry, "title", "Add it.")
+                      + disallowed_fields_violations(entry, {"url"})
+                      + disallowed_field_violations(entry, "url", "Remove it."))
+        self.assertEqual(violations, [violation.message for violation in structured])
+        self.assertEqual([["author", "year"], ["url"], ["title"], ["url"], ["url"]],
+                         [violation.to_json()["fields"] for violation in structured])
+
     def test_verify_combined_rule(self) -> None:
         entry = BibTeXEntry(
             entry_type="test_entry_type",
@@ -80,5 +110,193 @@ class TestVerification(unittest.TestCase):
         self.assertEqual(expected, actual)
 
 
+class TestViolation(unittest.TestCase):
+    def test_message_is_rendered_lazily(self) -> None:
+        violation = Violation(OMITTED_FIELDS_TEMPLATE, "lazy", "misc", {"url", "language"})
+        self.assertIsNone(violation._message)
+        self.assertEqual("Entry 'lazy' has fields present that would be omitted in the compiled document: "
+                         "[language, url]. This could lead to a loss of information.", violation.message)
+        self.assertIs(violation.message, violation._message)
+
+    def test_compatible_with_str(self) -> None:
+        violation = Violation("Entry '{entry_name}' of type '{entry_type}' needs a {thing}.", "a", "misc",
+                              arguments={"thing": "note"})
+        message = "Entry 'a' of type 'misc' needs a note."
+        self.assertEqual(message, violation)
+        self.assertEqual(message, str(violation))
+        self.assertEqual(hash(message), hash(violation))
+        self.assertNotEqual("Something else", violation)
+
+    def test_json_round_trip(self) -> None:
+        entry = BibTeXEntry(entry_type="test_entry_type", name="json", fields={"url": "x"})
+        violations = STRUCTURED_RULES.verify(entry)
+        self.assertTrue(all(isinstance(violation, Violation) for violation in violations))
+        data = [violation.to_json() for violation in violations if isinstance(violation, Violation)]
+        self.assertEqual("example_structured_rule", data[0]["rule"])
+        self.assertEqual(["author", "howpublished", "title", "year"], data[0]["fields"])
+        self.assertEqual(violations, [Violation.from_json(violation) for violation in data])
+
+
+class TestRuleIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        # Remember the registered rules, so that the rules registered in these tests do not leak into other tests
+        self._snapshot = verification._default_ruleset.snapshot()
+
+    def tearDown(self) -> None:
+        verification._default_ruleset.restore(self._snapshot)
+
+    def test_registration_order_is_kept(self) -> None:
+        @linter_rule(entry_type=None)
+        def first(entry: BibTeXEntry) -> List[str]:
+            return ["first"]
+
+        @linter_rule(entry_type="index_test_type")
+        def second(entry: BibTeXEntry) -> List[str]:
+            return ["second"]
+
+        @linter_rule(entry_type=None)
+        def third(entry: BibTeXEntry) -> List[str]:
+            return ["third"]
+
+        @linter_rule(entry_type="other_index_test_type")
+        def fourth(entry: BibTeXEntry) -> List[str]:
+            return ["fourth"]
+
+        entry = BibTeXEntry(entry_type="index_test_type", name="index", fields={})
+        self.assertEqual(["first", "second", "third"], verify(entry))
+        entry = BibTeXEntry(entry_type="other_index_test_type", name="index", fields={})
+        self.assertEqual(["first", "third", "fourth"], verify(entry))
+        entry = BibTeXEntry(entry_type="unknown_index_test_type", name="index", fields={})
+        self.assertEqual(["first", "third"], verify(entry))
+
+    def test_verify_many(self) -> None:
+        batches: List[List[str]] = []
+
+        @linter_rule(entry_type=None)
+        def check_year(entry: BibTeXEntry) -> List[str]:
+            return [] if "year" in entry.fields else [f"{entry.name}: year"]
+
+        @linter_rule(entry_type="batch_test_type")
+        def check_author(entry: BibTeXEntry) -> List[str]:
+            return [] if "author" in entry.fields else [f"{entry.name}: author"]
+
+        @batch_implementation(check_author)
+        def check_author_batch(batch: EntryBatch) -> List[List[str]]:
+            batches.append(batch.names)
+            return [check_author(entry) for entry in batch.entries]
+
+        entries = [
+            BibTeXEntry(entry_type="batch_test_type", name="a", fields={"author": "Jane"}),
+            BibTeXEntry(entry_type="other_batch_test_type", name="b", fields={}),
+            BibTeXEntry(entry_type="batch_test_type", name="c", fields={"year": "2020"}),
+            BibTeXEntry(entry_type="batch_test_type", name="d", fields={}),
+        ]
+        expected = [EntryResult(name=entry.name, entry_type=entry.entry_type, violations=verify(entry))
+                    for entry in entries]
+        self.assertEqual(expected, verify_many(entries))
+        self.assertEqual(["b: year"], expected[1].violations)
+        self.assertEqual(["d: year", "d: author"], expected[3].violations)
+        # The batch implementation is called once for all entries of its entry type
+        self.assertEqual([["a", "c", "d"]], batches)
+
+
+class TestRuleset(unittest.TestCase):
+    def test_rulesets_are_isolated(self) -> None:
+        number_of_rules = len(verification._default_ruleset)
+        first = Ruleset("first")
+        second = Ruleset("second")
+
+        @first.rule(entry_type="misc")
+        def needs_note(entry: BibTeXEntry) -> List[str]:
+            return [] if "note" in entry.fields else [f"{entry.name}: note"]
+
+        @second.rule()
+        def needs_year(entry: BibTeXEntry) -> List[str]:
+            return [] if "year" in entry.fields else [f"{entry.name}: year"]
+
+        with collecting_rules(second):
+            @linter_rule(entry_type="misc")
+            def needs_author(entry: BibTeXEntry) -> List[str]:
+                return [] if "author" in entry.fields else [f"{entry.name}: author"]
+
+        entry = BibTeXEntry(entry_type="misc", name="a", fields={})
+        self.assertEqual(["a: note"], first.verify(entry))
+        self.assertEqual(["a: year", "a: author"], second.verify(entry))
+        self.assertEqual([["a: year", "a: author"]], [result.violations for result in second.verify_many([entry])])
+        self.assertEqual(number_of_rules, len(verification._default_ruleset))
+        self.assertIs(verification._default_ruleset, verification._collecting_ruleset.get())
+
+    def test_rules_added_while_verifying_in_threads(self) -> None:
+        ruleset = Ruleset("concurrent")
+        ruleset.memoize()
+        entries = [BibTeXEntry(entry_type="misc", name=f"e{index % 50}", fields={}) for index in range(2000)]
+
+        def numbered_rule(number: int) -> Callable[[BibTeXEntry], List[str]]:
+            return lambda entry: [f"{entry.name}: {number}"]
+
+        def add_rules() -> None:
+            for number in range(100):
+                ruleset.add_rule(numbered_rule(number), "misc" if number % 2 else None)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            registration = executor.submit(add_rules)
+            results = list(executor.map(ruleset.verify, entries))
+            registration.result()
+        # Each entry was verified with the rules of one snapshot, i.e. with the first few rules in order
+        for violations in results + [ruleset.verify(entries[0])]:
+            numbers = [int(str(violation).split(": ")[1]) for violation in violations]
+            self.assertEqual(list(range(len(numbers))), numbers)
+        self.assertEqual(100, len(ruleset))
+        self.assertEqual(100, len(ruleset.verify(entries[0])))
+
+
+class TestRuleCache(unittest.TestCase):
+    def test_results_are_memoized(self) -> None:
+        ruleset = Ruleset("memoized")
+        calls: List[str] = []
+
+        @ruleset.rule()
+        def needs_year(entry: BibTeXEntry) -> List[ViolationLike]:
+            calls.append(entry.name)
+            return [] if "year" in entry.fields else [Violation("{entry_name}: year", entry.name, entry.entry_type)]
+
+        @ruleset.rule(pure=False)
+        def impure(entry: BibTeXEntry) -> List[ViolationLike]:
+            calls.append("impure")
+            return []
+
+        cache = ruleset.memoize(max_size=2)
+        self.assertIs(cache, ruleset.memoize())
+        first = BibTeXEntry(entry_type="misc", name="a", fields={"note": "1"})
+        violations = ruleset.verify(first)
+        self.assertEqual(["a: year"], [str(violation) for violation in violations])
+        self.assertEqual(["a", "impure"], calls)
+        # An equal entry is taken from the cache, except for the impure rule
+        again = ruleset.verify(BibTeXEntry(entry_type="misc", name="a", fields={"note": "1"}))
+        self.assertEqual(["a: year"], [str(violation) for violation in again])
+        self.assertTrue(str(getattr(again[0], "rule")).endswith("needs_year"))
+        self.assertEqual(["a", "impure", "impure"], calls)
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+        # Changing the returned list does not change the cache
+        again.clear()
+        self.assertEqual(1, len(ruleset.verify(first)))
+
+        ruleset.verify(BibTeXEntry(entry_type="misc", name="a", fields={"note": "2"}))
+        ruleset.verify(BibTeXEntry(entry_type="misc", name="b", fields={"note": "1"}))
+        self.assertEqual(2, len(cache))
+        # The least recently used result was dropped
+        ruleset.verify(first)
+        self.assertEqual(["a", "a", "b", "a"], [name for name in calls if name != "impure"])
+
+    def test_lazy_entries(self) -> None:
+        cache = RuleCache()
+        rules = [lambda entry: [f"{entry.name}: {entry.fields.get('note')}"]]
+        text = "@misc{a, note = {1}}\n@misc{a, note = {1}}\n@misc{a,   note = {1}}\n@misc{a, note = {2}}"
+        entries = [BibTeXEntry.from_token(token, lazy=True) for token in tokenize(text)]
+        self.assertEqual([["a: 1"], ["a: 1"], ["a: 1"], ["a: 2"]], [cache.verify(rules, entry) for entry in entries])
+        # Only the raw text is compared, so the differently formatted entry is verified again
+        self.assertEqual((1, 3), (cache.hits, cache.misses))
+
+
 if __name__ == "__main__":
     unittest.main()
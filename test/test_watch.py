@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from typing import List, Tuple
+
+from bibtex_linter.verification import EntryResult
+from bibtex_linter.watch import FileWatcher, watch
+
+RAW_ENTRIES = """@misc{first,
+  note = {1}
+}
+
+@misc{second,
+  note = {2}
+}
+"""
+
+
+class TestFileWatcher(unittest.TestCase):
+    def test_only_changed_entries_are_verified_again(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            bib_path = os.path.join(directory, "refs.bib")
+            with open(bib_path, "w") as file:
+                file.write(RAW_ENTRIES)
+
+            watcher = FileWatcher(bib_path)
+            self.assertTrue(watcher.has_changed())
+            results, number_of_verified_entries = watcher.verify()
+            self.assertEqual(["first", "second"], [result.name for result in results])
+            self.assertEqual(2, number_of_verified_entries)
+            self.assertFalse(watcher.has_changed())
+
+            with open(bib_path, "w") as file:
+                file.write(RAW_ENTRIES.replace("{2}", "{changed}") + "@misc{third, note = {3}}\n")
+            os.utime(bib_path, ns=(0, 0))
+            self.assertTrue(watcher.has_changed())
+            results, number_of_verified_entries = watcher.verify()
+            self.assertEqual(["first", "second", "third"], [result.name for result in results])
+            self.assertEqual(2, number_of_verified_entries)
+
+    def test_watch_reports_initial_results(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            bib_path = os.path.join(directory, "refs.bib")
+            with open(bib_path, "w") as file:
+                file.write(RAW_ENTRIES)
+
+            reports: List[Tuple[str, List[EntryResult], int]] = []
+            watch([bib_path, os.path.join(directory, "missing.bib")],
+                  lambda *report: reports.append(report), interval=0, max_rounds=2)
+            self.assertEqual(1, len(reports))
+            self.assertEqual(bib_path, reports[0][0])
+            self.assertEqual(2, reports[0][2])
+
+
+if __name__ == "__main__":
+    unittest.main()